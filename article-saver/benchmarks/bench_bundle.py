@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+打包输出微基准
+用法：
+    python3 benchmarks/bench_bundle.py [--articles 300] [--images 20] [--image-kb 60] [--reads 2000]
+
+在临时目录中构造 N 篇文章的暂存目录（content.md + 若干图片），分别按以下方式提交：
+1. 文件夹布局（StagingArea.commit）
+2. --bundle article：每篇文章一个 zip
+3. --bundle day：所有文章追加到同一个 zip
+报告提交耗时、归档中的文件数，以及随机读取单张图片并计算 CRC 的耗时（文件夹 open/read 对比包内 mmap 切片）。
+"""
+
+import os
+import sys
+import time
+import zlib
+import random
+import shutil
+import argparse
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from staging import StagingArea  # noqa: E402
+from bundle import BundleWriter, BundleReader, locate  # noqa: E402
+
+
+def build_staging(staging, images, image_bytes, index):
+    staging_dir = staging.create()
+    (staging_dir / "content.md").write_text(f"# 文章 {index}\n\n" + "正文内容 " * 2000, encoding='utf-8')
+    for i in range(images):
+        (staging_dir / f"img_{i:02d}.jpg").write_bytes(os.urandom(image_bytes))
+    return staging_dir
+
+
+def count_files(root):
+    return sum(len(files) for _, _, files in os.walk(root))
+
+
+def run(layout, args, workdir):
+    root = workdir / layout
+    staging = StagingArea(root, log=lambda msg: None)
+    writer = BundleWriter(layout, log=lambda msg: None) if layout != 'folder' else None
+    staged = [build_staging(staging, args.images, args.image_kb * 1024, i) for i in range(args.articles)]
+
+    started = time.perf_counter()
+    saved = []
+    for i, staging_dir in enumerate(staged):
+        base = root / "知乎" / f"2026-10-17_文章{i}"
+        saved.append(writer.commit(staging_dir, base) if writer else staging.commit(staging_dir, base))
+    commit_time = time.perf_counter() - started
+    shutil.rmtree(root / ".staging", ignore_errors=True)
+    files = count_files(root)
+
+    rng = random.Random(0)
+    picks = [(rng.choice(saved), f"img_{rng.randrange(args.images):02d}.jpg") for _ in range(args.reads)]
+    readers = {}
+    started = time.perf_counter()
+    total = 0
+    for save_dir, name in picks:
+        located = locate(save_dir)
+        if located is None:
+            total ^= zlib.crc32((Path(save_dir) / name).read_bytes())
+            continue
+        bundle, folder = located
+        reader = readers.get(bundle) or readers.setdefault(bundle, BundleReader(bundle))
+        with reader.read(f"{folder}/{name}") as data:
+            total ^= zlib.crc32(data)
+    read_time = time.perf_counter() - started
+    for reader in readers.values():
+        reader.close()
+
+    print(f"{layout:<8} 提交 {commit_time:7.2f}s  {args.articles / commit_time:8.1f} 篇/s  "
+          f"文件数 {files:>7}  随机读 {args.reads} 张图片 {read_time * 1000:8.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="打包输出微基准")
+    parser.add_argument("--articles", type=int, default=300)
+    parser.add_argument("--images", type=int, default=20, help="每篇文章的图片数")
+    parser.add_argument("--image-kb", type=int, default=60)
+    parser.add_argument("--reads", type=int, default=2000)
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="bench-bundle-"))
+    print(f"📄 {args.articles} 篇文章 × {args.images} 张图片（每张 {args.image_kb} KB）\n")
+    try:
+        for layout in ('folder', 'article', 'day'):
+            run(layout, args, workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+端到端离线基准
+用法：
+    python3 benchmarks/bench_e2e.py [--articles 12] [--concurrency 4] [--latency 50] [--bandwidth 2048]
+                                    [--platforms wechat,zhihu,x] [--label NAME] [--saver-args "--image-mode stream"]
+
+启动本地夹具服务器（fixture_server.py）作为代理，以真实命令行方式运行 saver.py：
+1. single-<平台>：每个平台单篇运行一次（含浏览器启动等一次性开销）
+2. batch：--articles 篇文章（各平台轮流）一次批量运行
+每个场景报告成功/失败数、articles/sec、各阶段 p50/p95（来自 --trace）以及子进程峰值 RSS，
+结果写入 benchmarks/results/，并与上一次结果对比，便于发现版本间的性能回退。
+"""
+
+import os
+import sys
+import json
+import time
+import shlex
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+from datetime import datetime
+
+BENCH_DIR = Path(__file__).parent
+SKILL_DIR = BENCH_DIR.parent
+SAVER_SCRIPT = SKILL_DIR / "scripts" / "saver.py"
+RESULTS_DIR = BENCH_DIR / "results"
+sys.path.insert(0, str(SKILL_DIR / "scripts"))
+
+from fixture_server import add_server_arguments, server_from_args  # noqa: E402
+from tracing import percentile  # noqa: E402
+
+ARTICLE_URLS = {
+    'wechat': "http://mp.weixin.qq.com/s/bench-{n}",
+    'zhihu': "http://zhuanlan.zhihu.com/p/{n}",
+    'x': "http://x.com/exampledev/status/{n}",
+}
+REPORT_STAGES = ('total', 'launch', 'jina_fetch', 'http_fetch', 'goto', 'readiness', 'extract', 'download_images', 'save')
+
+
+def git_version():
+    try:
+        rev = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=SKILL_DIR,
+                             capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--', '.'], cwd=SKILL_DIR,
+                               capture_output=True, text=True).stdout.strip()
+        return f"{rev}-dirty" if dirty else rev
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def peak_rss_mb(rusage):
+    # Linux 的 ru_maxrss 单位为 KB，macOS 为字节
+    divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return round(rusage.ru_maxrss / divisor, 1)
+
+
+def run_saver(args, workdir, name, saver_args):
+    trace_path = workdir / f"{name}.jsonl"
+    log_path = workdir / f"{name}.log"
+    command = [sys.executable, str(SAVER_SCRIPT), *args,
+               '--trace', str(trace_path), '--force',
+               '--output', str(workdir / 'output'), '--data-dir', str(workdir / 'data'),
+               *saver_args]
+    started = time.perf_counter()
+    with open(log_path, 'w', encoding='utf-8') as log:
+        process = subprocess.Popen(command, stdout=log, stderr=subprocess.STDOUT)
+        # wait4 返回该子进程（含其已回收的子进程，如 Chromium）的资源占用
+        _, status, rusage = os.wait4(process.pid, 0)
+        process.returncode = os.waitstatus_to_exitcode(status)
+    elapsed = time.perf_counter() - started
+
+    traces = []
+    if trace_path.exists():
+        traces = [json.loads(line) for line in trace_path.read_text(encoding='utf-8').splitlines() if line]
+    return {
+        "wall": round(elapsed, 3),
+        "exit_code": process.returncode,
+        "peak_rss_mb": peak_rss_mb(rusage),
+        "traces": traces,
+        "log": str(log_path),
+    }
+
+
+def summarize(run, articles):
+    durations = {}
+    for trace in run["traces"]:
+        durations.setdefault('total', []).append(trace['total'])
+        for item in trace['spans']:
+            if item.get('status', 'ok') == 'ok':
+                durations.setdefault(item['name'], []).append(item['duration'])
+    ok = sum(1 for t in run["traces"] if t['status'] in ('ok', 'skipped'))
+    return {
+        "articles": articles,
+        "ok": ok,
+        "failed": articles - ok,
+        "wall": run["wall"],
+        "articles_per_sec": round(ok / run["wall"], 3) if run["wall"] else 0.0,
+        "peak_rss_mb": run["peak_rss_mb"],
+        "exit_code": run["exit_code"],
+        "stages": {
+            name: {"p50": round(percentile(values, 0.5), 4), "p95": round(percentile(values, 0.95), 4), "count": len(values)}
+            for name, values in durations.items()
+        },
+        "strategies": sorted({t.get('strategy') for t in run["traces"] if t.get('strategy')}),
+    }
+
+
+def print_table(results):
+    print(f"\n{'scenario':<16}{'ok/all':>8}{'wall':>9}{'art/s':>8}{'RSS MB':>9}  stage p50/p95")
+    for name, result in results.items():
+        stages = '  '.join(
+            f"{stage} {result['stages'][stage]['p50']:.2f}/{result['stages'][stage]['p95']:.2f}"
+            for stage in REPORT_STAGES if stage in result['stages']
+        )
+        print(f"{name:<16}{result['ok']:>3}/{result['articles']:<4}{result['wall']:>8.2f}s"
+              f"{result['articles_per_sec']:>8.2f}{result['peak_rss_mb']:>9.1f}  {stages}")
+
+
+def latest_result(exclude=None):
+    files = sorted(p for p in RESULTS_DIR.glob("*.json") if p != exclude)
+    return files[-1] if files else None
+
+
+def compare(current, baseline_path):
+    baseline = json.loads(Path(baseline_path).read_text(encoding='utf-8'))
+    print(f"\n📉 与 {Path(baseline_path).name}（{baseline.get('version')}）对比：")
+    if baseline.get('params') != current['params']:
+        print("   ⚠️ 两次运行参数不同，对比仅供参考")
+
+    def delta(new, old, higher_is_better):
+        if not old:
+            return "   n/a"
+        change = (new - old) / old * 100
+        worse = change < 0 if higher_is_better else change > 0
+        return f"{change:+6.1f}%{' ⚠️' if worse and abs(change) >= 10 else ''}"
+
+    for name, result in current['scenarios'].items():
+        old = baseline['scenarios'].get(name)
+        if not old:
+            continue
+        old_p95 = old['stages'].get('total', {}).get('p95', 0)
+        new_p95 = result['stages'].get('total', {}).get('p95', 0)
+        print(f"   {name:<16} art/s {delta(result['articles_per_sec'], old['articles_per_sec'], True)}"
+              f"   total p95 {delta(new_p95, old_p95, False)}"
+              f"   RSS {delta(result['peak_rss_mb'], old['peak_rss_mb'], False)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="端到端离线基准")
+    parser.add_argument("--articles", type=int, default=12, help="批量场景的文章数")
+    parser.add_argument("--concurrency", type=int, default=4, help="批量场景的全局并发")
+    parser.add_argument("--platforms", default="wechat,zhihu,x", help="参与基准的平台")
+    parser.add_argument("--label", default="", help="结果文件名后缀")
+    parser.add_argument("--saver-args", default="", help="透传给 saver.py 的额外参数")
+    parser.add_argument("--baseline", help="对比的历史结果文件（默认最近一次）")
+    parser.add_argument("--no-save", action="store_true", help="不写入 benchmarks/results/")
+    add_server_arguments(parser)
+    args = parser.parse_args()
+
+    platforms = [p.strip() for p in args.platforms.split(',') if p.strip()]
+    unknown = [p for p in platforms if p not in ARTICLE_URLS]
+    if unknown:
+        print(f"❌ 未知平台: {', '.join(unknown)}")
+        return 1
+
+    server = server_from_args(args).start()
+    saver_args = ['--proxy', server.proxy_url, '--jina-endpoint', 'http://r.jina.ai', *shlex.split(args.saver_args)]
+    print(f"🧪 夹具服务器: {server.proxy_url}（延迟 {args.latency:g}ms，带宽 {args.bandwidth or '不限'} KB/s）")
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="article-saver-bench-") as tmp:
+        workdir = Path(tmp)
+        for platform_id in platforms:
+            url = ARTICLE_URLS[platform_id].format(n=f"single-{platform_id}")
+            print(f"▶️ single-{platform_id}")
+            run = run_saver([url], workdir, f"single-{platform_id}", saver_args)
+            results[f"single-{platform_id}"] = summarize(run, 1)
+
+        urls = [ARTICLE_URLS[platforms[i % len(platforms)]].format(n=f"batch-{i}") for i in range(args.articles)]
+        url_file = workdir / "urls.txt"
+        url_file.write_text('\n'.join(urls) + '\n', encoding='utf-8')
+        print(f"▶️ batch（{args.articles} 篇，并发 {args.concurrency}）")
+        run = run_saver(['--batch', str(url_file), '--concurrency', str(args.concurrency)],
+                        workdir, "batch", saver_args)
+        results["batch"] = summarize(run, args.articles)
+
+        failed = [name for name, r in results.items() if r['failed']]
+        if failed:
+            # 日志随临时目录删除，先打印失败场景的末尾几行
+            for name in failed:
+                tail = (workdir / f"{name}.log").read_text(encoding='utf-8', errors='replace').splitlines()[-5:]
+                print(f"⚠️ {name} 有失败的文章，日志末尾：\n    " + '\n    '.join(tail))
+    server.shutdown()
+
+    print_table(results)
+    current = {
+        "version": git_version(),
+        "created_at": datetime.now().isoformat(timespec='seconds'),
+        "params": {
+            "articles": args.articles, "concurrency": args.concurrency, "platforms": platforms,
+            "latency_ms": args.latency, "bandwidth_kbps": args.bandwidth, "host_latency": args.host_latency,
+            "image_kb": args.image_kb, "saver_args": args.saver_args,
+        },
+        "fixture_requests": server.requests,
+        "scenarios": results,
+    }
+
+    baseline = args.baseline or latest_result()
+    if baseline:
+        compare(current, baseline)
+    if not args.no_save:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        suffix = f"_{args.label}" if args.label else ""
+        path = RESULTS_DIR / f"{datetime.now().strftime('%Y%m%d-%H%M%S')}_{current['version']}{suffix}.json"
+        path.write_text(json.dumps(current, ensure_ascii=False, indent=2), encoding='utf-8')
+        print(f"\n💾 结果已保存: {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+HTML → Markdown 转换基准
+用法：
+    python3 benchmarks/bench_html2md.py [--corpus DIR] [--sizes 0.25,1,2]
+
+对语料目录（默认 benchmarks/fixtures）中每个已保存的 HTML：
+1. 原样转换一次，报告耗时与吞吐
+2. 把正文重复拼接到指定大小（MB），并额外构造深层嵌套版本，
+   检查单位体积耗时是否随体积保持稳定（线性扩展）
+文件名前缀（wechat / zhihu / x）决定使用的平台图片规则。
+"""
+
+import re
+import sys
+import time
+import argparse
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).parent
+sys.path.insert(0, str(BENCH_DIR.parent / "scripts"))
+
+import platforms  # noqa: E402
+from html2md import html_to_markdown  # noqa: E402
+
+NESTING_DEPTH = 200
+
+
+def platform_of(path):
+    prefix = path.stem.split('_')[0].split('-')[0]
+    return prefix if prefix in ('wechat', 'zhihu', 'x') else None
+
+
+def body_of(html):
+    match = re.search(r'<body[^>]*>(.*)</body>', html, re.S | re.I)
+    return match.group(1) if match else html
+
+
+def scale(body, target_bytes):
+    unit = len(body.encode('utf-8'))
+    return body * max(1, target_bytes // unit)
+
+
+def nest(body, target_bytes):
+    # 每份正文都包在 NESTING_DEPTH 层 section/blockquote/strong 中
+    opening = '<section><blockquote><span><strong>' * (NESTING_DEPTH // 4)
+    closing = '</strong></span></blockquote></section>' * (NESTING_DEPTH // 4)
+    return scale(opening + body + closing, target_bytes)
+
+
+def measure(html, platform_id, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        markdown, image_urls = html_to_markdown(html, platforms.get(platform_id).image_src)
+        best = min(best, time.perf_counter() - started)
+    return best, len(markdown), len(image_urls)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="html2md 转换基准")
+    parser.add_argument("--corpus", default=str(BENCH_DIR / "fixtures"), help="已保存 HTML 的目录")
+    parser.add_argument("--sizes", default="0.25,1,2", help="扩展测试的目标大小（MB，逗号分隔）")
+    parser.add_argument("--repeat", type=int, default=3, help="每项重复次数，取最快一次")
+    args = parser.parse_args()
+
+    files = sorted(Path(args.corpus).glob("*.html"))
+    if not files:
+        print(f"❌ 语料目录中没有 HTML: {args.corpus}")
+        return 1
+    sizes = [float(s) for s in args.sizes.split(',')]
+
+    print(f"{'fixture':<24}{'variant':<10}{'size':>10}{'time':>10}{'MB/s':>9}{'ms/MB':>9}{'images':>8}")
+    for path in files:
+        html = path.read_text(encoding='utf-8')
+        platform_id = platform_of(path)
+        body = body_of(html)
+
+        cases = [('as-is', html)]
+        for size in sizes:
+            target = int(size * 1024 * 1024)
+            cases.append((f'x{size:g}MB', scale(body, target)))
+            cases.append((f'nest{size:g}MB', nest(body, target)))
+
+        per_mb = {}
+        for variant, source in cases:
+            mb = len(source.encode('utf-8')) / 1024 / 1024
+            elapsed, _, images = measure(source, platform_id, args.repeat)
+            print(f"{path.name:<24}{variant:<10}{mb:>9.2f}M{elapsed * 1000:>8.1f}ms"
+                  f"{mb / elapsed:>9.2f}{elapsed * 1000 / mb:>9.1f}{images:>8}")
+            kind = 'nest' if variant.startswith('nest') else 'flat' if variant != 'as-is' else None
+            if kind:
+                per_mb.setdefault(kind, []).append(elapsed / mb)
+
+        # 最大体积与最小体积的单位耗时之比，接近 1 说明线性扩展
+        for kind, values in per_mb.items():
+            print(f"{'':<24}{kind + ' 线性度':<10}{values[-1] / values[0]:>10.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+图片后处理微基准
+用法：
+    python3 benchmarks/bench_image_post.py [--images 24] [--image-mb 4] [--workers 2]
+
+在临时目录中构造 N 张多帧 GIF（每张约 M MB），分别按以下方式做格式识别 + 完整性校验 + sha256：
+1. inline：直接在事件循环中调用 analyze_image
+2. threads / processes：ImagePostProcessor 的线程池与进程池
+报告总耗时，以及期间事件循环的最大停顿（每 1ms 唤醒一次的计时任务两次唤醒的最大间隔）。
+"""
+
+import sys
+import time
+import struct
+import shutil
+import asyncio
+import argparse
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+import image_post  # noqa: E402
+from image_post import ImagePostProcessor, analyze_image  # noqa: E402
+
+
+def build_gif(size):
+    """每帧 1 个 255 字节的数据子块，帧数按目标大小计算"""
+    head = b'GIF89a' + struct.pack('<HHBBB', 1, 1, 0x80, 0, 0) + b'\x00' * 6
+    frame = b'\x21\xf9\x04\x00\x00\x00\x00\x00' + b'\x2c' + struct.pack('<HHHHB', 0, 0, 1, 1, 0)
+    frame += b'\x02\xff' + b'\x01' * 255 + b'\x00'
+    return head + frame * (size // len(frame)) + b'\x3b'
+
+
+async def measure(name, workdir, count, data, run):
+    paths = []
+    for i in range(count):
+        path = workdir / f"img_{i:02d}.jpg"
+        path.write_bytes(data)
+        paths.append(path)
+
+    lag = 0.0
+
+    async def ticker():
+        nonlocal lag
+        last = time.perf_counter()
+        while True:
+            await asyncio.sleep(0.001)
+            now = time.perf_counter()
+            lag = max(lag, now - last)
+            last = now
+
+    tick = asyncio.create_task(ticker())
+    await asyncio.sleep(0)
+    started = time.perf_counter()
+    await run(paths)
+    elapsed = time.perf_counter() - started
+    # 让计时任务再醒来一次，记下 run 阻塞事件循环的那段间隔
+    await asyncio.sleep(0.005)
+    tick.cancel()
+    print(f"{name:<10} {elapsed:7.2f}s  {count / elapsed:7.1f} 张/s  事件循环最大停顿 {lag * 1000:8.1f}ms")
+    for path in workdir.iterdir():
+        path.unlink()
+
+
+async def bench(args, workdir):
+    data = build_gif(args.image_mb * 1024 * 1024)
+    print(f"📄 {args.images} 张 GIF（每张 {len(data) / 1024 / 1024:.1f} MB），后处理进程数 {args.workers}\n")
+
+    async def inline(paths):
+        for path in paths:
+            analyze_image(path)
+
+    async def pooled(processor, paths):
+        await asyncio.gather(*[processor.process({"filename": p.name, "temp_path": str(p)}) for p in paths])
+
+    await measure("inline", workdir, args.images, data, inline)
+    for name, threshold in (("threads", float('inf')), ("processes", 0)):
+        image_post.PROCESS_THRESHOLD = threshold
+        processor = ImagePostProcessor(args.workers, log=lambda msg: None)
+        try:
+            # 预热：进程池的启动时间不计入
+            await measure(f"{name}*", workdir, 1, data, lambda paths: pooled(processor, paths))
+            await measure(name, workdir, args.images, data, lambda paths: pooled(processor, paths))
+        finally:
+            processor.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="图片后处理微基准")
+    parser.add_argument("--images", type=int, default=24)
+    parser.add_argument("--image-mb", type=int, default=4, help="每张 GIF 的大小（MB）")
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="bench-image-post-"))
+    try:
+        asyncio.run(bench(args, workdir))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+图片引用替换微基准
+用法：
+    python3 benchmarks/bench_placeholders.py [--images 300] [--paragraph-bytes 2000]
+
+构造一篇含 N 张图片的文章，对比：
+1. 旧实现：每张图片一次 content.replace（占位符 / Jina 图片 URL）
+2. 新实现：fill_image_placeholders / rewrite_image_links 单遍替换
+同时校验新实现的正确性：URL 互为前缀时不串号，下载失败的占位符不残留。
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from html2md import fill_image_placeholders, rewrite_image_links  # noqa: E402
+
+
+def build_article(images, paragraph_bytes):
+    paragraph = ("正文内容 " * (paragraph_bytes // 13 + 1))[:paragraph_bytes // 3]
+    placeholder_parts, jina_parts = [], []
+    for i in range(images):
+        placeholder_parts.append(f"{paragraph}\n{{{{IMG_{i}}}}}\n")
+        # img_1 是 img_10 / img_100 的前缀，旧实现会替换错
+        jina_parts.append(f"{paragraph}\n![图{i}](https://pic.example.com/img_{i})\n")
+    return ''.join(placeholder_parts), ''.join(jina_parts)
+
+
+def old_placeholders(content, downloaded):
+    for img_info in downloaded:
+        placeholder = f"{{{{IMG_{img_info['index']}}}}}"
+        content = content.replace(placeholder, f"\n![图片]({img_info['filename']})\n")
+    return content
+
+
+def old_jina(content, downloaded):
+    for img_info in downloaded:
+        content = content.replace(img_info['original_url'], img_info['filename'])
+    return content
+
+
+def best_of(repeat, func, *args):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="图片引用替换微基准")
+    parser.add_argument("--images", type=int, default=300)
+    parser.add_argument("--paragraph-bytes", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    placeholder_content, jina_content = build_article(args.images, args.paragraph_bytes)
+    image_urls = [f"https://pic.example.com/img_{i}" for i in range(args.images)]
+    # 每 10 张模拟一张下载失败
+    downloaded = [
+        {"index": i, "filename": f"img_{i:02d}.jpg", "original_url": url}
+        for i, url in enumerate(image_urls) if i % 10 != 9
+    ]
+    mapping = {img['original_url']: img['filename'] for img in downloaded}
+
+    size_kb = len(placeholder_content.encode('utf-8')) / 1024
+    print(f"📄 {args.images} 张图片，正文约 {size_kb:.0f} KB，其中 {args.images - len(downloaded)} 张下载失败\n")
+
+    old_time, old_result = best_of(args.repeat, old_placeholders, placeholder_content, downloaded)
+    new_time, new_result = best_of(args.repeat, fill_image_placeholders, placeholder_content, downloaded, image_urls)
+    print(f"占位符  旧: {old_time * 1000:8.2f}ms  新: {new_time * 1000:8.2f}ms  加速 {old_time / new_time:6.1f}x")
+    print(f"        旧实现残留占位符 {old_result.count('{{IMG_')} 个，新实现残留 {new_result.count('{{IMG_')} 个")
+    assert '{{IMG_' not in new_result
+
+    old_time, old_result = best_of(args.repeat, old_jina, jina_content, downloaded)
+    new_time, new_result = best_of(args.repeat, rewrite_image_links, jina_content, mapping)
+    print(f"Jina    旧: {old_time * 1000:8.2f}ms  新: {new_time * 1000:8.2f}ms  加速 {old_time / new_time:6.1f}x")
+
+    wrong_old = sum(1 for i in range(args.images) if f"![图{i}](img_{i:02d}.jpg)" not in old_result and i % 10 != 9)
+    wrong_new = sum(1 for i in range(args.images) if f"![图{i}](img_{i:02d}.jpg)" not in new_result and i % 10 != 9)
+    print(f"        前缀串号：旧实现 {wrong_old} 处，新实现 {wrong_new} 处")
+    assert wrong_new == 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
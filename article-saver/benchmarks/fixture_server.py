@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+离线夹具服务器
+用法：
+    python3 benchmarks/fixture_server.py [--port 8899] [--latency 50] [--bandwidth 2048]
+
+以 HTTP 代理的形式替代真实站点：浏览器和 requests 通过 --proxy 指向它后，
+对以下域名的 http:// 请求都由本地夹具应答（https 的 CONNECT 一律拒绝）：
+1. mp.weixin.qq.com / zhuanlan.zhihu.com / www.zhihu.com / x.com：返回 fixtures/ 中录制的文章 HTML，
+   标题前加上 URL 中的文章 ID，保证批量运行时每篇文章落到不同目录
+2. mmbiz.qpic.cn / *.zhimg.com / pbs.twimg.com：按 URL 中的格式返回指定大小的合成图片（带正确的文件头）
+3. r.jina.ai：把知乎夹具转换为 Jina Reader 风格的 Markdown
+可为所有请求注入固定延迟和带宽上限，也可按域名单独设置延迟（如模拟缓慢的 Jina）。
+"""
+
+import re
+import sys
+import time
+import zlib
+import struct
+import argparse
+import threading
+from pathlib import Path
+from urllib.parse import urlparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BENCH_DIR = Path(__file__).parent
+sys.path.insert(0, str(BENCH_DIR.parent / "scripts"))
+
+import platforms  # noqa: E402
+from html2md import html_to_markdown, fill_image_placeholders  # noqa: E402
+
+FIXTURES_DIR = BENCH_DIR / "fixtures"
+DEFAULT_PORT = 8899
+DEFAULT_IMAGE_KB = 200
+WRITE_CHUNK = 16 * 1024
+
+# 平台 → (夹具文件, 夹具中的标题/首句，用于注入文章 ID)
+ARTICLE_FIXTURES = {
+    'wechat': ('wechat.html', '从零实现一个异步爬虫'),
+    'zhihu': ('zhihu.html', '如何评价异步 IO？'),
+    'x': ('x.html', 'Shipped a faster archiver today'),
+}
+IMAGE_HOSTS = ('mmbiz.qpic.cn', 'zhimg.com', 'pbs.twimg.com', 'twimg.com')
+FIXTURE_HOSTS = ('mp.weixin.qq.com', 'zhihu.com', 'x.com') + IMAGE_HOSTS
+
+def png_chunk(kind, data):
+    return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+
+def fixture_image(content_type, size):
+    """结构完整（能通过图片后处理的完整性校验）、总长约为 size 的占位图片，内容以零填充"""
+    if content_type == 'image/png':
+        head = b'\x89PNG\r\n\x1a\n' + png_chunk(b'IHDR', struct.pack('>IIBBBBB', 1, 1, 8, 2, 0, 0, 0))
+        return head + png_chunk(b'IDAT', b'\x00' * max(size - len(head) - 24, 0)) + png_chunk(b'IEND', b'')
+    if content_type == 'image/gif':
+        head = b'GIF89a' + struct.pack('<HHBBB', 1, 1, 0x80, 0, 0) + b'\x00' * 6
+        head += b'\x2c' + struct.pack('<HHHHB', 0, 0, 1, 1, 0) + b'\x02'
+        blocks = max(size - len(head) - 2, 0) // 256
+        return head + (b'\xff' + b'\x00' * 255) * blocks + b'\x00\x3b'
+    if content_type == 'image/webp':
+        body = b'WEBP' + b'VP8 ' + struct.pack('<I', max(size - 20, 0)) + b'\x00' * max(size - 20, 0)
+        return b'RIFF' + struct.pack('<I', len(body)) + body
+    head = b'\xff\xd8\xff\xe0\x00\x10JFIF\x00'
+    return head + b'\x00' * max(size - len(head) - 2, 0) + b'\xff\xd9'
+
+
+HTTPS_FIXTURE_LINK = re.compile(r'https://([a-z0-9.-]*(?:' + '|'.join(re.escape(h) for h in FIXTURE_HOSTS) + r'))')
+
+
+def platform_of(host):
+    if host.endswith('mp.weixin.qq.com'):
+        return 'wechat'
+    if host.endswith('zhihu.com'):
+        return 'zhihu'
+    if host in ('x.com', 'twitter.com', 'www.x.com'):
+        return 'x'
+    return None
+
+
+def image_type(url):
+    lowered = url.lower()
+    for marker, content_type in (('gif', 'image/gif'), ('png', 'image/png'), ('webp', 'image/webp')):
+        if f'wx_fmt={marker}' in lowered or f'format={marker}' in lowered or lowered.split('?')[0].endswith('.' + marker):
+            return content_type
+    return 'image/jpeg'
+
+
+class Fixtures:
+    def __init__(self, fixtures_dir=FIXTURES_DIR, image_kb=DEFAULT_IMAGE_KB):
+        self.pages = {}
+        for platform_id, (filename, title) in ARTICLE_FIXTURES.items():
+            html = (Path(fixtures_dir) / filename).read_text(encoding='utf-8')
+            # 页面中的夹具域名改为 http://，后续图片请求同样经过代理
+            self.pages[platform_id] = (HTTPS_FIXTURE_LINK.sub(r'http://\1', html), title)
+        self.image_bytes = image_kb * 1024
+        self._images = {}
+        self._lock = threading.Lock()
+
+    def article(self, platform_id, article_id):
+        html, title = self.pages[platform_id]
+        return html.replace(title, f"{article_id} {title}")
+
+    def image(self, content_type):
+        with self._lock:
+            if content_type not in self._images:
+                self._images[content_type] = fixture_image(content_type, self.image_bytes)
+            return self._images[content_type]
+
+    def jina(self, target):
+        parsed = urlparse(target)
+        article_id = parsed.path.rstrip('/').rsplit('/', 1)[-1]
+        html = self.article('zhihu', article_id)
+        title = re.search(r'<h1[^>]*>(.*?)</h1>', html, re.S).group(1).strip()
+        content, image_urls = html_to_markdown(html, platforms.get('zhihu').image_src)
+        content = fill_image_placeholders(content, [], image_urls)
+        return f"Title: {title}\n\nURL Source: {target}\n\nMarkdown Content:\n# {title}\n\n{content}\n"
+
+    def route(self, url):
+        """返回 (状态码, Content-Type, 响应体)"""
+        parsed = urlparse(url)
+        host = parsed.hostname or ''
+        if host == 'r.jina.ai':
+            return 200, 'text/markdown; charset=utf-8', self.jina(parsed.path.lstrip('/')).encode('utf-8')
+        if any(host == h or host.endswith('.' + h) for h in IMAGE_HOSTS):
+            content_type = image_type(url)
+            return 200, content_type, self.image(content_type)
+        platform_id = platform_of(host)
+        if platform_id:
+            article_id = parsed.path.rstrip('/').rsplit('/', 1)[-1] or 'index'
+            return 200, 'text/html; charset=utf-8', self.article(platform_id, article_id).encode('utf-8')
+        return 404, 'text/plain; charset=utf-8', b'not found'
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server
+        url = self.path if self.path.startswith('http') else f"http://{self.headers.get('Host', '')}{self.path}"
+        status, content_type, body = server.fixtures.route(url)
+        server.count(urlparse(url).hostname, len(body))
+
+        delay = server.host_latency.get(urlparse(url).hostname, server.latency)
+        if delay:
+            time.sleep(delay)
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        # 页面内 fetch 跨域下载图片时需要
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        self.write_throttled(body)
+
+    def do_CONNECT(self):
+        self.send_response(502)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def write_throttled(self, body):
+        bandwidth = self.server.bandwidth
+        if not bandwidth:
+            self.wfile.write(body)
+            return
+        for start in range(0, len(body), WRITE_CHUNK):
+            chunk = body[start:start + WRITE_CHUNK]
+            self.wfile.write(chunk)
+            time.sleep(len(chunk) / bandwidth)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class FixtureServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port=DEFAULT_PORT, latency=0.0, bandwidth=0, host_latency=None,
+                 image_kb=DEFAULT_IMAGE_KB, fixtures_dir=FIXTURES_DIR, verbose=False):
+        super().__init__(('127.0.0.1', port), FixtureHandler)
+        self.fixtures = Fixtures(fixtures_dir, image_kb)
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.host_latency = host_latency or {}
+        self.verbose = verbose
+        self.requests = {}
+        self.bytes_sent = 0
+        self._stats_lock = threading.Lock()
+
+    @property
+    def proxy_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def count(self, host, size):
+        with self._stats_lock:
+            self.requests[host] = self.requests.get(host, 0) + 1
+            self.bytes_sent += size
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+def parse_host_latency(specs):
+    result = {}
+    for spec in specs or []:
+        host, sep, value = spec.partition('=')
+        if not sep:
+            raise ValueError(f"无效的域名延迟配置: {spec}（格式应为 域名=毫秒）")
+        result[host.strip()] = float(value) / 1000
+    return result
+
+
+def add_server_arguments(parser):
+    parser.add_argument("--latency", type=float, default=0, help="每个请求注入的延迟（毫秒）")
+    parser.add_argument("--bandwidth", type=float, default=0, help="每个连接的带宽上限（KB/s，0 表示不限）")
+    parser.add_argument("--host-latency", action="append", metavar="HOST=MS", help="按域名覆盖延迟，如 r.jina.ai=800")
+    parser.add_argument("--image-kb", type=int, default=DEFAULT_IMAGE_KB, help="合成图片大小（KB）")
+
+
+def server_from_args(args, port=0, verbose=False):
+    return FixtureServer(
+        port=port,
+        latency=args.latency / 1000,
+        bandwidth=args.bandwidth * 1024,
+        host_latency=parse_host_latency(args.host_latency),
+        image_kb=args.image_kb,
+        verbose=verbose,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="离线夹具服务器（HTTP 代理）")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--verbose", action="store_true", help="打印每个请求")
+    add_server_arguments(parser)
+    args = parser.parse_args()
+
+    server = server_from_args(args, args.port, args.verbose)
+    print(f"🧪 夹具服务器已启动: {server.proxy_url}")
+    print(f"   python3 scripts/saver.py http://mp.weixin.qq.com/s/demo --proxy {server.proxy_url} "
+          f"--jina-endpoint http://r.jina.ai --output /tmp/bench-out --data-dir /tmp/bench-data --force")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
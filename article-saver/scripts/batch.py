@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Batch Runner - 批量保存文章
+功能：
+1. 从文件或标准输入读取 URL 列表
+2. 共享一个浏览器实例，按全局/平台两级并发限制调度
+3. 结束时输出每个 URL 的成功/失败汇总
+4. 运行日志：每完成一个 URL 追加一行，中断后重新运行同一批 URL 时跳过已提交的文章，从中断处继续
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import hashlib
+from pathlib import Path
+
+from fetch_index import canonicalize_url
+from bundle import article_exists
+import platforms
+
+JOURNAL_DIRNAME = "runs"
+
+# 全局默认并发；各平台的默认上限由平台插件的 concurrency 声明（知乎反爬最严，默认最保守）
+DEFAULT_CONCURRENCY = 4
+
+
+def read_urls(source):
+    """读取 URL 列表，source 为 '-' 时读取标准输入；忽略空行和 # 注释，按出现顺序去重"""
+    if source == '-':
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(source, encoding='utf-8') as f:
+            lines = f.read().splitlines()
+
+    urls = []
+    seen = set()
+    for line in lines:
+        url = line.strip()
+        if not url or url.startswith('#') or url in seen:
+            continue
+        seen.add(url)
+        urls.append(url)
+    return urls
+
+
+def parse_platform_limits(specs):
+    """解析形如 wechat=2 的平台并发配置"""
+    limits = platforms.default_limits()
+    for spec in specs or []:
+        platform_id, sep, value = spec.partition('=')
+        if not sep or not value.strip().isdigit() or int(value) < 1:
+            raise ValueError(f"无效的平台并发配置: {spec}（格式应为 平台=数量，如 wechat=2）")
+        limits[platform_id.strip()] = int(value)
+    return limits
+
+
+def journal_path(data_dir, source, urls):
+    """同一个 URL 文件（标准输入则按 URL 列表）对应固定的运行日志，重新运行时自动续跑"""
+    key = str(Path(source).resolve()) if source != '-' else '\n'.join(urls)
+    return Path(data_dir) / JOURNAL_DIRNAME / f"{hashlib.sha256(key.encode('utf-8')).hexdigest()[:16]}.jsonl"
+
+
+class RunJournal:
+    """
+    批量运行日志（JSON Lines）：每个 URL 处理完后追加一行并 fsync。
+    重新运行时，记录为成功且目录仍完整的 URL 直接跳过；失败的 URL 重新处理。
+    全部成功后删除日志，之后再运行同一批 URL 按正常的索引规则处理。
+    """
+
+    def __init__(self, path, resume=True):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.completed = {}
+        if resume and self.path.exists():
+            with open(self.path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue      # 中断时写了一半的最后一行
+                    key = canonicalize_url(entry['url'])
+                    if entry['success']:
+                        self.completed[key] = entry
+                    else:
+                        self.completed.pop(key, None)
+        self._file = open(self.path, 'a' if resume else 'w', encoding='utf-8')
+
+    def done(self, url):
+        """返回上次运行中已提交的结果；文章目录已不完整（如被手动删除）时返回 None"""
+        entry = self.completed.get(canonicalize_url(url))
+        if entry and article_exists(entry['save_dir']):
+            return entry
+        return None
+
+    def record(self, result):
+        entry = {key: result.get(key) for key in ('url', 'success', 'save_dir', 'error')}
+        entry['finished_at'] = time.time()
+        self._file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self, remove=False):
+        self._file.close()
+        if remove:
+            self.path.unlink(missing_ok=True)
+
+
+class BatchRunner:
+    def __init__(self, saver, concurrency=DEFAULT_CONCURRENCY, platform_limits=None, journal=None):
+        self.saver = saver
+        self.journal = journal
+        self.concurrency = concurrency
+        self.platform_limits = platform_limits or platforms.default_limits()
+        self._global_slots = asyncio.Semaphore(concurrency)
+        self._platform_slots = {}
+
+    def platform_slots(self, platform_id):
+        if platform_id not in self._platform_slots:
+            limit = self.platform_limits.get(platform_id, self.concurrency)
+            self._platform_slots[platform_id] = asyncio.Semaphore(limit)
+        return self._platform_slots[platform_id]
+
+    async def save_one(self, url, label):
+        _, platform_id = self.saver.identify_platform(url)
+        started = time.monotonic()
+        async with self.platform_slots(platform_id), self._global_slots:
+            self.saver.log(f"\n▶️ [{label}] {url}")
+            with self.saver.tracer.article(url) as trace:
+                try:
+                    result = await self.saver.scrape(url)
+                    if not result.get('success'):
+                        trace.status, trace.error = 'failed', result.get('error')
+                        return {"url": url, "success": False, "error": result.get('error'),
+                                "elapsed": time.monotonic() - started}
+                    # 已保存过的文章直接跳过
+                    save_dir = result.get('save_dir')
+                    if save_dir is None:
+                        save_dir = await asyncio.to_thread(self.saver.save, result, url)
+                    trace.status = 'skipped' if result.get('skipped') else 'ok'
+                    return {"url": url, "success": True, "save_dir": save_dir,
+                            "skipped": result.get('skipped', False),
+                            "elapsed": time.monotonic() - started}
+                except Exception as e:
+                    trace.status, trace.error = 'failed', str(e)
+                    return {"url": url, "success": False, "error": str(e),
+                            "elapsed": time.monotonic() - started}
+
+    async def run(self, urls):
+        total = len(urls)
+
+        async def one(i, url):
+            result = await self.save_one(url, f"{i + 1}/{total}")
+            if self.journal:
+                self.journal.record(result)
+            return result
+
+        return await asyncio.gather(*(one(i, url) for i, url in enumerate(urls)))
+
+    @staticmethod
+    def print_summary(results, elapsed):
+        ok = [r for r in results if r['success']]
+        failed = [r for r in results if not r['success']]
+        skipped = [r for r in ok if r.get('skipped')]
+
+        print("\n" + "=" * 60)
+        print(f"📊 批量保存完成: 成功 {len(ok)}（其中跳过 {len(skipped)}）/ 失败 {len(failed)} / 共 {len(results)}，耗时 {elapsed:.1f}s")
+        for r in results:
+            if r.get('resumed'):
+                print(f"  ⏭️ {r['url']} -> {r['save_dir']}（上次运行已完成）")
+            elif r.get('skipped'):
+                print(f"  ⏭️ {r['url']} -> {r['save_dir']}（已保存过）")
+            elif r['success']:
+                print(f"  ✅ {r['url']} -> {r['save_dir']} ({r['elapsed']:.1f}s)")
+            else:
+                print(f"  ❌ {r['url']}: {r['error']}")
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Browser Pool - 长期存活的 Chromium 实例
+功能：
+1. 整个运行期间只启动一次浏览器
+2. 按平台复用 context（登录态只加载一次）
+3. 通过信号量限制同时打开的页面数量
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from tracing import span
+
+
+class BrowserPool:
+    def __init__(self, max_pages=4, headless=True, proxy=None):
+        self.max_pages = max_pages
+        self.headless = headless
+        self.proxy = proxy
+        self._playwright = None
+        self._browser = None
+        self._contexts = {}
+        self._context_lock = asyncio.Lock()
+        self._page_slots = asyncio.Semaphore(max_pages)
+
+    async def start(self):
+        if self._browser is None:
+            with span('launch'):
+                # Playwright 只在真正需要浏览器时才导入，Jina / HTTP 快速通道和命令行帮助无需加载
+                from playwright.async_api import async_playwright
+                self._playwright = await async_playwright().start()
+                launch_args = {"headless": self.headless}
+                if self.proxy:
+                    launch_args["proxy"] = {"server": self.proxy}
+                self._browser = await self._playwright.chromium.launch(**launch_args)
+        return self
+
+    async def close(self):
+        for context in self._contexts.values():
+            try:
+                await context.close()
+            except Exception:
+                pass
+        self._contexts.clear()
+        if self._browser is not None:
+            await self._browser.close()
+            self._browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    async def __aenter__(self):
+        # 浏览器在第一次需要页面时才启动：全部走 HTTP 快速通道 / Jina 的批次不必启动 Chromium
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def get_context(self, platform_id, context_args):
+        # 同一平台共享一个 context，避免重复加载 storage_state
+        async with self._context_lock:
+            context = self._contexts.get(platform_id)
+            if context is None:
+                await self.start()
+                with span('new_context'):
+                    context = await self._browser.new_context(**context_args)
+                self._contexts[platform_id] = context
+            return context
+
+    @asynccontextmanager
+    async def page(self, platform_id, context_args):
+        async with self._page_slots:
+            context = await self.get_context(platform_id, context_args)
+            with span('new_page'):
+                page = await context.new_page()
+            try:
+                yield page
+            finally:
+                try:
+                    await page.close()
+                except Exception:
+                    pass
@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+"""
+Bundle - 打包输出格式
+功能：
+1. --bundle article：每篇文章打包为 {Platform}/{Date}_{Title}.zip；
+   --bundle day：同一平台同一天的文章追加到 {Platform}/{Date}.zip
+2. 包内沿用文件夹布局 {Date}_{Title}/content.md、img_NN.*，zip 中央目录即索引；
+   包只追加不改写，重新抓取后旧版本标记为已替换，列出、检索和导出时跳过
+3. 条目不压缩（ZIP_STORED），读取时 mmap 整个文件，按偏移直接切出单张图片
+4. 追加前备份旧的中央目录，写入中途被中断时恢复到追加前的状态；
+   读取期间持有共享锁，追加时持有排他锁，其他进程读取时不会看到写了一半的中央目录
+5. 导出回文件夹布局
+
+包内文章的路径记为 {包路径}/{文章目录名}，如 素材/知乎/2026-10-17.zip/2026-10-17_标题，
+抓取索引、检索索引和批量运行日志中都使用这种路径。
+
+用法：
+    python3 scripts/bundle.py list 素材/知乎/2026-10-17.zip
+    python3 scripts/bundle.py cat 素材/知乎/2026-10-17.zip 2026-10-17_标题/img_00.jpg > img_00.jpg
+    python3 scripts/bundle.py export 素材/知乎/*.zip [--to 归档根目录] [--remove]
+"""
+
+import os
+import sys
+import mmap
+import time
+import fcntl
+import shutil
+import struct
+import zipfile
+import argparse
+import itertools
+from pathlib import Path
+from contextlib import contextmanager
+
+from staging import StagingArea
+from image_post import PREVIEW_DIRNAME
+
+BUNDLE_SUFFIX = ".zip"
+BUNDLE_MODES = ('article', 'day')
+TAIL_SUFFIX = ".tail"            # 追加期间备份的旧中央目录
+SUPERSEDED_MARKER = ".superseded"  # 重新抓取后旧版本仍留在包内，用空条目 {文章目录}/.superseded 标记
+LOCAL_HEADER = struct.Struct('<4s2B4HL2L2H')
+LOCAL_HEADER_SIGNATURE = b'PK\x03\x04'
+
+
+def tail_path(bundle):
+    return bundle.with_name(bundle.name + TAIL_SUFFIX)
+
+
+def locate(save_dir):
+    """包内文章路径 → (包文件, 文章目录名)；普通文件夹返回 None"""
+    save_dir = Path(save_dir)
+    bundle = save_dir.parent
+    if bundle.suffix == BUNDLE_SUFFIX and bundle.is_file():
+        return bundle, save_dir.name
+    return None
+
+
+def article_exists(save_dir):
+    """文章（文件夹或包内）是否完整存在"""
+    located = locate(save_dir)
+    if located is None:
+        return (Path(save_dir) / "content.md").exists()
+    bundle, folder = located
+    try:
+        with BundleReader(bundle) as reader:
+            return folder in reader.articles()
+    except (OSError, zipfile.BadZipFile):
+        return False
+
+
+def read_content(save_dir):
+    """返回 (content.md 文本, mtime)；包内文章的 mtime 取 zip 条目记录的时间，后续追加其他文章不会改变它"""
+    located = locate(save_dir)
+    if located is None:
+        md_file = Path(save_dir) / "content.md"
+        return md_file.read_text(encoding='utf-8', errors='replace'), md_file.stat().st_mtime
+    bundle, folder = located
+    with BundleReader(bundle) as reader:
+        return reader.read_text(f"{folder}/content.md"), reader.mtime(f"{folder}/content.md")
+
+
+def restore_tail(f, bundle):
+    """
+    调用方已持有包文件的锁。备份仍存在说明上次追加没有走完：
+    新的中央目录已完整写入（位于备份的偏移之后）时只删除备份，否则截断新写入的部分并写回旧的中央目录
+    """
+    backup = tail_path(bundle)
+    if not backup.exists():
+        return False
+    data = backup.read_bytes()
+    offset, = struct.unpack('<Q', data[:8])
+    try:
+        with zipfile.ZipFile(f) as zf:
+            if zf.start_dir > offset:
+                backup.unlink()
+                return False
+    except zipfile.BadZipFile:
+        pass
+    f.seek(offset)
+    f.truncate()
+    f.write(data[8:])
+    f.flush()
+    os.fsync(f.fileno())
+    backup.unlink()
+    return True
+
+
+def recover(bundle):
+    """恢复中断的追加，返回是否做了恢复"""
+    if not tail_path(bundle).exists():
+        return False
+    with open(bundle, 'r+b') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        return restore_tail(f, bundle)
+
+
+class BundleReader:
+    """
+    只读访问一个包：中央目录由 zipfile 解析，条目内容从 mmap 中按偏移切片，不复制整个文件。
+    打开期间持有包文件的共享锁，追加写入（改写中央目录）要等所有读取方关闭后才能进行
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        while True:
+            if tail_path(self.path).exists():
+                recover(self.path)
+            self._file = open(self.path, 'rb')
+            fcntl.flock(self._file, fcntl.LOCK_SH)
+            # 拿到共享锁时仍有备份，说明追加写入在中途退出（写入方持有排他锁期间无法拿到共享锁），先恢复再读
+            if not tail_path(self.path).exists():
+                break
+            self._file.close()
+        size = os.fstat(self._file.fileno()).st_size
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        try:
+            self._zip = zipfile.ZipFile(self._file) if size else None
+        except BaseException:
+            self._mmap.close()
+            self._file.close()
+            raise
+        self._entries = {info.filename: info for info in self._zip.infolist()} if size else {}
+        self._offsets = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._zip:
+            self._zip.close()
+        if self._mmap:
+            self._mmap.close()
+        self._file.close()
+
+    def __contains__(self, name):
+        return name in self._entries
+
+    def names(self):
+        return list(self._entries)
+
+    def size(self, name):
+        return self._entries[name].file_size
+
+    def mtime(self, name):
+        return time.mktime(self._entries[name].date_time + (0, 0, -1))
+
+    def articles(self):
+        """包内有效的文章目录名（含 content.md 且未被替换的目录），按写入顺序"""
+        return [name[:-len("/content.md")] for name in self._entries
+                if name.endswith("/content.md") and name[:-len("content.md")] + SUPERSEDED_MARKER not in self._entries]
+
+    def members(self, folder):
+        """某篇文章的全部文件名（不含目录前缀）"""
+        prefix = folder + '/'
+        return [name[len(prefix):] for name in self._entries if name.startswith(prefix)]
+
+    def _data_offset(self, info):
+        offset = self._offsets.get(info.filename)
+        if offset is None:
+            # 本地文件头里的文件名/扩展字段长度可能与中央目录不同，以本地文件头为准
+            header = LOCAL_HEADER.unpack_from(self._mmap, info.header_offset)
+            if header[0] != LOCAL_HEADER_SIGNATURE:
+                raise zipfile.BadZipFile(f"本地文件头损坏: {info.filename}")
+            offset = info.header_offset + LOCAL_HEADER.size + header[10] + header[11]
+            self._offsets[info.filename] = offset
+        return offset
+
+    def read(self, name):
+        """返回条目内容的 memoryview（用完后 release）；不压缩的条目直接切片 mmap，不复制数据"""
+        info = self._entries.get(name)
+        if info is None:
+            raise KeyError(name)
+        if info.compress_type != zipfile.ZIP_STORED:
+            return memoryview(self._zip.read(name))
+        start = self._data_offset(info)
+        return memoryview(self._mmap)[start:start + info.file_size]
+
+    def read_bytes(self, name):
+        with self.read(name) as data:
+            return data.tobytes()
+
+    def read_text(self, name):
+        return self.read_bytes(name).decode('utf-8', errors='replace')
+
+
+class BundleWriter:
+    def __init__(self, mode='article', log=print):
+        if mode not in BUNDLE_MODES:
+            raise ValueError(f"未知的打包方式: {mode}（可选 {', '.join(BUNDLE_MODES)}）")
+        self.mode = mode
+        self.log = log
+
+    @staticmethod
+    def files(staging_dir):
+        """
+        按写入顺序返回要打包的文件（相对暂存目录的路径）：content.md 在前，图片按文件名排序，
+        previews/ 中的预览图在最后；跳过 .origin 等隐藏文件
+        """
+        files = sorted(p.relative_to(staging_dir) for p in staging_dir.iterdir()
+                       if p.is_file() and not p.name.startswith('.'))
+        previews = staging_dir / PREVIEW_DIRNAME
+        if previews.is_dir():
+            files += sorted(p.relative_to(staging_dir) for p in previews.iterdir() if p.is_file())
+        return sorted(files, key=lambda p: p.name != "content.md")
+
+    def commit(self, staging_dir, base, replace=None):
+        """
+        把暂存目录打包提交，base 为文件夹布局下的目标目录 {ROOT}/{Platform}/{Date}_{Title}，返回包内文章路径。
+        replace 为重新抓取时上次保存的路径：上次是单篇包时原地替换；按天打包只追加，旧版本保留在原来的包中。
+        """
+        base.parent.mkdir(parents=True, exist_ok=True)
+        if self.mode == 'day':
+            save_dir = self.append(staging_dir, base.parent / (base.name.split('_', 1)[0] + BUNDLE_SUFFIX), base.name)
+        else:
+            save_dir = self.pack(staging_dir, base, replace)
+        shutil.rmtree(staging_dir, ignore_errors=True)
+
+        located = locate(replace) if replace else None
+        if located and located[0] / located[1] != save_dir:
+            self.retire(*located)
+        return save_dir
+
+    def write_members(self, zf, staging_dir, folder):
+        for path in self.files(staging_dir):
+            zf.write(staging_dir / path, f"{folder}/{path.as_posix()}", compress_type=zipfile.ZIP_STORED)
+
+    def write_tmp(self, staging_dir, folder):
+        """在暂存区写好整个 zip，返回临时文件路径"""
+        tmp = staging_dir.with_name(staging_dir.name + BUNDLE_SUFFIX)
+        with open(tmp, 'wb') as f:
+            with zipfile.ZipFile(f, 'w', zipfile.ZIP_STORED) as zf:
+                self.write_members(zf, staging_dir, folder)
+            f.flush()
+            os.fsync(f.fileno())
+        return tmp
+
+    def pack(self, staging_dir, base, replace=None):
+        """单篇包：写好后 link 到最终位置（同名已存在时依次尝试 _2、_3……）；上次保存为单篇包时原地替换"""
+        located = locate(replace) if replace else None
+        if located:
+            bundle, folder = located
+            with BundleReader(bundle) as reader:
+                single = reader.articles() == [folder]
+            if single:
+                os.replace(self.write_tmp(staging_dir, folder), bundle)
+                return bundle / folder
+
+        tmp = self.write_tmp(staging_dir, base.name)
+        try:
+            for n in itertools.count(1):
+                candidate = base.with_name(base.name + BUNDLE_SUFFIX if n == 1 else f"{base.name}_{n}{BUNDLE_SUFFIX}")
+                # link 不会覆盖已存在的文件，多个进程同时提交同名文章也不会互相覆盖
+                try:
+                    os.link(tmp, candidate)
+                    return candidate / base.name
+                except FileExistsError:
+                    continue
+        finally:
+            tmp.unlink(missing_ok=True)
+
+    @contextmanager
+    def appending(self, bundle):
+        """持有文件锁以追加模式打开包；新条目会覆盖旧的中央目录，写入前先把它原样备份，全部落盘后删除备份"""
+        fd = os.open(bundle, os.O_RDWR | os.O_CREAT, 0o644)
+        with os.fdopen(fd, 'r+b') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            if restore_tail(f, bundle):
+                self.log(f"🧹 已恢复中断的打包写入: {bundle}")
+
+            backup = tail_path(bundle)
+            with zipfile.ZipFile(f, 'a', zipfile.ZIP_STORED) as zf:
+                # 备份写临时文件后 rename，备份存在即完整
+                offset = zf.start_dir
+                f.seek(offset)
+                tmp = backup.with_name(backup.name + '.tmp')
+                with open(tmp, 'wb') as out:
+                    out.write(struct.pack('<Q', offset) + f.read())
+                    out.flush()
+                    os.fsync(out.fileno())
+                os.rename(tmp, backup)
+                f.seek(offset)
+                yield zf
+            f.flush()
+            os.fsync(f.fileno())
+            backup.unlink()
+
+    def append(self, staging_dir, bundle, folder):
+        """按天打包：追加到当天的包，同名文章依次改为 _2、_3……"""
+        with self.appending(bundle) as zf:
+            existing = {name.split('/', 1)[0] for name in zf.namelist()}
+            name = folder
+            for n in itertools.count(2):
+                if name not in existing:
+                    break
+                name = f"{folder}_{n}"
+            self.write_members(zf, staging_dir, name)
+        return bundle / name
+
+    def retire(self, bundle, folder):
+        """重新抓取后的旧版本：追加一个空的标记条目，之后列出、检索和导出时都跳过它"""
+        with self.appending(bundle) as zf:
+            if f"{folder}/{SUPERSEDED_MARKER}" not in zf.NameToInfo:
+                zf.writestr(f"{folder}/{SUPERSEDED_MARKER}", b'')
+
+
+def export_bundle(bundle, root, log=print):
+    """把包内的文章还原为 {root}/{Platform}/{文章目录}/，同名目录已存在时依次尝试 _2、_3……，返回导出的目录"""
+    staging = StagingArea(root, log=log)
+    platform_dir = Path(root) / bundle.parent.name
+    exported = []
+    with BundleReader(bundle) as reader:
+        for folder in reader.articles():
+            staging_dir = staging.create()
+            try:
+                for name in reader.members(folder):
+                    target = staging_dir / name
+                    target.parent.mkdir(exist_ok=True)
+                    with reader.read(f"{folder}/{name}") as data:
+                        target.write_bytes(data)
+                exported.append(staging.commit(staging_dir, platform_dir / folder))
+            except BaseException:
+                staging.discard(staging_dir)
+                raise
+    return exported
+
+
+def main():
+    parser = argparse.ArgumentParser(description="查看、读取和导出打包保存的文章")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("list", help="列出包内的文章和文件")
+    p.add_argument("bundle")
+    p = sub.add_parser("cat", help="把包内的一个文件写到标准输出")
+    p.add_argument("bundle")
+    p.add_argument("name", help="包内路径，如 2026-10-17_标题/img_00.jpg")
+    p = sub.add_parser("export", help="导出回文件夹布局 {归档根目录}/{平台}/{文章目录}/")
+    p.add_argument("bundles", nargs="+")
+    p.add_argument("--to", metavar="DIR", help="归档根目录（默认为包所在归档，即包文件的上两级目录）")
+    p.add_argument("--remove", action="store_true", help="导出成功后删除包文件")
+    args = parser.parse_args()
+
+    if args.command == "list":
+        with BundleReader(args.bundle) as reader:
+            for folder in reader.articles():
+                print(f"📦 {folder}")
+                for name in reader.members(folder):
+                    print(f"     {name}  {reader.size(f'{folder}/{name}')} B")
+        return 0
+
+    if args.command == "cat":
+        with BundleReader(args.bundle) as reader:
+            if args.name not in reader:
+                print(f"❌ 包内没有 {args.name}", file=sys.stderr)
+                return 1
+            with reader.read(args.name) as data:
+                sys.stdout.buffer.write(data)
+        return 0
+
+    for bundle in map(Path, args.bundles):
+        root = Path(args.to) if args.to else bundle.resolve().parent.parent
+        exported = export_bundle(bundle, root)
+        print(f"📂 {bundle} → 导出 {len(exported)} 篇")
+        for path in exported:
+            print(f"  ✅ {path}")
+        if args.remove:
+            bundle.unlink()
+    print("💡 导出后的路径已变化，可运行 python3 scripts/search.py --reindex 更新检索索引")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Saver Client - 守护进程的轻量客户端
+功能：
+1. 把 URL 提交给 saver.py --daemon 启动的守护进程，默认等待任务完成并打印结果
+2. 仅依赖标准库，启动开销远小于直接运行 saver.py
+3. 守护进程不可达（或等待结果时连接中断）时自动回退为直接运行 saver.py（单次启动浏览器）
+"""
+
+import sys
+import json
+import time
+import socket
+import argparse
+import subprocess
+import http.client
+from pathlib import Path
+
+# 与 daemon.py 保持一致；不从 daemon 导入，避免加载抓取索引、打包、平台插件等模块
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8787
+DEFAULT_PRIORITY = 10
+
+SAVER_SCRIPT = Path(__file__).parent / "saver.py"
+POLL_SECONDS = 30
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, socket_path, timeout=None):
+        super().__init__('localhost', timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+class SaverClient:
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, socket_path=None):
+        self.host = host
+        self.port = port
+        self.socket_path = socket_path
+
+    def request(self, method, path, payload=None, timeout=10):
+        if self.socket_path:
+            conn = UnixHTTPConnection(self.socket_path, timeout=timeout)
+        else:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=timeout)
+        try:
+            body = json.dumps(payload).encode('utf-8') if payload is not None else None
+            headers = {'Content-Type': 'application/json'} if body else {}
+            conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            data = json.loads(response.read() or b'{}')
+        finally:
+            conn.close()
+        if response.status >= 400:
+            raise RuntimeError(data.get('error', f"HTTP {response.status}"))
+        return data
+
+    def submit(self, url, priority=DEFAULT_PRIORITY):
+        return self.request('POST', '/jobs', {"url": url, "priority": priority})
+
+    def wait(self, job_id, timeout=None):
+        deadline = time.time() + timeout if timeout else None
+        while True:
+            wait = POLL_SECONDS if deadline is None else max(0, min(POLL_SECONDS, deadline - time.time()))
+            job = self.request('GET', f'/jobs/{job_id}?wait={wait:.0f}', timeout=wait + 10)
+            if job['status'] in ('done', 'failed'):
+                return job
+            if deadline is not None and time.time() >= deadline:
+                return job
+
+
+def run_directly(url, reason="守护进程不可达"):
+    print(f"⚠️ {reason}，直接运行 saver.py")
+    return subprocess.call([sys.executable, str(SAVER_SCRIPT), url])
+
+
+def print_job(job):
+    result = job.get('result') or {}
+    if job['status'] == 'done':
+        if result.get('skipped'):
+            print(f"⏭️ 已保存过，跳过: {result.get('save_dir')}")
+        else:
+            print(f"✅ 保存成功！耗时 {result.get('elapsed', 0):.1f}s")
+            print(f"📁 位置: {result.get('save_dir')}")
+    elif job['status'] == 'failed':
+        print(f"❌ 保存失败: {result.get('error', '未知错误')}")
+    else:
+        print(f"⏳ 任务 {job['id']} 仍在{'排队' if job['status'] == 'queued' else '执行'}中")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="向 Article Saver 守护进程提交文章")
+    parser.add_argument("url", help="文章URL")
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"守护进程地址（默认 {DEFAULT_HOST}）")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"守护进程端口（默认 {DEFAULT_PORT}）")
+    parser.add_argument("--socket", metavar="PATH", help="通过 Unix socket 连接守护进程")
+    parser.add_argument("--priority", type=int, default=DEFAULT_PRIORITY, help="任务优先级，数字越小越优先")
+    parser.add_argument("--no-wait", action="store_true", help="提交后立即返回，不等待结果")
+    parser.add_argument("--timeout", type=float, help="最长等待秒数（默认一直等待）")
+    parser.add_argument("--no-fallback", action="store_true", help="守护进程不可达时不回退到直接运行")
+    args = parser.parse_args()
+
+    client = SaverClient(args.host, args.port, args.socket)
+    try:
+        job = client.submit(args.url, args.priority)
+    except (OSError, http.client.HTTPException) as e:
+        if args.no_fallback:
+            print(f"❌ 无法连接守护进程: {str(e)}")
+            return 1
+        return run_directly(args.url)
+    except RuntimeError as e:
+        print(f"❌ {str(e)}")
+        return 1
+
+    note = "（已有相同任务，直接复用）" if job.get('deduplicated') else ""
+    print(f"📨 已提交任务 {job['id']}{note}")
+    if args.no_wait:
+        return 0
+
+    try:
+        job = client.wait(job['id'], args.timeout)
+    except (OSError, http.client.HTTPException) as e:
+        # 守护进程在任务执行中退出：已保存的部分由 saver.py 的抓取索引跳过
+        if args.no_fallback:
+            print(f"❌ 等待结果时与守护进程的连接中断: {str(e)}")
+            return 1
+        return run_directly(args.url, "等待结果时与守护进程的连接中断")
+    print_job(job)
+    return 0 if job['status'] == 'done' else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Saver Daemon - 常驻进程 + 本地任务队列
+功能：
+1. 进程常驻，浏览器和各平台 context 预热后一直保持，单次保存只剩提取耗时
+2. 本地 HTTP（TCP 或 Unix socket）JSON 接口：提交 URL、查询任务状态、获取结果
+3. asyncio 优先级队列；同一 URL 已在排队或执行中时直接返回已有任务
+
+接口：
+    POST /jobs                {"url": "...", "priority": 10}  → 任务信息（数字越小越优先）
+    GET  /jobs/<id>?wait=30   任务信息，wait 为长轮询秒数，任务结束或超时即返回
+    GET  /jobs                最近的任务列表
+    GET  /health              运行状态
+    GET  /metrics             Prometheus 文本格式的阶段耗时与图片指标
+"""
+
+import json
+import time
+import asyncio
+import itertools
+from pathlib import Path
+from urllib.parse import urlparse, parse_qs
+
+from fetch_index import canonicalize_url
+import platforms
+
+# client.py 中有同样的默认值
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8787
+DEFAULT_PRIORITY = 10
+MAX_FINISHED_JOBS = 1000
+MAX_WAIT_SECONDS = 300
+
+METRICS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+OPENMETRICS_CONTENT_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+HTTP_REASONS = {200: 'OK', 202: 'Accepted', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed'}
+
+
+class Job:
+    def __init__(self, job_id, url, priority):
+        self.id = job_id
+        self.url = url
+        self.priority = priority
+        self.status = 'queued'
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.result = None
+        self.done = asyncio.Event()
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "url": self.url,
+            "priority": self.priority,
+            "status": self.status,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "result": self.result,
+        }
+
+
+class SaverDaemon:
+    def __init__(self, runner, pool, workers):
+        self.runner = runner
+        self.saver = runner.saver
+        self.pool = pool
+        self.workers = workers
+        self.jobs = {}
+        self.active = {}          # 规范化 URL → 排队或执行中的 Job
+        self.queue = asyncio.PriorityQueue()
+        self._ids = itertools.count(1)
+        self._seq = itertools.count()
+        self._tasks = []
+        self.started_at = time.time()
+
+    # -- 队列 --
+
+    def submit(self, url, priority=DEFAULT_PRIORITY):
+        key = canonicalize_url(url)
+        existing = self.active.get(key)
+        if existing is not None:
+            return existing, True
+
+        job = Job(next(self._ids), url, priority)
+        self.jobs[job.id] = job
+        self.active[key] = job
+        self.queue.put_nowait((priority, next(self._seq), job))
+        return job, False
+
+    async def worker(self):
+        while True:
+            _, _, job = await self.queue.get()
+            job.status = 'running'
+            job.started_at = time.time()
+            try:
+                job.result = await self.runner.save_one(job.url, f"job {job.id}")
+                job.status = 'done' if job.result['success'] else 'failed'
+            except Exception as e:
+                job.result = {"url": job.url, "success": False, "error": str(e)}
+                job.status = 'failed'
+            finally:
+                job.finished_at = time.time()
+                self.active.pop(canonicalize_url(job.url), None)
+                job.done.set()
+                self.queue.task_done()
+                self.prune()
+
+    def prune(self):
+        finished = sorted((job for job in self.jobs.values() if job.finished_at), key=lambda j: j.finished_at)
+        for job in finished[:max(len(finished) - MAX_FINISHED_JOBS, 0)]:
+            del self.jobs[job.id]
+
+    async def warm_up(self):
+        # 预先创建各平台 context（加载登录态），首个请求无需再等待
+        for platform_id in platforms.registry():
+            try:
+                await self.pool.get_context(platform_id, self.saver.build_context_args(platform_id))
+            except Exception as e:
+                self.saver.log(f"⚠️ 预热 {platform_id} 失败: {str(e)}")
+
+    async def start(self):
+        await self.pool.start()
+        await self.warm_up()
+        self._tasks = [asyncio.create_task(self.worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    # -- HTTP --
+
+    async def handle_request(self, method, target, body, headers=None):
+        parsed = urlparse(target)
+        parts = [p for p in parsed.path.split('/') if p]
+        query = parse_qs(parsed.query)
+
+        if parts == ['metrics'] and method == 'GET':
+            openmetrics = 'openmetrics' in (headers or {}).get('accept', '')
+            self.saver.tracer.finish_run()
+            return 200, self.saver.tracer.metrics_text(openmetrics)
+
+        if parts == ['health'] and method == 'GET':
+            return 200, {
+                "status": "ok",
+                "uptime": round(time.time() - self.started_at, 1),
+                "queued": self.queue.qsize(),
+                "active": len(self.active),
+                "jobs": len(self.jobs),
+                "rate_limits": self.runner.saver.rate_limiter.state(),
+            }
+
+        if parts == ['jobs']:
+            if method == 'GET':
+                return 200, {"jobs": [job.to_dict() for job in self.jobs.values()]}
+            if method != 'POST':
+                return 405, {"error": "method not allowed"}
+            try:
+                payload = json.loads(body or b'{}')
+                url = payload['url']
+                priority = int(payload.get('priority', DEFAULT_PRIORITY))
+            except (ValueError, KeyError, TypeError):
+                return 400, {"error": "请求体应为 JSON：{\"url\": \"...\", \"priority\": 10}"}
+            if urlparse(url).scheme not in ('http', 'https'):
+                return 400, {"error": f"无效的 URL: {url}"}
+            job, deduplicated = self.submit(url, priority)
+            return 202, {**job.to_dict(), "deduplicated": deduplicated}
+
+        if len(parts) == 2 and parts[0] == 'jobs' and parts[1].isdigit() and method == 'GET':
+            job = self.jobs.get(int(parts[1]))
+            if job is None:
+                return 404, {"error": "job not found"}
+            wait = min(float(query.get('wait', ['0'])[0] or 0), MAX_WAIT_SECONDS)
+            if wait > 0 and not job.done.is_set():
+                try:
+                    await asyncio.wait_for(job.done.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+            return 200, job.to_dict()
+
+        return 404, {"error": "not found"}
+
+    async def handle_connection(self, reader, writer):
+        try:
+            request_line = (await reader.readline()).decode('latin-1').strip()
+            if not request_line:
+                return
+            method, target, _ = request_line.split(' ', 2)
+            headers = {}
+            while True:
+                line = (await reader.readline()).decode('latin-1')
+                if line in ('\r\n', '\n', ''):
+                    break
+                name, _, value = line.partition(':')
+                headers[name.strip().lower()] = value.strip()
+            length = int(headers.get('content-length', 0) or 0)
+            body = await reader.readexactly(length) if length else b''
+
+            status, payload = await self.handle_request(method.upper(), target, body, headers)
+        except Exception as e:
+            status, payload = 400, {"error": str(e)}
+
+        if isinstance(payload, str):
+            # /metrics 返回纯文本
+            data = payload.encode('utf-8')
+            content_type = OPENMETRICS_CONTENT_TYPE if payload.endswith('# EOF\n') else METRICS_CONTENT_TYPE
+        else:
+            data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+            content_type = 'application/json; charset=utf-8'
+        writer.write(
+            f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            f"Connection: close\r\n\r\n".encode('latin-1') + data
+        )
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+
+async def serve(daemon, host=DEFAULT_HOST, port=DEFAULT_PORT, socket_path=None):
+    await daemon.start()
+    if socket_path:
+        # 清理上次异常退出遗留的 socket 文件
+        Path(socket_path).unlink(missing_ok=True)
+        server = await asyncio.start_unix_server(daemon.handle_connection, path=socket_path)
+        address = socket_path
+    else:
+        server = await asyncio.start_server(daemon.handle_connection, host=host, port=port)
+        address = f"http://{host}:{port}"
+
+    print(f"🛰️ Article Saver 守护进程已启动: {address}（{daemon.workers} 个 worker）")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await daemon.stop()
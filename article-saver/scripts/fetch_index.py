@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Fetch Index - 已保存文章的本地索引
+功能：
+1. 规范化 URL → 保存目录、正文哈希、ETag/Last-Modified、抓取时间
+2. 记录每篇文章图片 URL → 本地文件名，重新抓取时只需更新正文
+3. 支持判断记录是否过期，配合 --force / --max-age 跳过重复抓取
+"""
+
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
+
+import platforms
+from bundle import article_exists
+
+# 多进程分片运行时多个进程共用同一个数据库，写锁等待时间放宽
+SQLITE_TIMEOUT = 30
+
+# 分享/统计参数，不影响文章内容
+TRACKING_PARAMS = {
+    'chksm', 'scene', 'srcid', 'sharer_sharetime', 'sharer_shareid', 'sharer_shareinfo',
+    'sharer_shareinfo_first', 'share_source', 'from', 'clicktime', 'enterid', 'ascene',
+    'devicetype', 'version', 'lang', 'nettype', 'abtest_cookie', 'pass_ticket', 'wx_header',
+    'exportkey', 'acctmode', 'utm_source', 'utm_medium', 'utm_campaign', 'utm_term',
+    'utm_content', 'utm_psn', 'utm_id', 's', 't', 'ref_src', 'ref_url',
+}
+
+
+def canonicalize_url(url):
+    parsed = urlparse(url.strip())
+    netloc = platforms.canonical_host(parsed.netloc.lower())
+    query = sorted((k, v) for k, v in parse_qsl(parsed.query, keep_blank_values=True)
+                   if k.lower() not in TRACKING_PARAMS)
+    path = parsed.path.rstrip('/') or '/'
+    return urlunparse(('https', netloc, path, '', urlencode(query), ''))
+
+
+def content_hash(content):
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+class FetchIndex:
+    def __init__(self, db_path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.db_path), check_same_thread=False, timeout=SQLITE_TIMEOUT)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS articles (
+                url TEXT PRIMARY KEY,
+                save_dir TEXT NOT NULL,
+                content_hash TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL,
+                images TEXT NOT NULL DEFAULT '{}'
+            )
+        """)
+        self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def get(self, url):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT * FROM articles WHERE url = ?", (canonicalize_url(url),)
+            ).fetchone()
+        if row is None:
+            return None
+        record = dict(row)
+        record['images'] = json.loads(record['images'])
+        return record
+
+    def record(self, url, save_dir, content_hash, etag=None, last_modified=None, images=None):
+        with self._lock:
+            self._db.execute(
+                """
+                INSERT OR REPLACE INTO articles
+                    (url, save_dir, content_hash, etag, last_modified, fetched_at, images)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (canonicalize_url(url), str(save_dir), content_hash, etag, last_modified,
+                 time.time(), json.dumps(images or {}, ensure_ascii=False)),
+            )
+            self._db.commit()
+
+    def touch(self, url, etag=None, last_modified=None):
+        """内容未变化：刷新抓取时间，新的缓存校验头（如有）一并更新"""
+        with self._lock:
+            self._db.execute(
+                """
+                UPDATE articles SET fetched_at = ?, etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified)
+                WHERE url = ?
+                """,
+                (time.time(), etag, last_modified, canonicalize_url(url)),
+            )
+            self._db.commit()
+
+    @staticmethod
+    def is_saved(record):
+        return record is not None and article_exists(record['save_dir'])
+
+    @staticmethod
+    def is_fresh(record, max_age):
+        """max_age 为秒数；None 表示已保存的文章永不过期"""
+        if max_age is None:
+            return True
+        return time.time() - record['fetched_at'] < max_age
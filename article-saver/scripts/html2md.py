@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""
+HTML → Markdown - 各平台共用的单遍转换器
+功能：
+1. 基于 html.parser 的事件流逐个标签处理，不做整段正则替换，耗时与正文长度线性相关
+2. 支持标题、段落、粗体/斜体/删除线、链接、有序/无序列表（可嵌套）、
+   引用、代码块/行内代码、表格、分隔线
+3. 图片替换为 {{IMG_n}} 占位符（n 为 image_urls 下标），由 save 替换为本地文件；
+   各平台的图片地址取法（data-src / data-actualsrc / 原图参数）由平台插件的 image_src 决定
+4. 占位符 / 图片链接的本地化替换：一次编译好的正则单遍完成，与图片数量无关
+"""
+
+import re
+from html.parser import HTMLParser
+from urllib.parse import urlparse, parse_qs, unquote
+
+BLOCK_TAGS = {
+    'p', 'div', 'section', 'article', 'header', 'footer', 'main', 'aside', 'nav',
+    'figure', 'figcaption', 'center', 'details', 'summary', 'dl', 'dt', 'dd', 'address',
+}
+HEADING_TAGS = {'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+SKIP_TAGS = {'head', 'title', 'script', 'style', 'noscript', 'svg', 'template', 'iframe', 'button', 'video', 'audio', 'select'}
+VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'source', 'track', 'wbr'}
+INLINE_MARKS = {'strong': '**', 'b': '**', 'em': '*', 'i': '*', 'del': '~~', 's': '~~', 'strike': '~~'}
+CELL_TAGS = {'td', 'th'}
+
+WHITESPACE = re.compile(r'\s+')
+IMAGE_PLACEHOLDER = re.compile(r'\{\{IMG_(\d+)\}\}')
+LITERAL_PLACEHOLDER = re.compile(r'\{(?=\{IMG_\d+\}\})')
+MARKDOWN_IMAGE = re.compile(r'(!\[[^\]]*\]\()(https?://[^\s\)]+)(\))')
+
+
+# ---- 图片地址解析（平台插件可通过 image_src 替换）----
+
+def default_image_src(attrs):
+    src = attrs.get('data-src') or attrs.get('src') or ''
+    return src if src.startswith('http') else None
+
+
+def resolve_link(href):
+    if not href or href.startswith(('javascript:', '#')):
+        return None
+    # 知乎外链跳转：https://link.zhihu.com/?target=https%3A//...
+    if 'link.zhihu.com' in href:
+        target = parse_qs(urlparse(href).query).get('target')
+        if target:
+            return unquote(target[0])
+    return href
+
+
+# ---- 转换器 ----
+
+class _Frame:
+    """一个需要在闭合时整体加工的容器（链接、列表项、引用、代码块、单元格……）"""
+    __slots__ = ('tag', 'attrs', 'parts', 'newlines', 'extra')
+
+    def __init__(self, tag, attrs=None):
+        self.tag = tag
+        self.attrs = attrs or {}
+        self.parts = []
+        self.newlines = 0      # 末尾连续换行数
+        self.extra = None
+
+    @property
+    def at_line_start(self):
+        return not self.parts or self.newlines > 0
+
+    def write(self, text):
+        if not text:
+            return
+        self.parts.append(text)
+        stripped = text.rstrip('\n')
+        if stripped:
+            self.newlines = len(text) - len(stripped)
+        else:
+            self.newlines += len(text)
+
+    def ensure_newlines(self, count):
+        if self.parts and self.newlines < count:
+            self.write('\n' * (count - self.newlines))
+
+    def text(self):
+        return ''.join(self.parts)
+
+
+class MarkdownWriter:
+    """接收 start / end / data 事件并生成 Markdown；可由任意 HTMLParser 驱动"""
+
+    def __init__(self, image_resolver=default_image_src):
+        self.image_resolver = image_resolver
+        self.image_urls = []
+        self._image_index = {}
+        self._stack = [_Frame('root')]
+        self._lists = []        # [['ul' | 'ol', 计数]]
+        self._skip = 0
+        self._pre = 0
+
+    @property
+    def _top(self):
+        return self._stack[-1]
+
+    # -- 事件 --
+
+    def start(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self._skip += 1
+            return
+        if self._skip:
+            return
+        attrs = dict(attrs)
+
+        if self._pre:
+            if tag == 'br':
+                self._top.write('\n')
+            elif tag == 'code' and not self._top.extra:
+                self._top.extra = code_language(attrs)
+            return
+
+        if tag == 'img':
+            self.image(attrs)
+        elif tag == 'br':
+            self._top.write('\n')
+        elif tag == 'hr':
+            self.block('---')
+        elif tag in HEADING_TAGS or tag in INLINE_MARKS or tag in ('a', 'blockquote', 'code'):
+            self.push(tag, attrs)
+        elif tag == 'pre':
+            self._pre += 1
+            frame = self.push(tag, attrs)
+            frame.extra = code_language(attrs)
+        elif tag in ('ul', 'ol'):
+            self._top.ensure_newlines(1)
+            self._lists.append([tag, 0])
+        elif tag == 'li':
+            # 未闭合的 <li> 遇到下一个 <li> 时先收尾
+            if self.open_item():
+                self.pop('li')
+            if not self._lists:
+                self._lists.append(['ul', 0])
+            self._lists[-1][1] += 1
+            frame = self.push(tag, attrs)
+            # 记录所属列表层级、类型和序号
+            frame.extra = (len(self._lists), self._lists[-1][0], self._lists[-1][1])
+        elif tag == 'table':
+            frame = self.push(tag, attrs)
+            frame.extra = []
+        elif tag == 'tr':
+            if self._top.tag in CELL_TAGS:
+                self.pop(self._top.tag)
+            if self._top.tag == 'tr':
+                self.pop('tr')
+            frame = self.push(tag, attrs)
+            frame.extra = []
+        elif tag in CELL_TAGS:
+            if self._top.tag in CELL_TAGS:
+                self.pop(self._top.tag)
+            self.push(tag, attrs)
+        elif tag in BLOCK_TAGS:
+            self._top.ensure_newlines(2)
+
+    def end(self, tag):
+        if tag in SKIP_TAGS:
+            self._skip = max(self._skip - 1, 0)
+            return
+        if self._skip or tag in VOID_TAGS:
+            return
+        if self._pre and tag != 'pre':
+            return
+
+        if tag in ('ul', 'ol'):
+            if self.open_item():
+                self.pop('li')
+            if self._lists:
+                self._lists.pop()
+            self._top.ensure_newlines(2 if not self._lists else 1)
+        elif any(frame.tag == tag for frame in self._stack[1:]):
+            self.pop(tag)
+        elif tag in BLOCK_TAGS:
+            self._top.ensure_newlines(2)
+
+    def data(self, text):
+        if self._skip:
+            return
+        top = self._top
+        # 正文中字面的 {{IMG_n}} 拆开，避免被当作图片占位符替换：
+        # 代码块中插入零宽空格，其他位置用 Markdown 转义 {\{，渲染结果不变
+        if '{{IMG_' in text:
+            text = LITERAL_PLACEHOLDER.sub('{\u200b' if self._pre else '{\\\\', text)
+        if self._pre:
+            top.write(text)
+            return
+        if top.tag in ('table', 'tr'):
+            return
+        text = WHITESPACE.sub(' ', text)
+        if top.at_line_start:
+            text = text.lstrip(' ')
+        top.write(text)
+
+    # -- 容器 --
+
+    def open_item(self):
+        """栈顶是否为当前这一层列表中尚未闭合的 <li>"""
+        top = self._top
+        return top.tag == 'li' and top.extra[0] == len(self._lists)
+
+    def push(self, tag, attrs):
+        frame = _Frame(tag, attrs)
+        self._stack.append(frame)
+        return frame
+
+    def pop(self, tag):
+        """闭合 tag，其间未闭合的容器一并收尾"""
+        while len(self._stack) > 1:
+            frame = self._stack.pop()
+            self.render(frame)
+            if frame.tag == tag:
+                return
+
+    def render(self, frame):
+        parent = self._top
+        inner = frame.text()
+        tag = frame.tag
+
+        if tag in INLINE_MARKS:
+            mark = INLINE_MARKS[tag]
+            body = inner.strip()
+            if not body:
+                parent.write(inner if inner.isspace() else '')
+                return
+            # 保留两侧空白，标记紧贴文字
+            lead = ' ' if inner[:1].isspace() and not parent.at_line_start else ''
+            tail = ' ' if inner[-1:].isspace() else ''
+            parent.write(f"{lead}{mark}{body}{mark}{tail}")
+        elif tag == 'a':
+            body = WHITESPACE.sub(' ', inner).strip()
+            href = resolve_link(frame.attrs.get('href'))
+            if href and body and body != href:
+                parent.write(f"[{body}]({href})")
+            else:
+                parent.write(body or href or '')
+        elif tag == 'code':
+            body = inner.strip()
+            if body:
+                fence = '``' if '`' in body else '`'
+                pad = ' ' if fence == '``' else ''
+                parent.write(f"{fence}{pad}{body}{pad}{fence}")
+        elif tag in HEADING_TAGS:
+            body = WHITESPACE.sub(' ', inner).strip()
+            if body:
+                self.block(f"{'#' * int(tag[1])} {body}", parent)
+        elif tag == 'pre':
+            self._pre = max(self._pre - 1, 0)
+            code = inner.strip('\n')
+            fence = '~~~~' if '```' in code else '```'
+            self.block(f"{fence}{frame.extra or ''}\n{code}\n{fence}", parent)
+        elif tag == 'blockquote':
+            body = collapse_blank_lines(inner).strip()
+            if body:
+                quoted = '\n'.join(f"> {line}" if line else '>' for line in body.split('\n'))
+                self.block(quoted, parent)
+        elif tag == 'li':
+            body = collapse_blank_lines(inner).strip()
+            _, kind, count = frame.extra
+            marker = f"{count}. " if kind == 'ol' else '- '
+            indent = ' ' * len(marker)
+            lines = body.split('\n')
+            item = marker + lines[0] + ''.join(
+                f"\n{indent}{line}" if line else '\n' for line in lines[1:]
+            )
+            parent.ensure_newlines(1)
+            parent.write(item + '\n')
+        elif tag in CELL_TAGS:
+            cell = WHITESPACE.sub(' ', inner).strip().replace('|', '\\|')
+            if parent.tag == 'tr':
+                parent.extra.append(cell)
+            else:
+                parent.write(cell)
+        elif tag == 'tr':
+            if parent.tag == 'table' and frame.extra:
+                parent.extra.append(frame.extra)
+        elif tag == 'table':
+            table = render_table(frame.extra)
+            if table:
+                self.block(table, parent)
+        else:
+            parent.write(inner)
+
+    def block(self, text, frame=None):
+        frame = frame or self._top
+        frame.ensure_newlines(2)
+        frame.write(text)
+        frame.write('\n\n')
+
+    def image(self, attrs):
+        src = self.image_resolver(attrs)
+        if not src:
+            alt = (attrs.get('alt') or '').strip()
+            if alt:
+                self._top.write(alt)
+            return
+        index = self._image_index.get(src)
+        if index is None:
+            index = len(self.image_urls)
+            self._image_index[src] = index
+            self.image_urls.append(src)
+        self._top.write(f"{{{{IMG_{index}}}}}")
+
+    def result(self):
+        # 收尾所有未闭合的容器
+        while len(self._stack) > 1:
+            self.render(self._stack.pop())
+        markdown = self._stack[0].text()
+        markdown = re.sub(r'[ \t]+\n', '\n', markdown)
+        markdown = re.sub(r'\n{3,}', '\n\n', markdown).strip()
+        return markdown, self.image_urls
+
+
+def code_language(attrs):
+    for cls in (attrs.get('class') or '').split():
+        for prefix in ('language-', 'lang-'):
+            if cls.startswith(prefix):
+                return cls[len(prefix):]
+    return attrs.get('lang') or attrs.get('data-lang') or ''
+
+
+def collapse_blank_lines(text):
+    return re.sub(r'\n{3,}', '\n\n', text)
+
+
+def render_table(rows):
+    if not rows:
+        return ''
+    width = max(len(row) for row in rows)
+    rows = [row + [''] * (width - len(row)) for row in rows]
+    lines = ['| ' + ' | '.join(rows[0]) + ' |', '|' + ' --- |' * width]
+    lines.extend('| ' + ' | '.join(row) + ' |' for row in rows[1:])
+    return '\n'.join(lines)
+
+
+def fill_image_placeholders(content, downloaded, image_urls=()):
+    """
+    把 {{IMG_n}} 替换为本地图片引用；下载失败的图片保留原始链接，
+    没有对应地址的占位符直接删除，不会残留在输出中。
+    """
+    files = {img['index']: img['filename'] for img in downloaded}
+
+    def replace(match):
+        index = int(match.group(1))
+        target = files.get(index)
+        if target is None and index < len(image_urls):
+            target = image_urls[index]
+        return f"\n![图片]({target})\n" if target else ''
+
+    return IMAGE_PLACEHOLDER.sub(replace, content)
+
+
+def rewrite_image_links(content, mapping):
+    """把 Markdown 图片 ![alt](url) 中的 url 按 mapping 整体替换，只匹配完整 URL"""
+    if not mapping:
+        return content
+
+    def replace(match):
+        target = mapping.get(match.group(2))
+        return f"{match.group(1)}{target}{match.group(3)}" if target else match.group(0)
+
+    return MARKDOWN_IMAGE.sub(replace, content)
+
+
+def find_markdown_images(content):
+    """按出现顺序返回 Markdown 中不重复的图片 URL"""
+    return list(dict.fromkeys(match.group(2) for match in MARKDOWN_IMAGE.finditer(content)))
+
+
+class HTMLToMarkdown(HTMLParser):
+    def __init__(self, image_resolver=default_image_src):
+        super().__init__(convert_charrefs=True)
+        self.writer = MarkdownWriter(image_resolver)
+
+    def handle_starttag(self, tag, attrs):
+        self.writer.start(tag, attrs)
+
+    def handle_endtag(self, tag):
+        self.writer.end(tag)
+
+    def handle_data(self, data):
+        self.writer.data(data)
+
+
+def html_to_markdown(html, image_resolver=default_image_src):
+    """把一段 HTML 转换为 Markdown，返回 (markdown, image_urls)；image_resolver 通常为平台插件的 image_src"""
+    parser = HTMLToMarkdown(image_resolver)
+    parser.feed(html)
+    parser.close()
+    return parser.writer.result()
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Image Downloader - 并发图片下载管线
+功能：
+1. 限制同时下载的图片数量（全局共享，批量模式下也不会超限）
+2. 复用 requests.Session 的连接池，同一图床只建立少量长连接
+3. 单张图片超时 + 指数退避重试
+4. 以固定大小的分块流式写盘，内存占用与图片大小无关
+5. 可选接入 ImageStore：已知 URL 直接复用本地文件，新图片登记去重
+6. 可选接入 RateLimiter：按图床限速，403/429 时降低该图床的速率和并发
+7. 可选接入 ImagePostProcessor：下载完成后在进程池中按文件头识别格式、校验完整性并计算哈希，
+   被截断的图片重新下载；后处理期间不占用下载并发名额
+"""
+
+import os
+import time
+import random
+import asyncio
+import tempfile
+from pathlib import Path
+
+import tracing
+from rate_limit import RateLimiter, THROTTLE_STATUS
+
+DEFAULT_IMAGE_CONCURRENCY = 8
+DEFAULT_IMAGE_TIMEOUT = 30
+DEFAULT_IMAGE_RETRIES = 2
+DEFAULT_RETRY_BACKOFF = 0.5
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# 图片获取方式：browser = 页面内 fetch 后以 base64 回传；stream = 带页面 Cookie 的 HTTP 流式下载
+IMAGE_MODES = ('browser', 'stream')
+DEFAULT_IMAGE_MODE = 'browser'
+
+# 这些状态码通常是临时性的，值得重试
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+
+class ImageDownloadError(Exception):
+    def __init__(self, message, retryable=True, status=None):
+        super().__init__(message)
+        self.retryable = retryable
+        self.status = status
+
+
+def guess_extension(content_type):
+    content_type = content_type or ''
+    if 'png' in content_type: return '.png'
+    if 'gif' in content_type: return '.gif'
+    if 'webp' in content_type: return '.webp'
+    return '.jpg'
+
+
+def image_filename(index, content_type):
+    return f"img_{index:02d}{guess_extension(content_type)}"
+
+
+def build_image_headers(url, user_agent):
+    headers = {'User-Agent': user_agent}
+    # 处理防盗链
+    if 'zhihu.com' in url or 'zhimg.com' in url:
+        headers['Referer'] = 'https://www.zhihu.com/'
+    return headers
+
+
+def check_status(status):
+    if status == 200:
+        return
+    raise ImageDownloadError(f"HTTP {status}", retryable=status in RETRYABLE_STATUS, status=status)
+
+
+class ImageDownloader:
+    def __init__(self, user_agent, max_in_flight=DEFAULT_IMAGE_CONCURRENCY,
+                 timeout=DEFAULT_IMAGE_TIMEOUT, retries=DEFAULT_IMAGE_RETRIES,
+                 backoff=DEFAULT_RETRY_BACKOFF, store=None, proxy=None, rate_limiter=None, post=None, log=print):
+        self.user_agent = user_agent
+        self.store = store
+        self.post = post
+        self.rate_limiter = rate_limiter or RateLimiter(enabled=False, log=log)
+        self.max_in_flight = max_in_flight
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.log = log
+        self.proxy = proxy
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._session = None
+
+    @property
+    def session(self):
+        # 首次发起请求时才导入 requests 并建立连接池，命令行帮助等路径无需加载
+        if self._session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            # 每个 host 的连接池大小与并发上限一致，连接在图片之间复用
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=16, pool_maxsize=self.max_in_flight)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            if self.proxy:
+                session.proxies = {'http': self.proxy, 'https': self.proxy}
+            self._session = session
+        return self._session
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+        if self.post is not None:
+            self.post.close()
+
+    def fetch_to_file(self, url, save_dir, index, user_agent=None, extra_headers=None):
+        """
+        阻塞式下载单张图片到 save_dir，返回文件名（在线程池中执行）。
+        响应体按块写入本次下载独有的 .part 文件，完成后再重命名为 img_NN.ext。
+        外层 wait_for 超时只会放弃等待、无法停止线程，因此整体超时在写入循环中检查：
+        超时的线程尽快退出，且不会与重试写同一个临时文件。
+        """
+        deadline = time.monotonic() + self.timeout
+        headers = build_image_headers(url, user_agent or self.user_agent)
+        for key, value in (extra_headers or {}).items():
+            headers.setdefault(key, value)
+
+        with self.session.get(url, headers=headers, timeout=self.timeout, stream=True) as response:
+            check_status(response.status_code)
+            filename = image_filename(index, response.headers.get('content-type', ''))
+            fd, part_name = tempfile.mkstemp(prefix=f"{filename}.", suffix=".part", dir=save_dir)
+            part_path = Path(part_name)
+            try:
+                with open(fd, 'wb') as f:
+                    for chunk in response.iter_content(STREAM_CHUNK_SIZE):
+                        if time.monotonic() > deadline:
+                            raise ImageDownloadError(f"超时 ({self.timeout}s)")
+                        f.write(chunk)
+                os.replace(part_path, save_dir / filename)
+            except BaseException:
+                part_path.unlink(missing_ok=True)
+                raise
+        return filename
+
+    async def download_one(self, index, url, total, save_dir, fetch):
+        if self.store is not None:
+            filename = await asyncio.to_thread(self.store.place, url, save_dir, index)
+            if filename:
+                self.log(f"  ♻️ 复用已存图片 [{index+1}/{total}]: {url[:50]}...")
+                tracing.record_image(url, 'store', size=os.path.getsize(save_dir / filename))
+                return {"filename": filename, "temp_path": str(save_dir / filename), "cached": True}
+
+        self.log(f"  ⬇️ 下载图片 [{index+1}/{total}]: {url[:50]}...")
+        started = time.monotonic()
+        for attempt in range(self.retries + 1):
+            try:
+                # 先等图床限速（被限流的图床可能暂停数十秒），拿到后才占用全局下载名额，
+                # 避免排队中的图片占满名额、拖住其他图床；后处理和退避等待同样不占名额
+                async with self.rate_limiter.slot(url) as slot, self._slots:
+                    try:
+                        info = await asyncio.wait_for(fetch(index, url), timeout=self.timeout)
+                    except ImageDownloadError as e:
+                        if e.status in THROTTLE_STATUS:
+                            slot.throttle(f"HTTP {e.status}")
+                        raise
+                if self.post is not None:
+                    info = await self.post.process(info)
+                tracing.record_image(url, 'ok', time.monotonic() - started,
+                                     os.path.getsize(info['temp_path']), attempt)
+                if self.store is not None:
+                    await asyncio.to_thread(self.store.ingest, url, info['temp_path'], info.get('sha256'))
+                return info
+            except Exception as e:
+                if isinstance(e, asyncio.TimeoutError):
+                    e = ImageDownloadError(f"超时 ({self.timeout}s)")
+                retryable = getattr(e, 'retryable', True)
+                if not retryable or attempt >= self.retries:
+                    self.log(f"  ❌ 下载失败 [{index+1}/{total}]: {str(e)}")
+                    tracing.record_image(url, 'failed', time.monotonic() - started,
+                                         retries=attempt, error=str(e))
+                    return None
+                delay = self.backoff * (2 ** attempt) * (1 + random.random() / 2)
+                self.log(f"  🔁 重试 [{index+1}/{total}] ({attempt+1}/{self.retries})，{delay:.1f}s 后: {str(e)}")
+                await asyncio.sleep(delay)
+
+    async def download_all(self, urls, save_dir, fetch, reused=None):
+        """
+        并发下载 urls 到 save_dir，fetch(index, url) 为协程，成功时返回
+        {"filename": ..., "temp_path": ...}，失败时抛出异常。
+        reused 为 index → 已在磁盘上的图片信息，这些图片不再下载。
+        返回按 index 排序的下载结果列表（失败的图片不在其中）。
+        """
+        total = len(urls)
+        reused = reused or {}
+
+        async def one(index, url):
+            if index in reused:
+                self.log(f"  ♻️ 图片已在本地 [{index+1}/{total}]: {reused[index]['filename']}")
+                tracing.record_image(url, 'reused')
+                return reused[index]
+            return await self.download_one(index, url, total, save_dir, fetch)
+
+        results = await asyncio.gather(*[one(i, url) for i, url in enumerate(urls)])
+        downloaded = []
+        for i, (url, info) in enumerate(zip(urls, results)):
+            if info:
+                downloaded.append({"index": i, "original_url": url, **info})
+        return downloaded
+
+    async def download_to_dir(self, urls, save_dir, reused=None, extra_headers=None):
+        """不依赖浏览器，直接用 HTTP 连接池下载到 save_dir"""
+        async def fetch(index, url):
+            filename = await asyncio.to_thread(
+                self.fetch_to_file, url, save_dir, index, None, extra_headers
+            )
+            return {"filename": filename, "temp_path": str(save_dir / filename)}
+
+        return await self.download_all(urls, save_dir, fetch, reused)
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Image Post - 图片下载后的校验与后处理
+功能：
+1. 按文件头（magic bytes）识别真实格式：JPEG / PNG / GIF / WebP / AVIF / HEIC / BMP / SVG，
+   扩展名与实际格式不符时改名（只改文件名，不改内容）；返回的是 HTML 等非图片内容时判为下载失败
+2. 计算 sha256，供图片库去重直接使用，不再重复读取文件
+3. 按格式的结构校验文件是否完整（JPEG 结束标记、PNG / GIF / AVIF 分块遍历、WebP / BMP 声明长度），
+   被截断的图片判为下载失败，交给下载管线重试
+4. 可选生成预览缩略图 previews/img_NN.jpg（需要 Pillow）
+5. 在进程池中执行：大 GIF 的解析和缩略图都不占用下载所在的事件循环，也不与其争抢 GIL；
+   小图片在线程中处理，省去进程间传递的开销
+"""
+
+import os
+import mmap
+import time
+import struct
+import asyncio
+import hashlib
+import importlib.util
+import multiprocessing
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import tracing
+
+DEFAULT_POST_WORKERS = 2
+DEFAULT_PREVIEW_SIZE = 320
+PREVIEW_DIRNAME = "previews"
+PROCESS_THRESHOLD = 1024 * 1024     # 小于该大小的图片在线程中处理
+SNIFF_BYTES = 64
+
+EXTENSIONS = {
+    'jpeg': '.jpg', 'png': '.png', 'gif': '.gif', 'webp': '.webp',
+    'avif': '.avif', 'heic': '.heic', 'bmp': '.bmp', 'svg': '.svg',
+}
+# Pillow 默认能解码的格式
+PREVIEW_FORMATS = {'jpeg', 'png', 'gif', 'webp', 'bmp'}
+AVIF_BRANDS = {b'avif', b'avis'}
+HEIC_BRANDS = {b'heic', b'heix', b'hevc', b'hevx', b'heim', b'heis', b'mif1', b'msf1'}
+
+
+class ImageCheckError(Exception):
+    def __init__(self, message, retryable=True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+def sniff_format(head):
+    """根据文件开头的字节判断图片格式，无法识别时返回 None"""
+    if head.startswith(b'\xff\xd8\xff'):
+        return 'jpeg'
+    if head.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'png'
+    if head[:6] in (b'GIF87a', b'GIF89a'):
+        return 'gif'
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'webp'
+    if head[4:8] == b'ftyp':
+        # major brand 之后是兼容 brand 列表，mif1 等通用 brand 需要看列表里是否有 avif
+        size = struct.unpack('>I', head[:4])[0]
+        brands = {head[8:12]} | {head[i:i + 4] for i in range(16, min(size, len(head)) - 3, 4)}
+        if brands & AVIF_BRANDS:
+            return 'avif'
+        if brands & HEIC_BRANDS:
+            return 'heic'
+        return None
+    if head[:2] == b'BM':
+        return 'bmp'
+    text = head.lstrip()
+    if text.startswith(b'<svg') or (text.startswith(b'<?xml') and b'<svg' in head):
+        return 'svg'
+    return None
+
+
+def looks_like_markup(head):
+    """防盗链、验证页等以 200 返回的 HTML / JSON"""
+    text = head.lstrip().lower()
+    return text.startswith((b'<!doctype', b'<html', b'<head', b'<body', b'{', b'['))
+
+
+def skip_gif_blocks(data, pos):
+    while True:
+        size = data[pos]
+        pos += 1
+        if size == 0:
+            return pos
+        pos += size
+
+
+def check_gif(data):
+    """遍历 GIF 的数据块直到结尾标记 0x3B，返回帧数；被截断时抛出 IndexError"""
+    flags = data[10]
+    pos = 13 + (3 * 2 ** ((flags & 7) + 1) if flags & 0x80 else 0)
+    frames = 0
+    while True:
+        block = data[pos]
+        if block == 0x3B:
+            return frames
+        if block == 0x2C:
+            frames += 1
+            flags = data[pos + 9]
+            pos += 10 + (3 * 2 ** ((flags & 7) + 1) if flags & 0x80 else 0)
+            pos = skip_gif_blocks(data, pos + 1)
+        elif block == 0x21:
+            pos = skip_gif_blocks(data, pos + 2)
+        else:
+            raise ImageCheckError(f"GIF 数据块损坏（偏移 {pos}）")
+
+
+def check_png(data):
+    """遍历 PNG 分块直到 IEND，返回是否为动图（APNG）"""
+    pos, animated = 8, False
+    while True:
+        length, kind = struct.unpack_from('>I4s', data, pos)
+        pos += 12 + length
+        if pos > len(data):
+            raise IndexError
+        if kind == b'acTL':
+            animated = True
+        if kind == b'IEND':
+            return animated
+
+
+def check_isobmff(data):
+    """AVIF / HEIC：顶层 box 的长度之和应覆盖整个文件"""
+    pos = 0
+    while pos < len(data):
+        size = struct.unpack_from('>I', data, pos)[0]
+        if size == 1:
+            size = struct.unpack_from('>Q', data, pos + 8)[0]
+        elif size == 0:
+            return
+        if size < 8:
+            raise ImageCheckError(f"box 长度无效（偏移 {pos}）")
+        pos += size
+    if pos > len(data):
+        raise IndexError
+
+
+def check_complete(data, fmt):
+    """返回 {'animated': bool, 'frames': int}；文件被截断时抛出 ImageCheckError"""
+    info = {'animated': False}
+    try:
+        if fmt == 'jpeg':
+            # 部分服务器会在结束标记后补零
+            if not data[-64:].rstrip(b'\x00\r\n').endswith(b'\xff\xd9'):
+                raise IndexError
+        elif fmt == 'png':
+            info['animated'] = check_png(data)
+        elif fmt == 'gif':
+            info['frames'] = check_gif(data)
+            info['animated'] = info['frames'] > 1
+        elif fmt == 'webp':
+            if struct.unpack_from('<I', data, 4)[0] + 8 > len(data):
+                raise IndexError
+            info['animated'] = data[12:16] == b'VP8X' and bool(data[20] & 0x02)
+        elif fmt in ('avif', 'heic'):
+            check_isobmff(data)
+        elif fmt == 'bmp':
+            if struct.unpack_from('<I', data, 2)[0] > len(data):
+                raise IndexError
+        elif fmt == 'svg':
+            if b'</svg>' not in data[-256:]:
+                raise IndexError
+    except (IndexError, struct.error):
+        raise ImageCheckError(f"{fmt.upper()} 文件不完整（{len(data)} 字节），可能在传输中被截断")
+    return info
+
+
+def make_preview(path, preview_dir, size):
+    from PIL import Image
+
+    preview_dir.mkdir(exist_ok=True)
+    target = preview_dir / (path.stem + '.jpg')
+    with Image.open(path) as image:
+        image.thumbnail((size, size))
+        image.convert('RGB').save(target, 'JPEG', quality=80)
+    return f"{PREVIEW_DIRNAME}/{target.name}"
+
+
+def analyze_image(path, preview_size=None):
+    """
+    在工作进程中执行：识别格式、校验完整性、计算 sha256，必要时修正扩展名并生成预览图。
+    返回 {filename, format, sha256, bytes, animated, preview}；不是图片或文件不完整时抛出 ImageCheckError
+    """
+    path = Path(path)
+    size = path.stat().st_size
+    if size == 0:
+        raise ImageCheckError("图片为空")
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        head = data[:SNIFF_BYTES]
+        fmt = sniff_format(head)
+        if fmt is None and looks_like_markup(head):
+            raise ImageCheckError("返回的不是图片（HTML / JSON 页面），可能触发了防盗链", retryable=False)
+        result = {'format': fmt, 'bytes': size, 'animated': False, 'preview': None}
+        if fmt:
+            result.update(check_complete(data, fmt))
+        result['sha256'] = hashlib.sha256(data).hexdigest()
+
+    ext = EXTENSIONS.get(fmt)
+    if ext and path.suffix.lower() != ext:
+        fixed = path.with_suffix(ext)
+        os.replace(path, fixed)
+        path = fixed
+    result['filename'] = path.name
+
+    if preview_size and fmt in PREVIEW_FORMATS:
+        try:
+            result['preview'] = make_preview(path, path.parent / PREVIEW_DIRNAME, preview_size)
+        except Exception as e:
+            result['preview_error'] = str(e)
+    return result
+
+
+class ImagePostProcessor:
+    def __init__(self, workers=DEFAULT_POST_WORKERS, previews=False, preview_size=DEFAULT_PREVIEW_SIZE, log=print):
+        self.workers = max(workers, 1)
+        self.log = log
+        if previews and importlib.util.find_spec('PIL') is None:
+            self.log("⚠️ 未安装 Pillow（pip install Pillow），不生成预览图")
+            previews = False
+        self.preview_size = preview_size if previews else None
+        self._processes = None
+        self._threads = None
+
+    @property
+    def processes(self):
+        # 首张大图片出现时才启动进程池；分片模式的工作进程是 daemon 进程，不能再创建子进程，改用线程
+        if self._processes is None:
+            if multiprocessing.current_process().daemon:
+                self._processes = self.threads
+            else:
+                self._processes = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context('spawn'))
+        return self._processes
+
+    @property
+    def threads(self):
+        if self._threads is None:
+            self._threads = ThreadPoolExecutor(self.workers, thread_name_prefix='image-post')
+        return self._threads
+
+    def close(self):
+        for executor in (self._processes, self._threads):
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+    async def process(self, info):
+        """校验并补全一张刚下载的图片的信息；失败时抛出 ImageCheckError（下载管线据此重试）"""
+        path = Path(info['temp_path'])
+        executor = self.processes if path.stat().st_size >= PROCESS_THRESHOLD or self.preview_size else self.threads
+        started = time.monotonic()
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(
+                executor, analyze_image, str(path), self.preview_size
+            )
+        except ImageCheckError:
+            # 截断的文件或错误页面不能留在文章目录中；可重试时由下载管线重新下载
+            tracing.incr('image_rejected')
+            path.unlink(missing_ok=True)
+            raise
+        finally:
+            tracing.incr('image_post_seconds', time.monotonic() - started)
+
+        if result['filename'] != path.name:
+            tracing.incr('image_retyped')
+            self.log(f"  🔎 按文件头识别为 {result['format'].upper()}，文件名改为 {result['filename']}")
+        if result.get('preview_error'):
+            self.log(f"  ⚠️ 生成预览图失败 {result['filename']}: {result.pop('preview_error')}")
+        return {**info, **result, "temp_path": str(path.with_name(result['filename']))}
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Image Store - 基于内容寻址的跨文章图片去重
+功能：
+1. 图片按 sha256 存放为 {ROOT}/.store/blobs/{前两位}/{hash}{ext}，相同内容只存一份
+2. 记录 URL → hash 索引，已知 URL 直接复用本地文件，不再访问网络
+3. 文章目录中的 img_NN.ext 以硬链接指向 blob（跨文件系统时退化为复制）
+"""
+
+import os
+import shutil
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+
+HASH_CHUNK_SIZE = 1024 * 1024
+SQLITE_TIMEOUT = 30
+
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def link_or_copy(src, dst):
+    """让 dst 指向 src 的内容：优先硬链接，失败时复制；通过临时文件 + rename 保证原子替换"""
+    tmp = dst.with_name(f".{dst.name}.link")
+    tmp.unlink(missing_ok=True)
+    try:
+        os.link(src, tmp)
+    except OSError:
+        shutil.copyfile(src, tmp)
+    os.replace(tmp, dst)
+
+
+class ImageStore:
+    def __init__(self, root):
+        self.root = Path(root)
+        self.blob_dir = self.root / "blobs"
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.root / "index.sqlite"), check_same_thread=False, timeout=SQLITE_TIMEOUT)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS urls (
+                url TEXT PRIMARY KEY,
+                hash TEXT NOT NULL,
+                ext TEXT NOT NULL
+            )
+        """)
+        self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def blob_path(self, digest, ext):
+        return self.blob_dir / digest[:2] / f"{digest}{ext}"
+
+    def lookup(self, url):
+        with self._lock:
+            row = self._db.execute("SELECT hash, ext FROM urls WHERE url = ?", (url,)).fetchone()
+        if not row:
+            return None
+        blob = self.blob_path(*row)
+        # blob 被手动删除时视为未命中
+        return blob if blob.exists() else None
+
+    def place(self, url, save_dir, index):
+        """已知 URL：把对应 blob 链接为 save_dir/img_NN.ext，返回文件名；未命中返回 None"""
+        blob = self.lookup(url)
+        if blob is None:
+            return None
+        filename = f"img_{index:02d}{blob.suffix}"
+        link_or_copy(blob, Path(save_dir) / filename)
+        return filename
+
+    def ingest(self, url, file_path, digest=None):
+        """
+        登记新下载的图片：内容已存在时把文件替换为指向 blob 的链接，否则把文件加入 store。
+        digest 为后处理阶段已算好的 sha256，为空时在此计算
+        """
+        file_path = Path(file_path)
+        digest = digest or hash_file(file_path)
+        ext = file_path.suffix
+        blob = self.blob_path(digest, ext)
+        blob.parent.mkdir(parents=True, exist_ok=True)
+
+        if blob.exists():
+            link_or_copy(blob, file_path)
+        else:
+            try:
+                os.link(file_path, blob)
+            except FileExistsError:
+                # 另一篇文章刚刚写入了相同内容
+                link_or_copy(blob, file_path)
+            except OSError:
+                shutil.copyfile(file_path, blob)
+
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO urls (url, hash, ext) VALUES (?, ?, ?)",
+                (url, digest, ext),
+            )
+            self._db.commit()
+        return digest
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Platforms - 平台插件注册表
+功能：
+1. 每个平台是本目录下的一个模块，模块中的 PLATFORM 声明该平台的域名匹配、UA、登录态文件、
+   就绪条件、额外拦截的域名、抓取策略、图片地址取法、限速域名组、URL 规范化和页面内提取脚本
+2. 首次识别 URL 时才扫描并导入插件模块；插件本身只包含配置和提取脚本，
+   Playwright 等重依赖在真正打开页面时才由 BrowserPool 加载
+3. 新增平台只需添加一个模块，分发逻辑（identify / get）以及 html2md、rate_limit、fetch_index
+   都通过注册表读取插件的声明，无需改动
+"""
+
+import pkgutil
+import importlib
+from urllib.parse import urlparse
+
+from html2md import html_to_markdown, default_image_src
+from readiness import DEFAULT_READINESS
+
+MOBILE_UA = 'Mozilla/5.0 (iPhone; CPU iPhone OS 16_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Mobile/15E148 MicroMessenger/8.0.38(0x18002629) NetType/WIFI Language/zh_CN'
+DESKTOP_UA = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+# 图床的默认限速：(初始速率 请求/秒, 令牌桶容量, 最大并发)
+IMAGE_CDN_LIMIT = (20.0, 20, 8)
+
+
+class Platform:
+    """
+    平台插件基类，子类通过类属性声明：
+    hosts 匹配的域名（含子域名）；name 显示名称；user_agent 浏览器与 HTTP 请求的 UA；
+    auth_file data/ 下的登录态文件名；readiness 就绪条件（见 readiness.py）；
+    block_hosts 导航阶段额外拦截的域名；strategies 默认的抓取策略顺序；
+    concurrency 批量模式下的默认并发上限；image_src 正文 <img> 属性 → 图片地址（None 表示跳过）；
+    rate_limit_groups 域名组 → (域名后缀, (初始速率 请求/秒, 令牌桶容量, 最大并发))，同组域名共享限速状态；
+    canonical_hosts 别名域名 → 规范域名，抓取索引按规范化后的 URL 去重；
+    extract_js 页面内提取脚本，返回 {title, author, html, ...}；
+    需要滚动等多步交互的平台（如 X 推文串）直接重写 extract
+    """
+    id = 'other'
+    name = '其他'
+    hosts = ()
+    user_agent = DESKTOP_UA
+    auth_file = None
+    warn_without_auth = False     # 缺少登录态时提示（反爬严格的平台）
+    readiness = DEFAULT_READINESS
+    block_hosts = ()
+    strategies = ('browser',)
+    concurrency = None            # None 表示只受全局并发限制
+    blocked_url_markers = ()      # 页面跳转到含这些片段的 URL 说明触发了验证
+    default_author = ''
+    image_referer = None
+    rate_limit_groups = {}        # 未声明的域名使用 rate_limit.FALLBACK_LIMIT
+    canonical_hosts = {}
+    extract_js = None
+
+    @staticmethod
+    def image_src(attrs):
+        return default_image_src(attrs)
+
+    def matches(self, host):
+        return any(host == h or host.endswith('.' + h) for h in self.hosts)
+
+    def display_name(self, url):
+        return self.name
+
+    async def extract(self, page, **options):
+        """在页面内执行提取脚本，HTML → Markdown 转换在 Python 侧完成（html2md）；options 为平台专属的提取参数"""
+        if not self.extract_js:
+            return None
+        raw = await page.evaluate(self.extract_js)
+        if not raw:
+            return None
+        return self.finish(raw)
+
+    def finish(self, raw):
+        content, image_urls = html_to_markdown(raw.pop('html'), self.image_src)
+        raw['content'] = content.strip()
+        raw['image_urls'] = image_urls
+        return raw
+
+    def fetch_http(self, session, url, auth_file):
+        """免浏览器快速通道（strategies 中含 'http' 的平台实现），返回 (data, response)"""
+        raise NotImplementedError
+
+
+GENERIC = Platform()
+_registry = None
+
+
+def registry():
+    """平台 id → 插件实例；首次调用时导入本目录下的所有插件模块"""
+    global _registry
+    if _registry is None:
+        plugins = {}
+        for module in pkgutil.iter_modules(__path__):
+            if module.name.startswith('_'):
+                continue
+            plugin = getattr(importlib.import_module(f"{__name__}.{module.name}"), 'PLATFORM', None)
+            if plugin is not None:
+                plugins[plugin.id] = plugin
+        _registry = plugins
+    return _registry
+
+
+def identify(url):
+    host = (urlparse(url).hostname or '').lower()
+    for plugin in registry().values():
+        if plugin.matches(host):
+            return plugin
+    return GENERIC
+
+
+def get(platform_id):
+    return registry().get(platform_id, GENERIC)
+
+
+def default_limits():
+    """各平台声明的批量并发上限"""
+    return {p.id: p.concurrency for p in registry().values() if p.concurrency}
+
+
+def rate_limit_groups():
+    """各平台声明的限速域名组，合并为 域名组 → (域名后缀, 默认限速)"""
+    groups = {}
+    for plugin in registry().values():
+        groups.update(plugin.rate_limit_groups)
+    return groups
+
+
+def canonical_host(host):
+    """别名域名 → 平台声明的规范域名（如 twitter.com → x.com），其他域名原样返回"""
+    for plugin in registry().values():
+        if host in plugin.canonical_hosts:
+            return plugin.canonical_hosts[host]
+    return host
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""微信公众号：移动端 UA + 登录态；正文通常在服务端 HTML 中，优先走免浏览器快速通道"""
+
+from platforms import Platform, MOBILE_UA, IMAGE_CDN_LIMIT
+from wechat_http import fetch_wechat_article
+
+
+class Wechat(Platform):
+    id = 'wechat'
+    name = '微信公众号'
+    hosts = ('mp.weixin.qq.com',)
+    user_agent = MOBILE_UA
+    auth_file = 'wechat_auth.json'
+    readiness = {
+        'selector': '#js_content',
+        'images': True,
+        'network_idle': 2.0,
+        'max_wait': 10.0,
+    }
+    block_hosts = ('mp.weixin.qq.com/mp/appmsgreport', 'mp.weixin.qq.com/mp/jsmonitor')
+    strategies = ('http', 'browser')
+    concurrency = 3
+    image_referer = 'https://mp.weixin.qq.com/'
+    rate_limit_groups = {
+        'mp.weixin.qq.com': (('mp.weixin.qq.com',), (2.0, 4, 4)),
+        'qpic.cn': (('qpic.cn', 'qlogo.cn'), IMAGE_CDN_LIMIT),     # 各 mmbiz 图床共享状态
+    }
+    extract_js = """
+        () => {
+            const title = document.querySelector('#activity-name')?.innerText?.trim() || '';
+            const author = document.querySelector('#js_name')?.innerText?.trim() || '';
+            const contentEl = document.querySelector('#js_content');
+            if (!contentEl) return null;
+            return { title, author, html: contentEl.innerHTML };
+        }
+    """
+
+    def fetch_http(self, session, url, auth_file):
+        return fetch_wechat_article(session, url, self.user_agent, auth_file, image_resolver=self.image_src)
+
+
+PLATFORM = Wechat()
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+X（Twitter）：推文串与长文
+X 的时间线是虚拟列表，滚出视口的推文会被卸载。提取时逐屏向下滚动，每一屏只取出新挂载的推文
+（或长文段落），按推文 ID 去重后立即转换为 Markdown，页面和 Python 侧都不保留已处理的 DOM；
+只收集与主推文同一作者的推文，遇到其他用户的回复、到达页面底部或达到数量上限时停止。
+"""
+
+import re
+import hashlib
+from urllib.parse import urlparse
+
+from platforms import Platform, IMAGE_CDN_LIMIT
+from html2md import html_to_markdown, IMAGE_PLACEHOLDER
+
+DEFAULT_THREAD_LIMIT = 100
+SCROLL_STEP = 0.8           # 每次滚动的视口高度比例
+SCROLL_WAIT_MS = 1500       # 滚动后等待新推文挂载的上限
+IDLE_ROUNDS = 3             # 连续多少轮停在底部且没有新内容时结束
+TWEET_SEPARATOR = "\n\n---\n\n"
+LEGACY_MEDIA = re.compile(r'(https?://pbs\.twimg\.com/media/[^.?:/]+)\.(\w+)(?::\w+)?$')
+
+
+def upgrade_x_media_url(src):
+    """pbs.twimg.com/media 链接转换为原图（name=orig），兼容旧式的 /media/{ID}.jpg:large 写法"""
+    legacy = LEGACY_MEDIA.match(src)
+    if legacy:
+        return f"{legacy.group(1)}?format={legacy.group(2)}&name=orig"
+    if 'name=' in src:
+        return re.sub(r'name=[a-zA-Z0-9_]+', 'name=orig', src)
+    return src + ('&' if '?' in src else '?') + 'name=orig'
+
+
+def x_image_src(attrs):
+    src = attrs.get('src') or ''
+    # 只保留推文配图，表情等小图标走 alt 文本
+    if 'pbs.twimg.com/media' not in src:
+        return None
+    return upgrade_x_media_url(src)
+
+
+# 取出当前挂载的推文中尚未处理过的部分（known 为已处理的推文 ID / 段落 key）
+COLLECT_JS = """
+    (known) => {
+        const seen = new Set(known);
+        const tweets = [];
+        for (const tweet of document.querySelectorAll('article[data-testid="tweet"]')) {
+            // 推文链接形如 /{用户名}/status/{ID}，时间戳所在的链接指向推文本身
+            const link = [...tweet.querySelectorAll('a[href*="/status/"]')].find(a => a.querySelector('time'));
+            const match = link?.getAttribute('href')?.match(/\\/([^/]+)\\/status\\/(\\d+)/);
+            const id = match ? match[2] : null;
+            if (id && seen.has(id)) continue;
+
+            const authorEl = tweet.querySelector('div[data-testid="User-Name"]') ||
+                             tweet.querySelector('div[data-testid="AuthorInfo-name"]');
+            const handle = match ? match[1] :
+                           (authorEl?.innerText?.split('\\n').find(s => s.startsWith('@')) || '').slice(1) || null;
+            const textEl = tweet.querySelector('div[data-testid="tweetText"]');
+
+            // 正文之外的配图（正文内的图片由转换器处理）
+            const photos = [];
+            tweet.querySelectorAll('div[data-testid="tweetPhoto"] img, img[src*="pbs.twimg.com/media"]').forEach(img => {
+                const src = img.getAttribute('src');
+                if (src && !(textEl && textEl.contains(img)) && !photos.includes(src)) photos.push(src);
+            });
+
+            tweets.push({
+                id, handle,
+                author: authorEl?.innerText?.split('\\n')[0] || '',
+                text: textEl?.innerText || '',
+                html: textEl?.innerHTML || '',
+                photos,
+            });
+        }
+
+        // 长文：正文按段落（Draft.js block）挂载，按 data-offset-key 去重
+        const body = document.querySelector('div[data-testid="articleBody"]');
+        const blocks = [];
+        if (body) {
+            for (const block of body.children) {
+                const key = block.getAttribute('data-offset-key') ||
+                            block.querySelector('[data-offset-key]')?.getAttribute('data-offset-key') || null;
+                if (key && seen.has(key)) continue;
+                blocks.push({ key, html: block.outerHTML });
+            }
+        }
+
+        const root = document.scrollingElement || document.documentElement;
+        return {
+            tweets, blocks,
+            title: document.querySelector('div[data-testid="articleTitle"]')?.innerText || '',
+            atBottom: window.innerHeight + window.scrollY >= root.scrollHeight - 4,
+        };
+    }
+"""
+
+# 滚动后等到出现尚未处理的推文/段落，或已到底部
+NEW_CONTENT_JS = """
+    (known) => {
+        const seen = new Set(known);
+        for (const link of document.querySelectorAll('article[data-testid="tweet"] a[href*="/status/"] time')) {
+            const match = link.parentElement?.getAttribute('href')?.match(/\\/status\\/(\\d+)/);
+            if (match && !seen.has(match[1])) return true;
+        }
+        for (const el of document.querySelectorAll('div[data-testid="articleBody"] [data-offset-key]')) {
+            if (!seen.has(el.getAttribute('data-offset-key'))) return true;
+        }
+        const root = document.scrollingElement || document.documentElement;
+        return window.innerHeight + window.scrollY >= root.scrollHeight - 4;
+    }
+"""
+
+
+def content_key(*parts):
+    """没有推文 ID / 段落 key 时按内容去重"""
+    return 'h:' + hashlib.sha1('\x00'.join(parts).encode('utf-8')).hexdigest()[:16]
+
+
+class ThreadCollector:
+    """
+    累积推文串：推文按出现顺序去重，立即转换为 Markdown 并把图片占位符重新编号为全局序号；
+    只保留 Markdown 片段和已处理的 key，不持有页面内容
+    """
+
+    def __init__(self, focal_handle=None, focal_id=None, limit=DEFAULT_THREAD_LIMIT):
+        self.focal_handle = (focal_handle or '').lower() or None
+        self.focal_id = focal_id
+        self.limit = limit
+        self.known = set()
+        self.parts = []
+        self.blocks = []
+        self.image_urls = []
+        self._image_index = {}
+        self.title = ''
+        self.author = ''
+        self.tweets = 0
+        self.seen_focal = False
+        self.ended = False
+
+    @property
+    def done(self):
+        return self.ended or self.tweets >= self.limit
+
+    def image(self, src):
+        index = self._image_index.get(src)
+        if index is None:
+            index = self._image_index[src] = len(self.image_urls)
+            self.image_urls.append(src)
+        return index
+
+    def convert(self, html, photos=()):
+        """HTML → Markdown，图片占位符从片段内的序号换成全局序号；正文之外的配图追加到末尾"""
+        markdown, urls = html_to_markdown(html, x_image_src)
+        mapping = [self.image(src) for src in urls]
+
+        def renumber(match):
+            index = int(match.group(1))
+            return f"{{{{IMG_{mapping[index]}}}}}" if index < len(mapping) else match.group(0)
+
+        markdown = IMAGE_PLACEHOLDER.sub(renumber, markdown)
+        for src in photos:
+            src = upgrade_x_media_url(src)
+            if src not in self._image_index:
+                markdown += f"\n\n{{{{IMG_{self.image(src)}}}}}"
+        return markdown.strip()
+
+    def add(self, snapshot):
+        """处理一次采集结果，返回新增的推文和段落数"""
+        added = 0
+        self.title = self.title or snapshot.get('title') or ''
+        tweets = snapshot.get('tweets', [])
+        if not self.focal_handle:
+            # 链接中没有用户名：取主推文的作者，找不到主推文时取页面中第一条推文的作者
+            authors = [t for t in tweets if t['handle']]
+            focal = next((t for t in authors if self.focal_id and t['id'] == self.focal_id), authors[0] if authors else None)
+            if focal:
+                self.focal_handle = focal['handle'].lower()
+        for tweet in tweets:
+            if self.done:
+                break
+            key = tweet['id'] or content_key(tweet['handle'] or '', tweet['html'], *tweet['photos'])
+            if key in self.known:
+                continue
+            self.known.add(key)
+            handle = (tweet['handle'] or '').lower() or None
+            if self.focal_handle and handle and handle != self.focal_handle:
+                # 主推文之后出现其他用户，说明推文串已结束，进入回复区
+                if self.seen_focal:
+                    self.ended = True
+                continue
+            if tweet['id'] and tweet['id'] == self.focal_id:
+                self.seen_focal = True
+            markdown = self.convert(tweet['html'], tweet['photos'])
+            if not markdown:
+                continue
+            if not self.author:
+                self.author = tweet['author']
+            if not self.title:
+                self.title = tweet['text'][:30].replace('\n', ' ')
+            self.parts.append(markdown)
+            self.tweets += 1
+            added += 1
+        for block in snapshot.get('blocks', []):
+            key = block['key'] or content_key(block['html'])
+            if key in self.known:
+                continue
+            self.known.add(key)
+            markdown = self.convert(block['html'])
+            if markdown:
+                self.blocks.append(markdown)
+                added += 1
+        return added
+
+    def result(self):
+        if not self.parts and not self.blocks:
+            return None
+        # 长文页面的推文只是外壳（作者信息），正文取段落
+        content = '\n\n'.join(self.blocks) if self.blocks else TWEET_SEPARATOR.join(self.parts)
+        return {
+            'title': self.title or 'X_Post',
+            'author': self.author or 'X_User',
+            'content': content,
+            'image_urls': self.image_urls,
+            'thread_length': self.tweets,
+        }
+
+
+def parse_status_url(url):
+    """
+    /{用户名}/status/{ID} → (用户名, ID)；/i/web/status/{ID} 等不含用户名的链接返回 (None, ID)，
+    由 ThreadCollector 从页面中的主推文取用户名；其他页面返回 (None, None)
+    """
+    match = re.match(r'/(?:i/web|i|([^/]+))/status(?:es)?/(\d+)', urlparse(url).path)
+    return (match.group(1), match.group(2)) if match else (None, None)
+
+
+class X(Platform):
+    id = 'x'
+    name = 'X'
+    hosts = ('x.com', 'twitter.com')
+    readiness = {
+        # X 有长连接，网络永远不会空闲
+        'selector': 'article[data-testid="tweet"], article[role="article"], main article',
+        'images': False,
+        'network_idle': 0,
+        'max_wait': 15.0,
+    }
+    block_hosts = ('video.twimg.com',)
+    concurrency = 2
+    default_author = 'X_User'
+    rate_limit_groups = {
+        'x.com': (('x.com', 'twitter.com'), (1.0, 3, 2)),
+        'twimg.com': (('twimg.com',), IMAGE_CDN_LIMIT),
+    }
+    canonical_hosts = {host: 'x.com' for host in ('twitter.com', 'www.twitter.com', 'mobile.twitter.com', 'www.x.com', 'mobile.x.com')}
+    image_src = staticmethod(x_image_src)
+
+    async def extract(self, page, thread_limit=DEFAULT_THREAD_LIMIT, **options):
+        handle, status_id = parse_status_url(page.url)
+        collector = ThreadCollector(handle, status_id, thread_limit or DEFAULT_THREAD_LIMIT)
+        await page.evaluate("() => window.scrollTo(0, 0)")
+
+        idle = 0
+        # 每屏至少出现一条新推文，滚动次数按上限留出余量，防止无限滚动
+        for _ in range(collector.limit * 2 + 20):
+            snapshot = await page.evaluate(COLLECT_JS, list(collector.known))
+            added = collector.add(snapshot)
+            if collector.done:
+                break
+            idle = idle + 1 if not added and snapshot['atBottom'] else 0
+            if idle >= IDLE_ROUNDS:
+                break
+            await page.evaluate(f"() => window.scrollBy(0, window.innerHeight * {SCROLL_STEP})")
+            try:
+                await page.wait_for_function(NEW_CONTENT_JS, arg=list(collector.known), timeout=SCROLL_WAIT_MS)
+            except Exception:
+                pass
+        return collector.result()
+
+
+PLATFORM = X()
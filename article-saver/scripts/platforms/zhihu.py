@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""知乎（回答 / 专栏）：反爬严格，Jina Reader 与登录态浏览器对冲执行"""
+
+from urllib.parse import urlparse
+
+from platforms import Platform, IMAGE_CDN_LIMIT
+
+
+class Zhihu(Platform):
+    id = 'zhihu'
+    name = '知乎'
+    hosts = ('zhihu.com',)
+    auth_file = 'zhihu_auth.json'
+    warn_without_auth = True
+    readiness = {
+        'selector': '.RichText.ztext, .Post-RichTextContainer, .Post-Content, article',
+        'images': True,
+        'network_idle': 2.0,
+        'max_wait': 12.0,
+    }
+    block_hosts = ('zhihu.com/api/v4/ad', 'zhihu.com/commercial_api')
+    strategies = ('jina', 'browser')
+    concurrency = 1
+    blocked_url_markers = ('liantong', 'captcha')
+    default_author = '知乎用户'
+    rate_limit_groups = {
+        'zhihu.com': (('zhihu.com',), (1.0, 3, 2)),
+        'zhimg.com': (('zhimg.com',), IMAGE_CDN_LIMIT),     # pic1~pic4.zhimg.com 共享状态
+    }
+    extract_js = """
+        () => {
+            let title = document.querySelector('.QuestionHeader-title')?.innerText ||
+                        document.querySelector('.Post-Title')?.innerText ||
+                        document.querySelector('h1')?.innerText || '';
+            let author = document.querySelector('.AuthorInfo-name')?.innerText ||
+                         document.querySelector('.UserLink-link')?.innerText || '';
+
+            // 知乎回答、文章或专栏正文
+            let contentEl = document.querySelector('.RichText.ztext') ||
+                            document.querySelector('.Post-RichTextContainer') ||
+                            document.querySelector('.Post-Content') ||
+                            document.querySelector('article');
+
+            if (!contentEl) return null;
+            return { title, author, html: contentEl.innerHTML };
+        }
+    """
+
+    @staticmethod
+    def image_src(attrs):
+        src = attrs.get('data-actualsrc') or attrs.get('data-original') or attrs.get('src') or ''
+        if not src.startswith('http'):
+            return None
+        # 移除动态尺寸参数，获取原图
+        return src.split('?')[0]
+
+    def display_name(self, url):
+        return '知乎专栏' if 'zhuanlan' in urlparse(url).netloc.lower() else self.name
+
+
+PLATFORM = Zhihu()
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Rate Limit - 按域名的自适应限速
+功能：
+1. 每个域名组一个令牌桶（请求速率）+ 动态并发上限（同时进行的页面/请求数）
+2. AIMD：请求正常完成时并发和速率缓慢回升（加性增），出现反爬信号
+   （验证码/“环境异常”页、HTTP 403/429）时减半并暂停一段时间（乘性减，暂停时长指数增长）
+3. 同一服务的多个域名共享状态：pic1~pic4.zhimg.com、各 mmbiz 图床、pbs/video.twimg.com 等；
+   域名组和默认限速由各平台插件的 rate_limit_groups 声明
+"""
+
+import time
+import asyncio
+from contextlib import asynccontextmanager
+from urllib.parse import urlparse
+
+import tracing
+import platforms
+
+# 这些状态码说明被限流或被拦截
+THROTTLE_STATUS = {403, 429}
+
+# 不属于某个平台的公共服务；各平台的文章页和图床由插件的 rate_limit_groups 声明
+# 域名组 → (域名后缀, (初始速率 请求/秒, 令牌桶容量, 最大并发))
+SERVICE_GROUPS = {
+    'r.jina.ai': (('r.jina.ai',), (0.5, 5, 3)),
+}
+FALLBACK_LIMIT = (5.0, 10, 8)
+
+MAX_RATE_FACTOR = 4         # 速率最多回升到初始值的倍数
+MIN_RATE_FACTOR = 0.05      # 速率最低降到初始值的比例
+RATE_STEP_FACTOR = 0.1      # 每次成功回升初始速率的比例
+BASE_COOLDOWN = 5.0         # 第一次触发反爬后的暂停秒数，连续触发时翻倍
+MAX_COOLDOWN = 120.0
+DECREASE_INTERVAL = 2.0     # 同一波失败（并发中的多个请求同时被拦）只减一次
+
+
+def parse_rate_limits(specs):
+    """解析形如 zhihu.com=0.5 或 zhihu.com=0.5/1（速率/最大并发）的域名限速配置"""
+    limits = {}
+    for spec in specs or []:
+        host, sep, value = spec.partition('=')
+        rate, _, in_flight = value.partition('/')
+        try:
+            rate = float(rate)
+            in_flight = int(in_flight) if in_flight else None
+        except ValueError:
+            rate = 0
+        if not sep or rate <= 0 or (in_flight is not None and in_flight < 1):
+            raise ValueError(f"无效的限速配置: {spec}（格式应为 域名=每秒请求数[/最大并发]，如 zhihu.com=0.5/1）")
+        group = host_group(host.strip())
+        _, burst, default_in_flight = default_limits().get(group, FALLBACK_LIMIT)
+        limits[group] = (rate, burst, in_flight or default_in_flight)
+    return limits
+
+
+def host_groups():
+    """域名组 → (域名后缀, 默认限速)：各平台插件声明的域名组加上 Jina Reader 等公共服务"""
+    return {**platforms.rate_limit_groups(), **SERVICE_GROUPS}
+
+
+def default_limits():
+    return {group: limit for group, (_, limit) in host_groups().items()}
+
+
+def host_group(host):
+    host = (host or '').lower()
+    for group, (suffixes, _) in host_groups().items():
+        if any(host == suffix or host.endswith('.' + suffix) for suffix in suffixes):
+            return group
+    return host
+
+
+class AdaptiveLimiter:
+    def __init__(self, name, rate, burst, max_in_flight, log=print):
+        self.name = name
+        self.initial_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.max_in_flight = max_in_flight
+        self.limit = float(max_in_flight)
+        self.in_flight = 0
+        self.cooldown_until = 0.0
+        self.strikes = 0
+        self.throttles = 0
+        self.log = log
+        self._updated = time.monotonic()
+        self._last_decrease = 0.0
+        self._cond = asyncio.Condition()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        started = time.monotonic()
+        async with self._cond:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self.cooldown_until:
+                    timeout = self.cooldown_until - now
+                elif self.in_flight >= max(1, int(self.limit)):
+                    timeout = None          # 等待其他请求结束
+                elif self.tokens < 1:
+                    timeout = (1 - self.tokens) / self.rate
+                else:
+                    self.tokens -= 1
+                    self.in_flight += 1
+                    break
+                try:
+                    await asyncio.wait_for(self._cond.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    pass
+        waited = time.monotonic() - started
+        if waited > 0.01:
+            tracing.add_span('rate_limit', waited, group=self.name)
+
+    async def release(self, outcome):
+        async with self._cond:
+            self.in_flight -= 1
+            if outcome == 'ok':
+                self.on_success()
+            elif outcome:
+                self.on_throttle(outcome)
+            self._cond.notify_all()
+
+    def on_success(self):
+        # 加性增：并发每成功 limit 次约 +1，速率按初始值的固定比例回升
+        self.strikes = 0
+        self.limit = min(self.max_in_flight, self.limit + 1 / self.limit)
+        self.rate = min(self.initial_rate * MAX_RATE_FACTOR, self.rate + self.initial_rate * RATE_STEP_FACTOR)
+
+    def on_throttle(self, reason):
+        self.throttles += 1
+        tracing.incr('throttled')
+        now = time.monotonic()
+        if now - self._last_decrease < DECREASE_INTERVAL:
+            return
+        self._last_decrease = now
+        # 乘性减：并发和速率减半，清空令牌并暂停，连续触发时暂停时长翻倍
+        self.strikes += 1
+        self.limit = max(1.0, self.limit / 2)
+        self.rate = max(self.initial_rate * MIN_RATE_FACTOR, self.rate / 2)
+        self.tokens = 0.0
+        cooldown = min(MAX_COOLDOWN, BASE_COOLDOWN * 2 ** (self.strikes - 1))
+        self.cooldown_until = now + cooldown
+        self.log(f"🐢 {self.name} 触发反爬信号（{reason}），并发降至 {int(self.limit)}，"
+                 f"速率 {self.rate:.2f}/s，暂停 {cooldown:.0f}s")
+
+    def state(self):
+        return {
+            "rate": round(self.rate, 3),
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "throttles": self.throttles,
+            "cooling_down": max(0.0, round(self.cooldown_until - time.monotonic(), 1)),
+        }
+
+
+class Slot:
+    """一次受限请求；调用 throttle() 报告反爬信号，正常结束视为成功"""
+
+    def __init__(self):
+        self.outcome = 'ok'
+
+    def throttle(self, reason):
+        self.outcome = reason
+
+
+class RateLimiter:
+    def __init__(self, limits=None, enabled=True, log=print):
+        self.limits = {**default_limits(), **(limits or {})}
+        self.enabled = enabled
+        self.log = log
+        self.limiters = {}
+
+    def limiter(self, url):
+        group = host_group(urlparse(url).hostname)
+        if group not in self.limiters:
+            rate, burst, max_in_flight = self.limits.get(group) or next(
+                (limit for suffix, limit in self.limits.items() if group.endswith('.' + suffix)), FALLBACK_LIMIT
+            )
+            self.limiters[group] = AdaptiveLimiter(group, rate, burst, max_in_flight, self.log)
+        return self.limiters[group]
+
+    @asynccontextmanager
+    async def slot(self, url):
+        slot = Slot()
+        if not self.enabled:
+            yield slot
+            return
+        limiter = self.limiter(url)
+        await limiter.acquire()
+        try:
+            yield slot
+        except BaseException:
+            # 异常本身（超时、网络错误、取消）不算反爬信号，除非调用方已报告
+            if slot.outcome == 'ok':
+                slot.outcome = None
+            raise
+        finally:
+            # release 只涉及本地状态，取消时也要执行，避免并发槽位泄漏
+            await asyncio.shield(limiter.release(slot.outcome))
+
+    def state(self):
+        return {name: limiter.state() for name, limiter in self.limiters.items()}
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Readiness - 按平台判断页面正文是否已就绪，取代固定时长的 sleep
+每个平台的就绪条件依次为：
+1. 正文容器出现（selector）
+2. 正文内容稳定（连续几次轮询 innerHTML 长度不变）
+3. 正文中的图片都已带上可用的 src / data-src
+4. 网络空闲（可选，带上限）
+所有阶段共享一个总的等待上限，并返回实际耗时。
+各平台的就绪条件由平台插件声明（scripts/platforms/）。
+"""
+
+import time
+import asyncio
+
+STABLE_POLL_INTERVAL = 0.25
+STABLE_ROUNDS = 2
+
+# 兜底：未声明就绪条件的平台只等网络空闲
+DEFAULT_READINESS = {'selector': None, 'images': False, 'network_idle': 3.0, 'max_wait': 5.0}
+
+
+async def wait_for_stable(page, selector, deadline):
+    last_size = -1
+    stable = 0
+    while time.monotonic() < deadline:
+        size = await page.evaluate(
+            "(sel) => { const el = document.querySelector(sel); return el ? el.innerHTML.length : -1; }",
+            selector,
+        )
+        if size > 0 and size == last_size:
+            stable += 1
+            if stable >= STABLE_ROUNDS:
+                return True
+        else:
+            stable = 0
+            last_size = size
+        await asyncio.sleep(STABLE_POLL_INTERVAL)
+    return False
+
+
+async def wait_for_images(page, selector, timeout):
+    # 懒加载图片：src 可能是占位的 data: URI，真实地址在 data-src / data-actualsrc / data-original
+    await page.wait_for_function(
+        """
+        (sel) => {
+            const el = document.querySelector(sel);
+            if (!el) return false;
+            return Array.from(el.querySelectorAll('img')).every(img => {
+                const src = img.getAttribute('data-src') || img.getAttribute('data-actualsrc') ||
+                            img.getAttribute('data-original') || img.getAttribute('src') || '';
+                return src.startsWith('http');
+            });
+        }
+        """,
+        arg=selector,
+        polling=200,
+        timeout=timeout * 1000,
+    )
+
+
+async def wait_until_ready(page, config=DEFAULT_READINESS):
+    """按就绪条件 config 等待页面就绪，返回 {'ready': bool, 'total': 秒, 各阶段: 秒}"""
+    started = time.monotonic()
+    deadline = started + config['max_wait']
+    timings = {'ready': False}
+
+    def remaining():
+        # Playwright 中 timeout=0 表示不限时，这里保证至少 1ms
+        return max(deadline - time.monotonic(), 0.001)
+
+    async def stage(name, coro_factory):
+        stage_started = time.monotonic()
+        try:
+            if time.monotonic() < deadline:
+                return await coro_factory() is not False
+        except Exception:
+            pass
+        finally:
+            timings[name] = round(time.monotonic() - stage_started, 3)
+        return False
+
+    selector = config['selector']
+    if selector:
+        found = await stage('selector', lambda: page.wait_for_selector(
+            selector, state='attached', timeout=remaining() * 1000))
+        if found:
+            # 选择器可能匹配多个候选，后续阶段只针对实际存在的那个
+            matched = await page.evaluate(
+                "(sels) => sels.find(s => document.querySelector(s)) || null",
+                [s.strip() for s in selector.split(',')],
+            )
+            stable = await stage('stable', lambda: wait_for_stable(page, matched, deadline))
+            images = True
+            if config['images']:
+                # 懒加载图片没有拿到地址时正文仍不完整，同样算未就绪
+                images = await stage('images', lambda: wait_for_images(page, matched, remaining()))
+            timings['ready'] = stable and images
+    if config['network_idle']:
+        idle = await stage('network_idle', lambda: page.wait_for_load_state(
+            'networkidle', timeout=min(config['network_idle'], remaining()) * 1000))
+        if not selector:
+            # 没有正文选择器时，网络空闲是唯一的就绪信号，超时即未就绪
+            timings['ready'] = idle
+
+    timings['total'] = round(time.monotonic() - started, 3)
+    return timings
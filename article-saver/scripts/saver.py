@@ -7,54 +7,130 @@ Article Saver - 专注微信、X、知乎的文章抓取工具
 3. 专注正文内容，剔除冗余元数据
 """
 
-import os
-import sys
-import json
+import time
+import argparse
 import asyncio
-import requests
 import re
 import shutil
+import sqlite3
 from urllib.parse import urlparse
 from pathlib import Path
 from datetime import datetime
-from playwright.async_api import async_playwright
+from contextlib import contextmanager
+from browser_pool import BrowserPool
+from image_store import ImageStore, link_or_copy
+from staging import StagingArea
+from bundle import BundleWriter, BundleReader, BUNDLE_MODES, locate, article_exists
+from search_index import SearchIndex, SEARCH_INDEX_FILENAME
+from fetch_index import FetchIndex, content_hash
+from readiness import wait_until_ready
+from resource_policy import install_route_policy
+from wechat_http import is_blocked_html, decode_html
+import platforms
+from platforms import DESKTOP_UA
+from platforms.x import DEFAULT_THREAD_LIMIT
+import tracing
+from tracing import TraceRecorder, span
+from strategies import HedgedRace, StrategyStats, DEFAULT_HEDGE_DELAY
+from rate_limit import RateLimiter, Slot, THROTTLE_STATUS, parse_rate_limits
+from html2md import (
+    fill_image_placeholders, rewrite_image_links, find_markdown_images,
+)
+from image_downloader import (
+    ImageDownloader, ImageDownloadError, DEFAULT_IMAGE_CONCURRENCY, DEFAULT_IMAGE_TIMEOUT,
+    DEFAULT_IMAGE_MODE, IMAGE_MODES,
+    check_status, image_filename,
+)
+from image_post import ImagePostProcessor, DEFAULT_POST_WORKERS, DEFAULT_PREVIEW_SIZE
+from daemon import SaverDaemon, serve, DEFAULT_HOST, DEFAULT_PORT
+from shard import run_sharded
+from batch import BatchRunner, RunJournal, DEFAULT_CONCURRENCY, journal_path, parse_platform_limits, read_urls
 
 # 配置
 DEFAULT_OUTPUT_ROOT = Path.home() / "Documents/WebContent/素材"
 SCRIPT_DIR = Path(__file__).parent
 SKILL_DIR = SCRIPT_DIR.parent
 DATA_DIR = SKILL_DIR / "data"
-WECHAT_AUTH_FILE = DATA_DIR / "wechat_auth.json"
-ZHIHU_AUTH_FILE = DATA_DIR / "zhihu_auth.json"
-
-# 确保数据目录存在
-DATA_DIR.mkdir(parents=True, exist_ok=True)
+FETCH_INDEX_FILENAME = "fetch_index.sqlite"
+IMAGE_STORE_DIRNAME = ".store"
+STRATEGY_STATS_FILENAME = "strategy_stats.json"
+JINA_ENDPOINT = "https://r.jina.ai"
+JINA_TIMEOUT = 30
 
 class ArticleSaver:
-    def __init__(self, verbose=True):
+    def __init__(self, verbose=True, browser_pool=None,
+                 image_concurrency=DEFAULT_IMAGE_CONCURRENCY, image_timeout=DEFAULT_IMAGE_TIMEOUT,
+                 image_mode=DEFAULT_IMAGE_MODE, dedup=False, force=False, max_age=None,
+                 block_resources=True, block_images=True, http_fast_path=True,
+                 hedge_delay=DEFAULT_HEDGE_DELAY, trace_path=None,
+                 output_root=DEFAULT_OUTPUT_ROOT, data_dir=DATA_DIR, proxy=None, jina_endpoint=JINA_ENDPOINT,
+                 rate_limit=True, rate_limits=None, bundle=None, thread_limit=DEFAULT_THREAD_LIMIT,
+                 post_workers=DEFAULT_POST_WORKERS, previews=False, preview_size=DEFAULT_PREVIEW_SIZE):
         self.verbose = verbose
-        self.output_root = DEFAULT_OUTPUT_ROOT
-        self.mobile_ua = 'Mozilla/5.0 (iPhone; CPU iPhone OS 16_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Mobile/15E148 MicroMessenger/8.0.38(0x18002629) NetType/WIFI Language/zh_CN'
-        self.desktop_ua = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+        self.browser_pool = browser_pool
+        # output_root / data_dir / proxy / jina_endpoint 可以整体指向本地环境（如离线基准的夹具服务器）
+        self.output_root = Path(output_root)
+        self.data_dir = Path(data_dir)
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.proxy = proxy
+        self.jina_endpoint = jina_endpoint.rstrip('/')
+        self.image_mode = image_mode
+        # 导航阶段拦截字体、音视频、埋点（以及可选的图片）
+        self.block_resources = block_resources
+        self.block_images = block_images
+        # 微信公众号优先走免浏览器的 HTTP 快速通道
+        self.http_fast_path = http_fast_path
+        # 多个抓取策略（Jina / HTTP / 浏览器）的对冲延迟，以及按平台积累的策略统计
+        self.hedge_delay = hedge_delay
+        self.strategy_stats = StrategyStats(self.data_dir / STRATEGY_STATS_FILENAME)
+        # 分阶段耗时记录；trace_path 不为空时每篇文章输出一行 JSON
+        self.tracer = TraceRecorder(trace_path)
+        # 已保存文章的索引：force 忽略索引重新抓取；max_age（秒）之内的记录直接跳过
+        self.fetch_index = FetchIndex(self.data_dir / FETCH_INDEX_FILENAME)
+        self.force = force
+        self.max_age = max_age
+        self.desktop_ua = DESKTOP_UA
+        # X 推文串逐屏滚动收集的推文数上限
+        self.thread_limit = thread_limit
+        # 按域名组的自适应限速：文章页、Jina 与图床各自维护速率和并发，遇到反爬信号时退让
+        self.rate_limiter = RateLimiter(rate_limits, enabled=rate_limit, log=self.log)
+        # 每篇文章先写入暂存目录，完成后原子提交；启动时清理中断遗留的暂存目录
+        self.staging = StagingArea(self.output_root, log=self.log)
+        removed = self.staging.cleanup()
+        if removed:
+            self.log(f"🧹 已清理 {removed} 个中断遗留的暂存目录")
+        # 打包输出：每篇文章（article）或每天的文章（day）写入一个不压缩的 zip，None 为文件夹布局
+        self.bundles = BundleWriter(bundle, log=self.log) if bundle else None
+        # 归档的全文检索索引，每保存一篇文章增量更新（scripts/search.py 检索）
+        self.search_index = SearchIndex(self.output_root / SEARCH_INDEX_FILENAME)
+        # 可选的内容寻址图片库，跨文章去重
+        self.image_store = ImageStore(self.output_root / IMAGE_STORE_DIRNAME) if dedup else None
+        # 下载完成的图片在进程池中识别真实格式、校验完整性并计算哈希（post_workers 为 0 时关闭）
+        self.image_post = ImagePostProcessor(post_workers, previews, preview_size, log=self.log) if post_workers else None
+        # 图片下载器在整个实例内共享：并发上限全局生效，连接池跨文章复用
+        self.image_downloader = ImageDownloader(
+            self.desktop_ua,
+            max_in_flight=image_concurrency,
+            timeout=image_timeout,
+            store=self.image_store,
+            proxy=proxy,
+            rate_limiter=self.rate_limiter,
+            post=self.image_post,
+            log=self.log,
+        )
+
+    def close(self):
+        """关闭图片连接池和后处理进程池"""
+        self.image_downloader.close()
 
     def log(self, msg):
         if self.verbose:
             print(msg)
 
-    def identify_platform(self, url):
-        parsed = urlparse(url)
-        domain = parsed.netloc.lower()
-        path = parsed.path.lower()
-
-        if 'mp.weixin.qq.com' in domain:
-            return '微信公众号', 'wechat'
-        elif 'x.com' in domain or 'twitter.com' in domain:
-            return 'X', 'x'
-        elif 'zhihu.com' in domain:
-            if 'zhuanlan' in domain:
-                return '知乎专栏', 'zhihu'
-            return '知乎', 'zhihu'
-        return '其他', 'other'
+    @staticmethod
+    def identify_platform(url):
+        platform = platforms.identify(url)
+        return platform.display_name(url), platform.id
 
     def sanitize_filename(self, name, max_length=50):
         name = re.sub(r'[<>:"/\\|?*\n\r\t]', '', name)
@@ -65,18 +141,21 @@ class ArticleSaver:
 
     def read_with_jina(self, url):
         try:
-            jina_url = f"https://r.jina.ai/{url}"
+            jina_url = f"{self.jina_endpoint}/{url}"
             headers = {
                 'Accept': 'text/markdown',
                 'User-Agent': self.desktop_ua
             }
-            response = requests.get(jina_url, headers=headers, timeout=30)
+            response = self.image_downloader.session.get(jina_url, headers=headers, timeout=JINA_TIMEOUT)
             if response.status_code == 200:
                 content = response.text
                 if '环境异常' in content or '完成验证' in content or '403 Forbidden' in content:
-                    return {'success': False, 'error': 'Jina 也无法绕过验证'}
+                    return {'success': False, 'error': 'Jina 也无法绕过验证', 'blocked': '验证页'}
                 return {'success': True, 'content': content}
-            return {'success': False, 'error': f'HTTP {response.status_code}'}
+            result = {'success': False, 'error': f'HTTP {response.status_code}'}
+            if response.status_code in THROTTLE_STATUS:
+                result['blocked'] = f'HTTP {response.status_code}'
+            return result
         except Exception as e:
             return {'success': False, 'error': str(e)}
 
@@ -87,123 +166,269 @@ class ArticleSaver:
         return "Unknown_Title"
 
     def extract_images_from_content(self, content):
-        return re.findall(r'!\[.*?\]\((https?://[^\s\)]+)\)', content)
-
-    def download_image_requests(self, url, save_dir, index):
+        return find_markdown_images(content)
+
+    def revalidate(self, url, record):
+        """用保存时的 ETag/Last-Modified 发起条件请求，服务器返回 304 表示内容未变化"""
+        headers = {'User-Agent': self.desktop_ua}
+        if record.get('etag'):
+            headers['If-None-Match'] = record['etag']
+        if record.get('last_modified'):
+            headers['If-Modified-Since'] = record['last_modified']
+        if len(headers) == 1:
+            return False
         try:
-            headers = {'User-Agent': self.desktop_ua}
-            # 处理防盗链
-            if 'zhihu.com' in url or 'zhimg.com' in url:
-                headers['Referer'] = 'https://www.zhihu.com/'
-
-            response = requests.get(url, headers=headers, timeout=30)
-            if response.status_code == 200:
-                content_type = response.headers.get('content-type', '')
-                ext = '.jpg'
-                if 'png' in content_type: ext = '.png'
-                elif 'gif' in content_type: ext = '.gif'
-                elif 'webp' in content_type: ext = '.webp'
-
-                filename = f"img_{index:02d}{ext}"
-                filepath = save_dir / filename
-                filepath.write_bytes(response.content)
-                return filename
+            with self.image_downloader.session.get(url, headers=headers, timeout=15, stream=True) as response:
+                return response.status_code == 304
         except Exception:
-            pass
-        return None
+            return False
+
+    async def check_previous(self, url, platform_name, platform_id):
+        """返回 (跳过时的结果, 上次保存的记录)"""
+        record = self.fetch_index.get(url)
+        if self.force or not FetchIndex.is_saved(record):
+            return None, record
+
+        skipped = {"success": True, "skipped": True, "save_dir": record['save_dir'],
+                   "platform_name": platform_name, "platform_id": platform_id}
+        if FetchIndex.is_fresh(record, self.max_age):
+            self.log(f"⏭️ 已保存过，跳过: {record['save_dir']}（使用 --force 强制重新抓取）")
+            return skipped, record
+        if await asyncio.to_thread(self.revalidate, url, record):
+            self.fetch_index.touch(url)
+            self.log(f"⏭️ 服务器确认内容未变化 (304)，跳过: {record['save_dir']}")
+            return skipped, record
+        self.log("🔄 已保存的版本已过期，重新抓取正文，复用本地已有图片")
+        return None, record
+
+    def unchanged(self, url, data, previous, platform_name, platform_id):
+        """
+        过期重抓拿到的正文与上次保存时相同（哈希按下载图片之前的正文计算）时，
+        不再下载图片、不重写文章，只刷新抓取时间，返回跳过结果；否则返回 None
+        """
+        data['content_hash'] = content_hash(data['content'])
+        if self.force or not FetchIndex.is_saved(previous) or previous.get('content_hash') != data['content_hash']:
+            return None
+        self.fetch_index.touch(url, etag=data.get('etag'), last_modified=data.get('last_modified'))
+        self.log(f"⏭️ 正文与上次保存时相同，跳过: {previous['save_dir']}")
+        return {"success": True, "skipped": True, "save_dir": previous['save_dir'],
+                "platform_name": platform_name, "platform_id": platform_id}
+
+    @contextmanager
+    def staged(self, data, previous):
+        """
+        为已拿到正文的文章创建暂存目录，图片和 content.md 都写在其中，由 save() 原子提交。
+        重新抓取已保存过的文章时记录原目录，提交时原地替换，避免按日期生成重复副本。
+        暂存期间出错则删除暂存目录。
+        """
+        target = previous['save_dir'] if previous and article_exists(previous['save_dir']) else None
+        staging_dir = self.staging.create(target)
+        data['staging_dir'] = str(staging_dir)
+        data['target_dir'] = target
+        try:
+            yield staging_dir
+        except BaseException:
+            self.staging.discard(staging_dir)
+            raise
+
+    def reuse_images(self, urls, staging_dir, previous):
+        """上次已下载且仍在磁盘上的图片不再下载，按本次的序号链接（或复制）到暂存目录"""
+        if self.force or not previous:
+            return {}
+        known = previous.get('images', {})
+        located = locate(previous['save_dir'])
+        if located:
+            return self.reuse_bundled_images(urls, staging_dir, known, *located)
+        if not Path(previous['save_dir']).is_dir():
+            return {}
+
+        previous_dir = Path(previous['save_dir'])
+        reused = {}
+        for i, img_url in enumerate(urls):
+            filename = known.get(img_url)
+            if filename and (previous_dir / filename).exists():
+                new_name = f"img_{i:02d}{Path(filename).suffix}"
+                link_or_copy(previous_dir / filename, staging_dir / new_name)
+                reused[i] = {"filename": new_name, "temp_path": str(staging_dir / new_name), "cached": True}
+        return reused
+
+    def reuse_bundled_images(self, urls, staging_dir, known, bundle, folder):
+        """上次保存在包内：从 mmap 中直接切出图片写入暂存目录"""
+        reused = {}
+        with BundleReader(bundle) as reader:
+            for i, img_url in enumerate(urls):
+                filename = known.get(img_url)
+                if not filename or f"{folder}/{filename}" not in reader:
+                    continue
+                new_name = f"img_{i:02d}{Path(filename).suffix}"
+                with reader.read(f"{folder}/{filename}") as data:
+                    (staging_dir / new_name).write_bytes(data)
+                reused[i] = {"filename": new_name, "temp_path": str(staging_dir / new_name), "cached": True}
+        return reused
+
+    def record_fetch(self, url, save_dir, data, downloaded):
+        self.fetch_index.record(
+            url, save_dir, data.get('content_hash') or content_hash(data['content']),
+            etag=data.get('etag'), last_modified=data.get('last_modified'),
+            images={img['original_url']: img['filename'] for img in downloaded},
+        )
 
     async def scrape(self, url):
         platform_name, platform_id = self.identify_platform(url)
         self.log(f"📍 目标平台: {platform_name}")
 
-        # 如果知乎被限制，尝试使用 Jina Reader 作为备选
-        if platform_id == 'zhihu':
-            self.log("🔄 知乎平台尝试使用 Jina Reader 策略...")
-            jina_data = self.read_with_jina(url)
-            if jina_data.get('success'):
-                # 构造符合 extract_content 结构的数据
-                title = self.extract_title_from_content(jina_data['content'])
-                image_urls = self.extract_images_from_content(jina_data['content'])
-                data = {
-                    'title': title,
-                    'author': '知乎用户',
-                    'content': jina_data['content'],
-                    'image_urls': image_urls
-                }
-
-                # Jina 返回的 markdown 中图片已经是 ![...](url) 格式
-                # 我们需要下载这些图片并替换本地路径
-
-                # 路径规划
-                date_str = datetime.now().strftime("%Y-%m-%d")
-                title_sanitized = self.sanitize_filename(title)
-                folder_name = f"{date_str}_{title_sanitized}"
-                save_dir = self.output_root / platform_name / folder_name
-                save_dir.mkdir(parents=True, exist_ok=True)
-
-                downloaded = []
-                for i, img_url in enumerate(image_urls):
-                    self.log(f"  ⬇️ 下载图片 [{i+1}/{len(image_urls)}]: {img_url[:50]}...")
-                    local_name = self.download_image_requests(img_url, save_dir, i)
-                    if local_name:
-                        downloaded.append({"index": i, "filename": local_name, "temp_path": str(save_dir / local_name), "original_url": img_url})
-
-                # 更新内容中的图片引用
-                content = data['content']
-                for img_info in downloaded:
-                    # Jina 返回的 markdown 图片格式通常是 ![alt](url)
-                    # 我们简单替换 url 为本地文件名
-                    content = content.replace(img_info['original_url'], img_info['filename'])
-
-                data['content'] = content
-
-                # 直接保存，不需要再走 self.save 的移动逻辑，因为已经下载到目标目录了
-                meta = f"""---
-title: {data['title']}
-author: {data['author']}
-platform: {platform_name}
-url: {url}
-saved_at: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
----
-
-"""
-                md_file = save_dir / "content.md"
-                md_file.write_text(meta + content, encoding='utf-8')
-                self.log(f"\n✅ 已保存至: {save_dir}")
-
-                return {"success": True, "data": data, "platform_name": platform_name, "platform_id": platform_id}
-
-        async with async_playwright() as p:
-            # 针对不同平台选择 UA
-            ua = self.mobile_ua if platform_id == 'wechat' else self.desktop_ua
-            browser = await p.chromium.launch(headless=True)
-
-            # 加载登录态
-            context_args = {"user_agent": ua}
-            if platform_id == 'wechat' and WECHAT_AUTH_FILE.exists():
-                context_args["storage_state"] = str(WECHAT_AUTH_FILE)
-            elif platform_id == 'zhihu':
-                if ZHIHU_AUTH_FILE.exists():
-                    context_args["storage_state"] = str(ZHIHU_AUTH_FILE)
-                    self.log("🔑 已加载知乎登录态")
-                else:
-                    self.log("⚠️ 未检测到知乎登录态 (data/zhihu_auth.json)，可能会触发反爬验证")
-
-            context = await browser.new_context(**context_args)
-            page = await context.new_page()
-
-            # 针对知乎的特殊处理：知乎可能会有强反爬
+        tracing.annotate(platform=platform_id)
+        with span('check_previous'):
+            skipped, previous = await self.check_previous(url, platform_name, platform_id)
+        if skipped:
+            return skipped
+
+        race = HedgedRace(platform_id, self.strategy_stats, self.hedge_delay, self.log)
+        result = await race.run(self.fetch_strategies(url, platform_id, platform_name, previous))
+        return result or {"success": False, "error": "没有可用的抓取策略"}
+
+    def fetch_strategies(self, url, platform_id, platform_name, previous=None):
+        """按默认顺序返回 [(策略名, async fn(claim))]，实际启动顺序由 HedgedRace 按历史统计调整"""
+        available = {
+            'jina': lambda claim: self.scrape_with_jina(url, platform_name, platform_id, previous, claim),
+            'browser': lambda claim: self.scrape_browser(url, platform_id, platform_name, previous, claim),
+        }
+        if self.http_fast_path:
+            available['http'] = lambda claim: self.scrape_http(url, platform_name, platform_id, previous, claim)
+        # 每个平台插件声明自己的策略顺序（如知乎 Jina + 浏览器、微信公众号 HTTP + 浏览器）
+        return [(name, available[name]) for name in platforms.get(platform_id).strategies if name in available]
+
+    async def scrape_with_jina(self, url, platform_name, platform_id, previous=None, claim=None):
+        self.log(f"🔄 {platform_name}尝试使用 Jina Reader 策略...")
+        # 在线程中执行阻塞请求（复用连接池），避免卡住事件循环
+        async with self.rate_limiter.slot(self.jina_endpoint) as slot:
+            with span('jina_fetch'):
+                jina_data = await asyncio.to_thread(self.read_with_jina, url)
+            if jina_data.get('blocked'):
+                slot.throttle(jina_data['blocked'])
+        if not jina_data.get('success'):
+            return jina_data
+        if claim and not claim():
+            return None
+
+        # 构造与浏览器提取结果相同结构的数据
+        title = self.extract_title_from_content(jina_data['content'])
+        image_urls = self.extract_images_from_content(jina_data['content'])
+        data = {
+            'title': title,
+            'author': platforms.get(platform_id).default_author,
+            'content': jina_data['content'],
+            'image_urls': image_urls
+        }
+
+        skipped = self.unchanged(url, data, previous, platform_name, platform_id)
+        if skipped:
+            return skipped
+        with self.staged(data, previous) as staging_dir:
+            reused = self.reuse_images(image_urls, staging_dir, previous)
+            with span('download_images'):
+                data['downloaded_images'] = await self.image_downloader.download_to_dir(image_urls, staging_dir, reused)
+
+        # Jina 返回的图片格式为 ![alt](url)，单遍替换为本地文件名；正文里原样出现的 {{IMG_n}} 是文字，save 阶段不再替换
+        data['content'] = rewrite_image_links(
+            data['content'], {img_info['original_url']: img_info['filename'] for img_info in data['downloaded_images']}
+        )
+        data['links_rewritten'] = True
+        return {"success": True, "data": data, "platform_name": platform_name, "platform_id": platform_id}
+
+    async def scrape_browser(self, url, platform_id, platform_name, previous=None, claim=None):
+        context_args = self.build_context_args(platform_id)
+        # 同一域名组同时打开的页面数和导航速率由限速器控制，触发反爬时自动收缩
+        async with self.rate_limiter.slot(url) as slot:
+            if self.browser_pool is not None:
+                return await self.scrape_with_browser(self.browser_pool, url, platform_id, platform_name, context_args, previous, claim, slot)
+
+            # 单篇模式：临时启动一个浏览器，用完即关
+            async with BrowserPool(max_pages=1, proxy=self.proxy) as pool:
+                return await self.scrape_with_browser(pool, url, platform_id, platform_name, context_args, previous, claim, slot)
+
+    async def scrape_http(self, url, platform_name, platform_id, previous=None, claim=None):
+        self.log("⚡ 尝试免浏览器快速通道...")
+        platform = platforms.get(platform_id)
+        try:
+            async with self.rate_limiter.slot(url) as slot:
+                with span('http_fetch'):
+                    data, response = await asyncio.to_thread(
+                        platform.fetch_http, self.image_downloader.session, url, self.auth_file(platform)
+                    )
+                if response.status_code in THROTTLE_STATUS:
+                    slot.throttle(f"HTTP {response.status_code}")
+                elif not data and is_blocked_html(decode_html(response)):
+                    slot.throttle('验证页')
+        except Exception as e:
+            return {"success": False, "error": f"快速通道请求失败: {str(e)}"}
+        if not data:
+            return {"success": False, "error": f"快速通道未能提取正文 (HTTP {response.status_code})"}
+        if claim and not claim():
+            return None
+
+        data['etag'] = response.headers.get('etag')
+        data['last_modified'] = response.headers.get('last-modified')
+
+        skipped = self.unchanged(url, data, previous, platform_name, platform_id)
+        if skipped:
+            return skipped
+        extra_headers = {'Referer': platform.image_referer} if platform.image_referer else None
+        with self.staged(data, previous) as staging_dir:
+            reused = self.reuse_images(data['image_urls'], staging_dir, previous)
+            with span('download_images'):
+                data['downloaded_images'] = await self.image_downloader.download_to_dir(
+                    data['image_urls'], staging_dir, reused, extra_headers=extra_headers
+                )
+        return {"success": True, "data": data, "platform_name": platform_name, "platform_id": platform_id}
+
+    def auth_file(self, platform):
+        """平台插件声明的登录态文件（位于 data_dir 下），未声明时返回 None"""
+        return self.data_dir / platform.auth_file if platform.auth_file else None
+
+    def build_context_args(self, platform_id):
+        # UA 与登录态由平台插件声明
+        platform = platforms.get(platform_id)
+        context_args = {"user_agent": platform.user_agent}
+        auth_file = self.auth_file(platform)
+        if auth_file and auth_file.exists():
+            context_args["storage_state"] = str(auth_file)
+            if platform.warn_without_auth:
+                self.log(f"🔑 已加载{platform.name}登录态")
+        elif auth_file and platform.warn_without_auth:
+            self.log(f"⚠️ 未检测到{platform.name}登录态 ({auth_file})，可能会触发反爬验证")
+        return context_args
+
+    async def scrape_with_browser(self, pool, url, platform_id, platform_name, context_args, previous=None, claim=None, slot=None):
+        slot = slot or Slot()
+        platform = platforms.get(platform_id)
+        async with pool.page(platform_id, context_args) as page:
+            response = None
+            readiness = None
+            route_stats = None
+            if self.block_resources:
+                route_stats = await install_route_policy(page, platform.block_hosts, self.block_images)
             try:
                 self.log(f"🌐 正在访问: {url}")
-                await page.goto(url, wait_until="domcontentloaded", timeout=60000)
-
-                # 等待并处理可能的重定向或反爬
-                if platform_id == 'zhihu':
-                    await page.wait_for_timeout(3000)
-                    if "liantong" in page.url or "captcha" in page.url:
-                        self.log("⚠️ 检测到知乎验证码或跳转")
-
-                await page.wait_for_timeout(2000)
+                with span('goto'):
+                    response = await page.goto(url, wait_until="domcontentloaded", timeout=60000)
+                if response is not None and response.status in THROTTLE_STATUS:
+                    slot.throttle(f"HTTP {response.status}")
+
+                # 按平台的就绪条件等待，而不是固定 sleep
+                with span('readiness'):
+                    readiness = await wait_until_ready(page, platform.readiness)
+                for stage, seconds in readiness.items():
+                    if stage not in ('ready', 'total'):
+                        tracing.add_span(f"readiness.{stage}", seconds)
+                stages = ' / '.join(f"{k} {v:.2f}s" for k, v in readiness.items() if k not in ('ready', 'total'))
+                status = "就绪" if readiness['ready'] else "未完全就绪，已达等待上限"
+                self.log(f"⏱️ 页面{status}，等待 {readiness['total']:.2f}s（{stages}）")
+
+                # 处理可能的重定向或反爬
+                if any(marker in page.url for marker in platform.blocked_url_markers):
+                    self.log(f"⚠️ 检测到{platform.name}验证码或跳转")
+                    slot.throttle('captcha')
             except Exception as e:
                 self.log(f"⚠️ 页面加载异常: {str(e)}")
 
@@ -214,242 +439,155 @@ saved_at: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
             self.log(f"🔗 当前 URL: {current_url}")
 
             # 提取逻辑
-            data = await self.extract_content(page, platform_id)
+            with span('extract'):
+                data = await platform.extract(page, thread_limit=self.thread_limit)
 
             if not data or not data.get('content'):
                 # 记录失败时的 HTML 片段
                 html = await page.content()
                 self.log(f"⚠️ 提取失败。页面 HTML 长度: {len(html)}")
+                if is_blocked_html(html):
+                    slot.throttle('验证页')
                 if len(html) > 0:
                     self.log(f"⚠️ HTML 前 500 字: {html[:500]}")
 
-                await browser.close()
                 return {"success": False, "error": f"未能提取到有效内容 (标题: {page_title}, URL: {current_url})"}
-
-            # 下载图片
-            downloaded_images = await self.download_images(page, data['image_urls'], platform_id)
+            if claim and not claim():
+                return None
+
+            data['readiness'] = readiness
+            if route_stats is not None:
+                self.log(f"🚫 资源拦截: {route_stats.summary()}")
+                data['route_stats'] = route_stats.to_dict()
+                tracing.annotate(route_stats=data['route_stats'])
+
+            # 记录缓存校验头，供下次条件请求使用
+            if response is not None:
+                data['etag'] = response.headers.get('etag')
+                data['last_modified'] = response.headers.get('last-modified')
+
+            skipped = self.unchanged(url, data, previous, platform_name, platform_id)
+            if skipped:
+                return skipped
+
+            # 下载图片：写入本篇文章的暂存目录，save() 时整体提交
+            with self.staged(data, previous) as staging_dir:
+                reused = self.reuse_images(data['image_urls'], staging_dir, previous)
+                with span('download_images'):
+                    downloaded_images = await self.download_images(page, data['image_urls'], platform_id, staging_dir, reused)
             data['downloaded_images'] = downloaded_images
 
-            await browser.close()
             return {"success": True, "data": data, "platform_name": platform_name, "platform_id": platform_id}
 
-    async def extract_content(self, page, platform_id):
-        if platform_id == 'wechat':
-            return await page.evaluate("""
-                () => {
-                    const title = document.querySelector('#activity-name')?.innerText?.trim() || '';
-                    const author = document.querySelector('#js_name')?.innerText?.trim() || '';
-                    const contentEl = document.querySelector('#js_content');
-                    if (!contentEl) return null;
-
-                    const image_urls = [];
-                    const imgs = contentEl.querySelectorAll('img');
-                    imgs.forEach((img, i) => {
-                        let src = img.getAttribute('data-src') || img.getAttribute('src');
-                        if (src && src.startsWith('http')) {
-                            image_urls.push(src);
-                            const placeholder = document.createTextNode(`{{IMG_${i}}}`);
-                            img.parentNode.replaceChild(placeholder, img);
-                        }
-                    });
-
-                    let markdown = contentEl.innerHTML
-                        .replace(/<h[1-6][^>]*>(.*?)<\\/h[1-6]>/gi, (m, c) => `\\n## ${c.replace(/<[^>]+>/g, '')}\\n`)
-                        .replace(/<p[^>]*>/gi, '\\n')
-                        .replace(/<br[^>]*>/gi, '\\n')
-                        .replace(/<strong[^>]*>(.*?)<\\/strong>/gi, '**$1**')
-                        .replace(/<[^>]+>/g, '')
-                        .replace(/\\n{3,}/g, '\\n\\n')
-                        .trim();
-
-                    return { title, author, content: markdown, image_urls };
-                }
-            """)
-        elif platform_id == 'zhihu':
-            return await page.evaluate("""
-                () => {
-                    let title = document.querySelector('.QuestionHeader-title')?.innerText ||
-                                document.querySelector('.Post-Title')?.innerText ||
-                                document.querySelector('h1')?.innerText || '';
-                    let author = document.querySelector('.AuthorInfo-name')?.innerText ||
-                                 document.querySelector('.UserLink-link')?.innerText || '';
-
-                    // 知乎回答、文章或专栏正文
-                    let contentEl = document.querySelector('.RichText.ztext') ||
-                                    document.querySelector('.Post-RichTextContainer') ||
-                                    document.querySelector('.Post-Content') ||
-                                    document.querySelector('article');
-
-                    if (!contentEl) return null;
-
-                    const image_urls = [];
-                    const imgs = contentEl.querySelectorAll('img');
-                    imgs.forEach((img, i) => {
-                        let src = img.getAttribute('data-actualsrc') ||
-                                 img.getAttribute('data-original') ||
-                                 img.getAttribute('src');
-                        if (src && src.startsWith('http')) {
-                            // 移除动态尺寸参数，获取原图
-                            if (src.includes('?')) {
-                                src = src.split('?')[0];
-                            }
-                            image_urls.push(src);
-                            const placeholder = document.createTextNode(`{{IMG_${i}}}`);
-                            img.parentNode.replaceChild(placeholder, img);
-                        }
-                    });
-
-                    let markdown = contentEl.innerText.replace(/\\n{3,}/g, '\\n\\n').trim();
-                    return { title, author, content: markdown, image_urls };
-                }
-            """)
-        elif platform_id == 'x':
-            # X 的逻辑：尝试抓取主推文内容或长文内容
-            return await page.evaluate("""
-                () => {
-                    // 1. 查找推文或长文容器
-                    const tweet = document.querySelector('article[data-testid="tweet"]') ||
-                                  document.querySelector('article[role="article"]') ||
-                                  document.querySelector('main article');
-                    if (!tweet) return null;
-
-                    // 2. 提取作者
-                    const authorEl = document.querySelector('div[data-testid="User-Name"]') ||
-                                     document.querySelector('div[data-testid="AuthorInfo-name"]');
-                    const author = authorEl?.innerText?.split('\\n')[0] || 'X_User';
-
-                    // 3. 提取内容（支持普通推文和长文）
-                    const textEl = tweet.querySelector('div[data-testid="tweetText"]') ||
-                                   tweet.querySelector('div[data-testid="articleBody"]') ||
-                                   tweet;
-
-                    // 4. 提取标题
-                    let title = '';
-                    const articleTitleEl = tweet.querySelector('div[data-testid="articleTitle"]');
-                    if (articleTitleEl) {
-                        title = articleTitleEl.innerText;
-                    } else {
-                        // 如果没有专门的标题，使用内容前30个字符
-                        const text = textEl?.innerText || '';
-                        title = text.slice(0, 30).replace(/\\n/g, ' ') || 'X_Post';
+    async def download_images(self, page, urls, platform_id, save_dir, reused=None):
+        if self.image_mode == 'stream':
+            return await self.stream_images(page, urls, platform_id, save_dir, reused)
+
+        import base64
+
+        async def fetch(index, url):
+            # 在浏览器环境下下载以获取原图（处理 referer/cookies）
+            img_data = await page.evaluate("""
+                async (url) => {
+                    try {
+                        const response = await fetch(url);
+                        if (!response.ok) return { success: false, status: response.status };
+                        const blob = await response.blob();
+                        return await new Promise((resolve, reject) => {
+                            const reader = new FileReader();
+                            reader.onloadend = () => {
+                                const base64data = reader.result.split(',')[1];
+                                resolve({ success: true, data: base64data, type: blob.type });
+                            };
+                            reader.onerror = reject;
+                            reader.readAsDataURL(blob);
+                        });
+                    } catch (e) {
+                        return { success: false, error: e.toString() };
                     }
-
-                    // 5. 提取图片
-                    const image_urls = [];
-                    // 查找所有可能的图片容器
-                    const photoEls = tweet.querySelectorAll('div[data-testid="tweetPhoto"] img, div[data-testid="articleImage"] img, img[src*="/media/"], img[src*="pbs.twimg.com/media"]');
-
-                    photoEls.forEach((img, i) => {
-                        let src = img.getAttribute('src');
-                        if (src) {
-                            // 转换为原图链接
-                            if (src.includes('format=')) {
-                                // 处理类似 https://pbs.twimg.com/media/xxxx?format=jpg&name=small 的链接
-                                src = src.replace(/name=[a-zA-Z0-9_]+/, 'name=large');
-                            } else if (src.includes('pbs.twimg.com/media')) {
-                                // 如果没有 name 参数，追加
-                                if (!src.includes('name=')) {
-                                    src += '&name=large';
-                                }
-                            }
-
-                            // 避免重复添加
-                            if (!image_urls.includes(src)) {
-                                image_urls.push(src);
-                                // 尝试替换 DOM 中的图片为占位符（仅对可见图片）
-                                try {
-                                    const placeholder = document.createTextNode(`{{IMG_${image_urls.length - 1}}}`);
-                                    if (img.parentNode) {
-                                        img.parentNode.replaceChild(placeholder, img);
-                                    }
-                                } catch (e) {}
-                            }
-                        }
-                    });
-
-                    let markdown = textEl?.innerText || '';
-                    return { title, author, content: markdown, image_urls };
                 }
-            """)
-        return None
-
-    async def download_images(self, page, urls, platform_id):
-        downloaded = []
-        import tempfile
-        temp_dir = Path(tempfile.gettempdir()) / "article_saver_images"
-        temp_dir.mkdir(parents=True, exist_ok=True)
-
-        for i, url in enumerate(urls):
-            try:
-                self.log(f"  ⬇️ 下载图片 [{i+1}/{len(urls)}]: {url[:50]}...")
-
-                # 在浏览器环境下下载以获取原图（处理 referer/cookies）
-                img_data = await page.evaluate("""
-                    async (url) => {
-                        try {
-                            const response = await fetch(url);
-                            const blob = await response.blob();
-                            return await new Promise((resolve, reject) => {
-                                const reader = new FileReader();
-                                reader.onloadend = () => {
-                                    const base64data = reader.result.split(',')[1];
-                                    resolve({ success: true, data: base64data, type: blob.type });
-                                };
-                                reader.onerror = reject;
-                                reader.readAsDataURL(blob);
-                            });
-                        } catch (e) {
-                            return { success: false, error: e.toString() };
-                        }
-                    }
-                """, url)
-
-                if img_data and img_data.get('success'):
-                    import base64
-                    content_type = img_data.get('type', 'image/jpeg')
-                    ext = '.jpg'
-                    if 'png' in content_type: ext = '.png'
-                    elif 'gif' in content_type: ext = '.gif'
-                    elif 'webp' in content_type: ext = '.webp'
-
-                    filename = f"img_{i:02d}{ext}"
-                    filepath = temp_dir / filename
-                    filepath.write_bytes(base64.b64decode(img_data['data']))
-
-                    downloaded.append({
-                        "index": i,
-                        "filename": filename,
-                        "temp_path": str(filepath)
-                    })
-            except Exception as e:
-                self.log(f"  ❌ 下载失败: {str(e)}")
-
-        return downloaded
+            """, url)
+
+            if not img_data or not img_data.get('success'):
+                if img_data and img_data.get('status'):
+                    check_status(img_data['status'])
+                raise ImageDownloadError((img_data or {}).get('error') or '浏览器内下载失败')
+
+            filename = image_filename(index, img_data.get('type', 'image/jpeg'))
+            filepath = save_dir / filename
+            filepath.write_bytes(base64.b64decode(img_data['data']))
+            return {"filename": filename, "temp_path": str(filepath)}
+
+        return await self.image_downloader.download_all(urls, save_dir, fetch, reused)
+
+    async def stream_images(self, page, urls, platform_id, save_dir, reused=None):
+        # 复用页面的 UA、Referer 和 Cookie，在 Python 侧分块流式写入目标目录，
+        # 避免整张图片以 base64 形式经过 CDP 通道
+        user_agent = platforms.get(platform_id).user_agent
+        referer = page.url
+        cookie_headers = {}
+
+        async def fetch(index, url):
+            host = urlparse(url).netloc
+            if host not in cookie_headers:
+                cookies = await page.context.cookies([url])
+                cookie_headers[host] = '; '.join(f"{c['name']}={c['value']}" for c in cookies)
+
+            extra_headers = {'Referer': referer}
+            if cookie_headers[host]:
+                extra_headers['Cookie'] = cookie_headers[host]
+            filename = await asyncio.to_thread(
+                self.image_downloader.fetch_to_file, url, save_dir, index, user_agent, extra_headers
+            )
+            return {"filename": filename, "temp_path": str(save_dir / filename)}
+
+        return await self.image_downloader.download_all(urls, save_dir, fetch, reused)
+
+    def plan_save_dir(self, title, platform_name):
+        # 路径规划: {ROOT}/{Platform}/{Date}_{Title}/
+        date_str = datetime.now().strftime("%Y-%m-%d")
+        folder_name = f"{date_str}_{self.sanitize_filename(title)}"
+        return self.output_root / platform_name / folder_name
 
     def save(self, scrape_result, url):
         data = scrape_result['data']
         platform_name = scrape_result['platform_name']
 
-        # 路径规划: {ROOT}/{Platform}/{Date}_{Title}/
-        date_str = datetime.now().strftime("%Y-%m-%d")
-        title = self.sanitize_filename(data['title'])
-        folder_name = f"{date_str}_{title}"
+        # 抓取阶段已创建暂存目录并把图片直接写入其中
+        staging_dir = Path(data['staging_dir']) if data.get('staging_dir') else self.staging.create()
+
+        with span('save'):
+            try:
+                save_dir = self.commit(staging_dir, data, platform_name, url)
+            except BaseException:
+                self.staging.discard(staging_dir)
+                raise
+            self.record_fetch(url, save_dir, data, data['downloaded_images'])
+            try:
+                # 按天打包时重新抓取的文章追加为新条目，旧条目不再出现在检索结果中
+                if data.get('target_dir') and str(data['target_dir']) != str(save_dir):
+                    self.search_index.remove_many([self.search_index.relative(data['target_dir'])])
+                self.search_index.add(save_dir)
+            except (sqlite3.Error, OSError) as e:
+                # 索引可以随时用 search.py --reindex 重建，不影响文章本身的保存
+                self.log(f"⚠️ 更新检索索引失败: {e}")
 
-        save_dir = self.output_root / platform_name / folder_name
-        save_dir.mkdir(parents=True, exist_ok=True)
+        self.log(f"\n✅ 已保存至: {save_dir}")
+        return str(save_dir)
 
-        # 移动图片
+    def commit(self, staging_dir, data, platform_name, url):
+        """在暂存目录中写入 content.md，再整体 rename 为最终目录（打包输出时写入 zip）"""
+        # 移动不在暂存目录中的图片
         for img_info in data['downloaded_images']:
             src = Path(img_info['temp_path'])
-            dst = save_dir / img_info['filename']
-            if src.exists():
+            dst = staging_dir / img_info['filename']
+            if src.exists() and src != dst:
                 shutil.move(str(src), str(dst))
 
-        # 处理 Markdown 中的图片引用
+        # 处理 Markdown 中的图片引用（下载失败的图片保留原始链接）；Jina 的正文已直接改写链接，没有占位符
         content = data['content']
-        for img_info in data['downloaded_images']:
-            placeholder = f"{{{{IMG_{img_info['index']}}}}}"
-            content = content.replace(placeholder, f"\n![图片]({img_info['filename']})\n")
+        if not data.get('links_rewritten'):
+            content = fill_image_placeholders(content, data['downloaded_images'], data.get('image_urls', []))
 
         # 写入文件
         meta = f"""---
@@ -461,25 +599,221 @@ saved_at: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
 ---
 
 """
-        md_file = save_dir / "content.md"
+        md_file = staging_dir / "content.md"
         md_file.write_text(meta + content, encoding='utf-8')
 
-        self.log(f"\n✅ 已保存至: {save_dir}")
-        return str(save_dir)
+        if self.bundles:
+            return self.bundles.commit(staging_dir, self.plan_save_dir(data['title'], platform_name), data.get('target_dir'))
+        # 重新抓取时原地替换旧目录，否则按 {Platform}/{Date}_{Title}/ 提交
+        if data.get('target_dir') and Path(data['target_dir']).is_dir():
+            return self.staging.replace(staging_dir, Path(data['target_dir']))
+        return self.staging.commit(staging_dir, self.plan_save_dir(data['title'], platform_name))
+
+def saver_options(args):
+    """命令行参数 → ArticleSaver 构造参数"""
+    return {
+        "image_concurrency": args.image_concurrency,
+        "image_timeout": args.image_timeout,
+        "image_mode": args.image_mode,
+        "dedup": args.dedup,
+        "force": args.force,
+        "max_age": args.max_age * 3600 if args.max_age is not None else None,
+        "block_resources": not args.no_block_resources,
+        "block_images": not args.keep_images,
+        "http_fast_path": not args.no_fast_path,
+        "hedge_delay": args.hedge_delay,
+        "trace_path": args.trace,
+        "output_root": args.output,
+        "data_dir": args.data_dir,
+        "proxy": args.proxy,
+        "jina_endpoint": args.jina_endpoint,
+        "rate_limit": not args.no_rate_limit,
+        "rate_limits": args.rate_limits,
+        "bundle": args.bundle,
+        "thread_limit": args.thread_limit,
+        "post_workers": args.post_workers,
+        "previews": args.previews,
+        "preview_size": args.preview_size,
+    }
+
+
+async def run_batch(args):
+    try:
+        urls = read_urls(args.batch)
+        platform_limits = parse_platform_limits(args.limit)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return
+
+    if not urls:
+        print("⚠️ 没有读取到任何 URL")
+        return
+
+    journal = RunJournal(args.journal or journal_path(args.data_dir, args.batch, urls), resume=not args.no_resume)
+    resumed = {}
+    for i, url in enumerate(urls):
+        entry = journal.done(url)
+        if entry:
+            resumed[i] = {"url": url, "success": True, "save_dir": entry['save_dir'],
+                          "skipped": True, "resumed": True, "elapsed": 0.0}
+    pending = [url for i, url in enumerate(urls) if i not in resumed]
+    if resumed:
+        print(f"♻️ 续跑: {len(resumed)} 个 URL 在上次运行中已完成，剩余 {len(pending)} 个（运行日志 {journal.path}）")
+
+    started = time.monotonic()
+    try:
+        if not pending:
+            pending_results, tracer = [], TraceRecorder()
+        elif args.workers > 1:
+            pending_results, tracer = run_batch_sharded(args, pending, platform_limits, journal)
+        else:
+            pending_results, tracer = await run_batch_local(args, pending, platform_limits, journal)
+    except BaseException:
+        journal.close()
+        raise
+
+    # 按输入顺序合并续跑跳过的结果与本次结果
+    fresh = iter(pending_results)
+    results = [resumed[i] if i in resumed else next(fresh) for i in range(len(urls))]
+    failed = sum(1 for r in results if not r['success'])
+    # 全部成功后删除运行日志；有失败时保留，重新运行同一命令只会重试失败的 URL
+    journal.close(remove=not failed)
+    BatchRunner.print_summary(results, time.monotonic() - started)
+    if failed:
+        print(f"📒 运行日志已保留: {journal.path}（重新运行将跳过已完成的 URL）")
+    report_traces(tracer, args)
+
+
+async def run_batch_local(args, urls, platform_limits, journal):
+    print(f"📚 共 {len(urls)} 个 URL，并发 {args.concurrency}，平台限制 {platform_limits}")
+    pool = BrowserPool(max_pages=args.concurrency, proxy=args.proxy)
+    saver = ArticleSaver(browser_pool=pool, **saver_options(args))
+    saver.tracer.activate()
+    try:
+        async with pool:
+            runner = BatchRunner(saver, concurrency=args.concurrency, platform_limits=platform_limits, journal=journal)
+            results = await runner.run(urls)
+    finally:
+        saver.close()
+    return results, saver.tracer
+
+
+def run_batch_sharded(args, urls, platform_limits, journal):
+    print(f"📚 共 {len(urls)} 个 URL，{args.workers} 个进程 × 并发 {args.concurrency}，平台限制（所有进程合计）{platform_limits}")
+    return run_sharded(
+        urls, args.workers, args.concurrency, platform_limits, saver_options(args),
+        ArticleSaver.identify_platform, collect_traces=bool(args.metrics), on_result=journal.record,
+    )
+
+
+def report_traces(tracer, args):
+    """开启 --trace / --metrics 时，运行结束输出阶段耗时汇总并导出指标"""
+    if not (args.trace or args.metrics):
+        return
+    tracer.finish_run()
+    tracer.print_summary()
+    if args.metrics:
+        tracer.write_metrics(args.metrics, openmetrics=args.metrics.endswith('.om'))
+        print(f"📈 指标已写入: {args.metrics}")
+
+
+async def run_daemon(args):
+    try:
+        platform_limits = parse_platform_limits(args.limit)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return
+
+    pool = BrowserPool(max_pages=args.concurrency, proxy=args.proxy)
+    saver = ArticleSaver(browser_pool=pool, **saver_options(args))
+    saver.tracer.activate()
+    runner = BatchRunner(saver, concurrency=args.concurrency, platform_limits=platform_limits)
+    daemon = SaverDaemon(runner, pool, workers=args.concurrency)
+    try:
+        await serve(daemon, host=args.host, port=args.port, socket_path=args.socket)
+    finally:
+        await pool.close()
+        saver.close()
+
 
 async def main():
-    if len(sys.argv) < 2:
-        print("Usage: python saver.py <url>")
+    parser = argparse.ArgumentParser(description="Article Saver - 保存微信、X、知乎文章")
+    parser.add_argument("url", nargs="?", help="文章 URL")
+    parser.add_argument("--batch", metavar="FILE", help="批量模式：从文件读取 URL（每行一个），'-' 表示标准输入")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help=f"批量模式全局并发数（默认 {DEFAULT_CONCURRENCY}）")
+    parser.add_argument("--workers", type=int, default=1, help="批量模式的工作进程数，每个进程各自运行浏览器，平台并发上限在所有进程间合计（默认 1）")
+    parser.add_argument("--limit", action="append", metavar="PLATFORM=N", help="批量模式平台并发上限，可重复，如 --limit zhihu=1")
+    parser.add_argument("--journal", metavar="FILE", help="批量模式的运行日志路径（默认按 URL 文件生成于 data/runs/），中断后重新运行自动跳过已完成的 URL")
+    parser.add_argument("--no-resume", action="store_true", help="忽略已有的运行日志，从头处理整批 URL")
+    parser.add_argument("--image-concurrency", type=int, default=DEFAULT_IMAGE_CONCURRENCY, help=f"同时下载的图片数上限（默认 {DEFAULT_IMAGE_CONCURRENCY}）")
+    parser.add_argument("--image-timeout", type=float, default=DEFAULT_IMAGE_TIMEOUT, help=f"单张图片下载超时秒数（默认 {DEFAULT_IMAGE_TIMEOUT}）")
+    parser.add_argument("--image-mode", choices=IMAGE_MODES, default=DEFAULT_IMAGE_MODE, help="图片获取方式：browser 页面内下载；stream 携带页面 Cookie 流式写盘，内存占用更低")
+    parser.add_argument("--post-workers", type=int, default=DEFAULT_POST_WORKERS, help=f"图片后处理（按文件头识别格式、校验完整性、计算哈希）的进程数，0 表示关闭（默认 {DEFAULT_POST_WORKERS}）")
+    parser.add_argument("--previews", action="store_true", help="为每张图片生成预览缩略图 previews/img_NN.jpg（需要 Pillow）")
+    parser.add_argument("--preview-size", type=int, default=DEFAULT_PREVIEW_SIZE, help=f"预览图最长边的像素数（默认 {DEFAULT_PREVIEW_SIZE}）")
+    parser.add_argument("--dedup", action="store_true", help="启用内容寻址图片库（输出目录下的 .store/），跨文章去重并跳过已下载过的图片 URL")
+    parser.add_argument("--force", action="store_true", help="忽略本地索引，强制重新抓取已保存过的文章")
+    parser.add_argument("--max-age", type=float, metavar="HOURS", help="已保存超过该小时数的文章重新抓取（默认已保存的文章一律跳过）")
+    parser.add_argument("--no-block-resources", action="store_true", help="页面加载时不拦截字体、音视频和埋点请求")
+    parser.add_argument("--keep-images", action="store_true", help="页面加载时仍加载图片（默认拦截，图片随后单独下载）")
+    parser.add_argument("--no-fast-path", action="store_true", help="微信公众号不走免浏览器的 HTTP 快速通道，直接使用 Playwright")
+    parser.add_argument("--hedge-delay", type=float, default=DEFAULT_HEDGE_DELAY, help=f"首选策略超过该秒数仍未拿到正文时并行启动下一个策略，0 表示同时启动（默认 {DEFAULT_HEDGE_DELAY}）")
+    parser.add_argument("--trace", metavar="FILE", help="把每篇文章的分阶段耗时、图片下载明细以 JSON Lines 追加写入 FILE，结束时输出 p50/p95 汇总")
+    parser.add_argument("--metrics", metavar="FILE", help="运行结束时导出 Prometheus 文本格式指标（文件名以 .om 结尾时输出 OpenMetrics）")
+    parser.add_argument("--thread-limit", type=int, default=DEFAULT_THREAD_LIMIT, help=f"X 推文串最多收集的推文数，逐屏滚动直到推文串结束或达到上限（默认 {DEFAULT_THREAD_LIMIT}）")
+    parser.add_argument("--output", default=str(DEFAULT_OUTPUT_ROOT), help=f"保存根目录（默认 {DEFAULT_OUTPUT_ROOT}）")
+    parser.add_argument("--bundle", choices=BUNDLE_MODES, help="打包输出：article 每篇文章一个 .zip，day 同一平台每天一个 .zip（默认按文件夹保存，scripts/bundle.py 可导出回文件夹）")
+    parser.add_argument("--data-dir", default=str(DATA_DIR), help="登录态、抓取索引与策略统计的存放目录（默认 data/）")
+    parser.add_argument("--proxy", metavar="URL", help="浏览器和 HTTP 请求统一使用的代理，如 http://127.0.0.1:8899")
+    parser.add_argument("--jina-endpoint", default=JINA_ENDPOINT, help=f"Jina Reader 服务地址（默认 {JINA_ENDPOINT}）")
+    parser.add_argument("--rate-limit", action="append", metavar="DOMAIN=RPS[/N]", help="覆盖某个域名组的初始请求速率和最大并发，可重复，如 --rate-limit zhihu.com=0.5/1")
+    parser.add_argument("--no-rate-limit", action="store_true", help="关闭按域名的自适应限速")
+    parser.add_argument("--daemon", action="store_true", help="以守护进程方式运行，通过本地 HTTP 接口接收任务（配合 client.py 使用）")
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"守护进程监听地址（默认 {DEFAULT_HOST}）")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"守护进程监听端口（默认 {DEFAULT_PORT}）")
+    parser.add_argument("--socket", metavar="PATH", help="守护进程改为监听 Unix socket")
+    args = parser.parse_args()
+    # Semaphore(0) 会让批量和守护进程模式一直等待，不报错
+    for option in ('concurrency', 'workers'):
+        if getattr(args, option) < 1:
+            parser.error(f"--{option} 不能小于 1")
+    try:
+        args.rate_limits = parse_rate_limits(args.rate_limit)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return
+
+    if args.daemon:
+        await run_daemon(args)
         return
 
-    url = sys.argv[1]
-    saver = ArticleSaver()
-    result = await saver.scrape(url)
+    if args.batch:
+        await run_batch(args)
+        return
+
+    if not args.url:
+        parser.print_usage()
+        return
 
-    if result.get('success'):
-        saver.save(result, url)
-    else:
-        print(f"❌ 抓取失败: {result.get('error')}")
+    url = args.url
+    saver = ArticleSaver(**saver_options(args))
+    try:
+        with saver.tracer.article(url) as trace:
+            result = await saver.scrape(url)
+
+            if result.get('success'):
+                if not result.get('save_dir'):
+                    saver.save(result, url)
+                trace.status = 'skipped' if result.get('skipped') else 'ok'
+            else:
+                trace.status, trace.error = 'failed', result.get('error')
+                print(f"❌ 抓取失败: {result.get('error')}")
+    finally:
+        saver.close()
+    report_traces(saver.tracer, args)
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
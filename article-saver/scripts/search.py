@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Search - 检索已保存的文章
+用法：
+    python3 scripts/search.py 关键词 [更多关键词...] [--platform 知乎] [--author 名字] [--since 2026-01-01] [--until 2026-06-30] [--limit 20] [--json]
+    python3 scripts/search.py --reindex [--full] [--workers 8]
+
+1. 检索：多个关键词需全部命中，按相关度排序（标题命中优先），双引号包住的部分作为短语
+2. 重建索引：扫描归档目录中的 content.md（含打包输出的 .zip），多进程并行解析后批量写入；
+   默认只处理新增/修改过的文章并移除已删除的目录，--full 清空后完整重建
+"""
+
+import os
+import sys
+import json
+import time
+import zipfile
+import argparse
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+from search_index import SearchIndex, SEARCH_INDEX_FILENAME, parse_article, parse_article_text
+from bundle import BundleReader, BUNDLE_SUFFIX
+
+DEFAULT_OUTPUT_ROOT = Path.home() / "Documents/WebContent/素材"
+WRITE_BATCH = 500
+PARALLEL_THRESHOLD = 200    # 待解析文件少于该数量时不启动进程池
+PARSE_CHUNKSIZE = 64
+
+
+def scan_articles(root):
+    """
+    遍历 {ROOT}/{平台}/{文章目录}/content.md 以及 {ROOT}/{平台}/*.zip 中的文章，跳过 .store / .staging 等隐藏目录，
+    返回 (相对路径, content.md 或 (包文件, 文章目录名), mtime)；相对路径与 SearchIndex.relative 的结果一致
+    """
+    with os.scandir(root) as platforms:
+        for platform_dir in platforms:
+            if platform_dir.name.startswith('.') or not platform_dir.is_dir():
+                continue
+            with os.scandir(platform_dir.path) as articles:
+                for article_dir in articles:
+                    if article_dir.name.startswith('.'):
+                        continue
+                    if article_dir.name.endswith(BUNDLE_SUFFIX) and article_dir.is_file():
+                        yield from scan_bundle(platform_dir.name, Path(article_dir.path))
+                        continue
+                    if not article_dir.is_dir():
+                        continue
+                    md_file = Path(article_dir.path) / "content.md"
+                    try:
+                        yield str(Path(platform_dir.name) / article_dir.name), md_file, md_file.stat().st_mtime
+                    except FileNotFoundError:
+                        continue
+
+
+def scan_bundle(platform, bundle):
+    try:
+        with BundleReader(bundle) as reader:
+            entries = [(folder, reader.mtime(f"{folder}/content.md")) for folder in reader.articles()]
+    except (OSError, zipfile.BadZipFile):
+        return
+    for folder, mtime in entries:
+        yield str(Path(platform) / bundle.name / folder), (bundle, folder), mtime
+
+
+def parse_entry(entry):
+    rel, source, mtime = entry
+    try:
+        if isinstance(source, tuple):
+            bundle, folder = source
+            with BundleReader(bundle) as reader:
+                return rel, parse_article_text(reader.read_text(f"{folder}/content.md")), mtime
+        return rel, parse_article(source), mtime
+    except (OSError, UnicodeError, KeyError, zipfile.BadZipFile):
+        return None
+
+
+def reindex(root, full=False, workers=None):
+    index = SearchIndex(root / SEARCH_INDEX_FILENAME)
+    started = time.monotonic()
+    if full:
+        index.clear()
+    known = index.indexed()
+
+    seen = set()
+    pending = []
+    for rel, md_file, mtime in scan_articles(root):
+        seen.add(rel)
+        if known.get(rel) != mtime:
+            pending.append((rel, md_file, mtime))
+    removed = [path for path in known if path not in seen]
+    print(f"📂 共 {len(seen)} 篇文章，需要索引 {len(pending)} 篇，移除 {len(removed)} 篇已删除的记录")
+
+    indexed = 0
+    batch = []
+    if len(pending) >= PARALLEL_THRESHOLD and workers != 1:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        parsed = executor.map(parse_entry, pending, chunksize=PARSE_CHUNKSIZE)
+    else:
+        executor = None
+        parsed = map(parse_entry, pending)
+    try:
+        for item in parsed:
+            if item is None:
+                continue
+            batch.append(item)
+            if len(batch) >= WRITE_BATCH:
+                index.add_many(batch)
+                indexed += len(batch)
+                batch = []
+                print(f"  … 已索引 {indexed}/{len(pending)}")
+        if batch:
+            index.add_many(batch)
+            indexed += len(batch)
+    finally:
+        if executor:
+            executor.shutdown()
+
+    index.remove_many(removed)
+    if indexed or removed:
+        index.optimize()
+    print(f"✅ 索引完成: 写入 {indexed} 篇，移除 {len(removed)} 篇，共 {index.count()} 篇，耗时 {time.monotonic() - started:.1f}s")
+    index.close()
+
+
+def print_results(results, elapsed):
+    if not results:
+        print(f"🔍 没有找到匹配的文章（{elapsed * 1000:.0f}ms）")
+        return
+    print(f"🔍 找到 {len(results)} 篇（{elapsed * 1000:.0f}ms）")
+    for i, r in enumerate(results, 1):
+        date = (r['saved_at'] or '')[:10]
+        print(f"\n{i:>3}. {r['title']}  [{r['platform']}] {r['author']} {date}")
+        snippet = ' '.join((r['snippet'] or '').split())
+        if snippet:
+            print(f"     {snippet}")
+        print(f"     📁 {r['path']}")
+        if r['url']:
+            print(f"     🔗 {r['url']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="检索已保存的文章")
+    parser.add_argument("query", nargs="*", help="关键词，多个关键词需全部命中；用引号包住的含空格参数按短语匹配")
+    parser.add_argument("--platform", help="按平台过滤，如 知乎 / 微信公众号 / X")
+    parser.add_argument("--author", help="按作者过滤（子串匹配）")
+    parser.add_argument("--since", metavar="YYYY-MM-DD", help="只看该日期及之后保存的文章")
+    parser.add_argument("--until", metavar="YYYY-MM-DD", help="只看该日期及之前保存的文章")
+    parser.add_argument("--limit", type=int, default=20, help="最多返回的结果数（默认 20）")
+    parser.add_argument("--json", action="store_true", help="以 JSON 输出结果")
+    parser.add_argument("--output", default=str(DEFAULT_OUTPUT_ROOT), help=f"归档根目录（默认 {DEFAULT_OUTPUT_ROOT}）")
+    parser.add_argument("--reindex", action="store_true", help="扫描归档目录重建索引（默认增量）")
+    parser.add_argument("--full", action="store_true", help="配合 --reindex：清空后完整重建")
+    parser.add_argument("--workers", type=int, help="重建索引时的解析进程数（默认 CPU 核数）")
+    args = parser.parse_args()
+
+    root = Path(args.output)
+    if args.reindex:
+        if not root.is_dir():
+            print(f"❌ 归档目录不存在: {root}")
+            return 1
+        reindex(root, full=args.full, workers=args.workers)
+        return 0
+
+    if not (args.query or args.platform or args.author or args.since or args.until):
+        parser.print_usage()
+        return 1
+    if not (root / SEARCH_INDEX_FILENAME).exists():
+        print(f"⚠️ 尚未建立索引，请先运行: python3 scripts/search.py --reindex --output {root}")
+        return 1
+
+    index = SearchIndex(root / SEARCH_INDEX_FILENAME)
+    started = time.monotonic()
+    # 每个参数整体作为一个短语：search.py "事件 循环" 匹配短语，search.py 事件 循环 匹配两个词
+    results = index.search(args.query, platform=args.platform, author=args.author,
+                           since=args.since, until=args.until, limit=args.limit)
+    elapsed = time.monotonic() - started
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+    else:
+        print_results(results, elapsed)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
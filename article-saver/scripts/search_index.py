@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Search Index - 已保存文章的全文检索索引
+功能：
+1. SQLite FTS5 索引：标题、作者、正文可检索，平台、URL、保存时间用于过滤和展示
+2. 保存文章时增量更新（按文章目录 upsert），重新抓取同一目录只保留最新版本
+3. 从 content.md（文件夹或打包输出的包内）解析 front matter 与正文，供批量重建索引复用
+4. 默认使用 trigram 分词：中文无需分词即可按任意子串检索（SQLite 3.34+，否则退化为 unicode61）
+"""
+
+import re
+import sqlite3
+import threading
+from pathlib import Path
+
+from bundle import read_content
+
+SEARCH_INDEX_FILENAME = ".search.sqlite"
+SQLITE_TIMEOUT = 30
+# trigram 分词下少于 3 个字符的词无法走索引，改用 LIKE 过滤
+MIN_MATCH_CHARS = 3
+# bm25 权重：标题 > 作者 > 正文
+RANK_WEIGHTS = (10.0, 5.0, 1.0)
+
+FRONT_MATTER_FIELDS = ('title', 'author', 'platform', 'url', 'saved_at')
+IMAGE_REF = re.compile(r'!\[[^\]]*\]\([^)]*\)')
+
+
+def parse_article(path):
+    """解析 content.md，返回 {title, author, platform, url, saved_at, body}"""
+    return parse_article_text(Path(path).read_text(encoding='utf-8', errors='replace'))
+
+
+def parse_article_text(text):
+    meta = dict.fromkeys(FRONT_MATTER_FIELDS, '')
+    body = text
+    if text.startswith('---\n'):
+        end = text.find('\n---\n', 4)
+        if end != -1:
+            for line in text[4:end].splitlines():
+                key, sep, value = line.partition(':')
+                if sep and key.strip() in meta:
+                    meta[key.strip()] = value.strip()
+            body = text[end + 5:]
+    # 图片引用只是文件名和链接，不参与检索
+    meta['body'] = IMAGE_REF.sub('', body).strip()
+    return meta
+
+
+def split_terms(query):
+    """按空白拆分查询词，保留双引号包住的短语"""
+    return [a or b for a, b in re.findall(r'"([^"]+)"|(\S+)', query)]
+
+
+class SearchIndex:
+    def __init__(self, db_path):
+        self.db_path = Path(db_path)
+        self.root = self.db_path.parent
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.db_path), check_same_thread=False, timeout=SQLITE_TIMEOUT)
+        self._db.row_factory = sqlite3.Row
+        # WAL：检索与保存（包括多个进程同时保存）互不阻塞
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS docs (
+                id INTEGER PRIMARY KEY,
+                path TEXT UNIQUE NOT NULL,
+                platform TEXT,
+                url TEXT,
+                saved_at TEXT,
+                mtime REAL
+            )
+        """)
+        self.tokenizer = self._create_fts()
+        self._db.commit()
+
+    def _create_fts(self):
+        row = self._db.execute("SELECT sql FROM sqlite_master WHERE name = 'docs_fts'").fetchone()
+        if row:
+            return 'trigram' if 'trigram' in row['sql'] else 'unicode61'
+        for tokenizer in ('trigram', 'unicode61'):
+            try:
+                self._db.execute(
+                    f"CREATE VIRTUAL TABLE docs_fts USING fts5(title, author, body, tokenize='{tokenizer}')"
+                )
+                return tokenizer
+            except sqlite3.OperationalError:
+                continue
+        raise RuntimeError("当前 SQLite 不支持 FTS5，无法建立检索索引")
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def relative(self, article_dir):
+        """索引中保存相对于归档根目录的路径，整个归档移动后索引仍然有效"""
+        article_dir = Path(article_dir)
+        try:
+            return str(article_dir.resolve().relative_to(self.root.resolve()))
+        except ValueError:
+            return str(article_dir.resolve())
+
+    def _upsert(self, path, article, mtime):
+        row = self._db.execute("SELECT id FROM docs WHERE path = ?", (path,)).fetchone()
+        if row:
+            doc_id = row['id']
+            self._db.execute("UPDATE docs SET platform = ?, url = ?, saved_at = ?, mtime = ? WHERE id = ?",
+                             (article['platform'], article['url'], article['saved_at'], mtime, doc_id))
+            self._db.execute("DELETE FROM docs_fts WHERE rowid = ?", (doc_id,))
+        else:
+            doc_id = self._db.execute(
+                "INSERT INTO docs (path, platform, url, saved_at, mtime) VALUES (?, ?, ?, ?, ?)",
+                (path, article['platform'], article['url'], article['saved_at'], mtime),
+            ).lastrowid
+        self._db.execute("INSERT INTO docs_fts (rowid, title, author, body) VALUES (?, ?, ?, ?)",
+                         (doc_id, article['title'], article['author'], article['body']))
+
+    def add(self, article_dir):
+        """索引（或更新）一篇已保存的文章，article_dir 可以是包内文章路径"""
+        text, mtime = read_content(article_dir)
+        with self._lock:
+            self._upsert(self.relative(article_dir), parse_article_text(text), mtime)
+            self._db.commit()
+
+    def add_many(self, items):
+        """批量写入 [(相对路径, parse_article 结果, mtime)]，在一个事务中完成"""
+        with self._lock:
+            for path, article, mtime in items:
+                self._upsert(path, article, mtime)
+            self._db.commit()
+
+    def remove_many(self, paths):
+        with self._lock:
+            for path in paths:
+                row = self._db.execute("SELECT id FROM docs WHERE path = ?", (path,)).fetchone()
+                if row:
+                    self._db.execute("DELETE FROM docs_fts WHERE rowid = ?", (row['id'],))
+                    self._db.execute("DELETE FROM docs WHERE id = ?", (row['id'],))
+            self._db.commit()
+
+    def indexed(self):
+        """返回 {相对路径: mtime}，用于增量重建"""
+        with self._lock:
+            return {row['path']: row['mtime'] for row in self._db.execute("SELECT path, mtime FROM docs")}
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM docs_fts")
+            self._db.execute("DELETE FROM docs")
+            self._db.commit()
+
+    def optimize(self):
+        """合并 FTS 段，大批量写入后执行可加快检索"""
+        with self._lock:
+            self._db.execute("INSERT INTO docs_fts (docs_fts) VALUES ('optimize')")
+            self._db.commit()
+
+    def search(self, query, platform=None, author=None, since=None, until=None, limit=20):
+        """
+        按相关度（bm25，标题权重最高）返回匹配的文章。
+        query 为字符串时以空白分隔的词需全部命中，双引号包住的部分作为短语；
+        为列表时（如命令行参数）每一项整体作为一个短语，各项需全部命中。
+        platform / author 为子串过滤，since / until 为保存日期（YYYY-MM-DD）范围。
+        """
+        terms = split_terms(query) if isinstance(query, str) else [t.strip() for t in query if t.strip()]
+        matched = [t for t in terms if self.tokenizer != 'trigram' or len(t) >= MIN_MATCH_CHARS]
+        short = [t for t in terms if t not in matched]
+
+        where, params = [], []
+        if matched:
+            where.append("docs_fts MATCH ?")
+            params.append(' '.join('"' + t.replace('"', '""') + '"' for t in matched))
+        for term in short:
+            where.append("(docs_fts.title LIKE ? OR docs_fts.author LIKE ? OR docs_fts.body LIKE ?)")
+            params.extend([f"%{term}%"] * 3)
+        if platform:
+            where.append("docs.platform LIKE ?")
+            params.append(f"%{platform}%")
+        if author:
+            where.append("docs_fts.author LIKE ?")
+            params.append(f"%{author}%")
+        if since:
+            where.append("docs.saved_at >= ?")
+            params.append(since)
+        if until:
+            # saved_at 含时间，until 当天整天都算在内
+            where.append("docs.saved_at < ?")
+            params.append(until + '~')
+
+        rank = f"bm25(docs_fts, {', '.join(map(str, RANK_WEIGHTS))})" if matched else "0"
+        snippet = "snippet(docs_fts, 2, '[', ']', '…', 16)" if matched else "substr(docs_fts.body, 1, 80)"
+        sql = f"""
+            SELECT docs.path, docs.platform, docs.url, docs.saved_at,
+                   docs_fts.title, docs_fts.author, {snippet} AS snippet, {rank} AS rank
+            FROM docs_fts JOIN docs ON docs.id = docs_fts.rowid
+            {'WHERE ' + ' AND '.join(where) if where else ''}
+            ORDER BY {rank if matched else 'docs.saved_at DESC'}
+            LIMIT ?
+        """
+        params.append(limit)
+        with self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+        return [{**dict(row), "path": str(self.root / row['path'])} for row in rows]
+
+    def count(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Shard Runner - 多进程分片批量保存
+功能：
+1. 把 URL 列表分给 N 个工作进程，每个进程有自己的浏览器、ArticleSaver 和事件循环
+2. 共享工作队列：按平台分组的 URL 列表 + 跨进程计数器，空闲的进程随取随做，不会出现某个分片提前做完的情况
+3. 平台并发上限由跨进程计数保证，--limit zhihu=1 在所有进程中合计仍只有 1 个
+4. 各进程的结果和 trace 汇总为一份报告
+5. 每个协程正在处理的 URL 记录在共享的领取表中：工作进程意外退出时，主进程释放它占用的平台槽位，
+   并把它正在处理的 URL 记为失败
+"""
+
+import json
+import queue
+import asyncio
+import tempfile
+import multiprocessing
+from pathlib import Path
+
+from batch import BatchRunner
+from browser_pool import BrowserPool
+from tracing import TraceRecorder
+
+POLL_INTERVAL = 0.05      # 所有平台的槽位都被占满时的轮询间隔
+RESULT_TIMEOUT = 1.0
+RECLAIM_TIMEOUT = 5.0     # 回收退出进程的槽位时等待共享锁的上限
+
+
+class SharedWork:
+    """
+    跨进程共享的工作队列。URL 列表在启动时随进程复制一份，进程之间只共享每个平台的
+    领取计数、占用的槽位数和领取表，领取操作只是一次加锁的计数，不需要额外的管理进程。
+    领取表为每个工作协程（worker_id * concurrency + slot）记录正在处理的 URL 序号，-1 表示空闲。
+    """
+
+    def __init__(self, ctx, urls, identify_platform, platform_limits, default_limit, workers, concurrency):
+        self.urls = {}
+        self.platform_of = {}
+        for position, url in enumerate(urls):
+            _, platform_id = identify_platform(url)
+            self.urls.setdefault(platform_id, []).append((position, url))
+            self.platform_of[position] = platform_id
+        self.platforms = list(self.urls)
+        self.limits = {p: platform_limits.get(p, default_limit) for p in self.platforms}
+        # 所有计数都在同一把锁下修改，进程退出时主进程可以一致地回收它的槽位
+        self.lock = ctx.Lock()
+        self.cursors = {p: ctx.Value('i', 0, lock=False) for p in self.platforms}
+        self.in_use = {p: ctx.Value('i', 0, lock=False) for p in self.platforms}
+        self.claims = ctx.Array('i', [-1] * (workers * concurrency), lock=False)
+        self.concurrency = concurrency
+        self.total = len(urls)
+
+    def claim(self, slot_id, offset=0):
+        """
+        为工作协程 slot_id 领取一个 URL，返回 (platform_id, position, url)。
+        返回 None 表示全部领取完毕；返回 False 表示还有剩余但对应平台的槽位已满。
+        领取成功时已占用该平台的槽位，处理完后需调用 release。
+        """
+        remaining = False
+        with self.lock:
+            # 各协程从不同平台开始轮询，避免总是优先挤占同一个平台
+            for i in range(len(self.platforms)):
+                platform_id = self.platforms[(offset + i) % len(self.platforms)]
+                cursor = self.cursors[platform_id]
+                if cursor.value >= len(self.urls[platform_id]):
+                    continue
+                remaining = True
+                if self.in_use[platform_id].value >= self.limits[platform_id]:
+                    continue
+                position, url = self.urls[platform_id][cursor.value]
+                cursor.value += 1
+                self.in_use[platform_id].value += 1
+                self.claims[slot_id] = position
+                return platform_id, position, url
+        return False if remaining else None
+
+    def release(self, slot_id):
+        with self.lock:
+            self._release(slot_id)
+
+    def _release(self, slot_id):
+        position = self.claims[slot_id]
+        if position >= 0:
+            self.in_use[self.platform_of[position]].value -= 1
+            self.claims[slot_id] = -1
+        return position
+
+    def reclaim(self, worker_id):
+        """
+        释放已退出的工作进程占用的全部槽位，返回它正在处理的 [(position, url)]。
+        进程恰好在持有共享锁时退出会导致锁无法再获取，此时返回 None。
+        """
+        if not self.lock.acquire(timeout=RECLAIM_TIMEOUT):
+            return None
+        try:
+            lost = []
+            for slot_id in range(worker_id * self.concurrency, (worker_id + 1) * self.concurrency):
+                position = self._release(slot_id)
+                if position >= 0:
+                    platform_urls = self.urls[self.platform_of[position]]
+                    lost.append(next(item for item in platform_urls if item[0] == position))
+            return lost
+        finally:
+            self.lock.release()
+
+
+async def run_worker(worker_id, work, results, concurrency, platform_limits, saver_kwargs):
+    # 延迟导入：saver 在顶层导入了本模块
+    from saver import ArticleSaver
+
+    trace_path = saver_kwargs.get('trace_path')
+    if trace_path:
+        # 各进程写自己的 trace 文件，结束后由主进程合并
+        saver_kwargs = {**saver_kwargs, 'trace_path': f"{trace_path}.w{worker_id}"}
+    pool = BrowserPool(max_pages=concurrency, proxy=saver_kwargs.get('proxy'))
+    saver = ArticleSaver(browser_pool=pool, **saver_kwargs)
+    saver.tracer.activate()
+    # 平台上限的全局约束由跨进程计数保证，进程内的同名上限不会更严格
+    runner = BatchRunner(saver, concurrency=concurrency, platform_limits=platform_limits)
+
+    async def consume(slot):
+        slot_id = worker_id * concurrency + slot
+        while True:
+            claimed = work.claim(slot_id, offset=slot)
+            if claimed is None:
+                return
+            if claimed is False:
+                await asyncio.sleep(POLL_INTERVAL)
+                continue
+            _, position, url = claimed
+            try:
+                result = await runner.save_one(url, f"w{worker_id} {position + 1}/{work.total}")
+                results.put(('result', worker_id, position, result))
+            finally:
+                work.release(slot_id)
+
+    try:
+        async with pool:
+            await asyncio.gather(*(consume(slot) for slot in range(concurrency)))
+    finally:
+        saver.close()
+    # 运行级阶段（浏览器启动等）交给主进程汇总
+    return saver.tracer.run_trace.spans
+
+
+def worker_main(worker_id, work, results, concurrency, platform_limits, saver_kwargs):
+    try:
+        run_spans = asyncio.run(run_worker(worker_id, work, results, concurrency, platform_limits, saver_kwargs))
+        results.put(('done', worker_id, run_spans))
+    except Exception as e:
+        results.put(('error', worker_id, str(e)))
+
+
+def merge_traces(base_path, workers, recorder, trace_path=None):
+    """把各进程的 trace 文件并入 recorder 汇总；trace_path 不为空时按进程顺序追加到该文件"""
+    out = open(trace_path, 'a', encoding='utf-8') if trace_path else None
+    try:
+        for worker_id in range(workers):
+            part = Path(f"{base_path}.w{worker_id}")
+            if not part.exists():
+                continue
+            with open(part, encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        recorder.add(json.loads(line))
+                        if out:
+                            out.write(line)
+            part.unlink()
+    finally:
+        if out:
+            out.close()
+
+
+def run_sharded(urls, workers, concurrency, platform_limits, saver_kwargs, identify_platform,
+                collect_traces=False, on_result=None, log=print):
+    """
+    以 workers 个进程处理 urls，返回 (按输入顺序排列的结果列表, 合并后的 TraceRecorder)。
+    saver_kwargs 为 ArticleSaver 的构造参数（需可 pickle）。
+    collect_traces 为 True 时即使没有指定 trace_path 也收集各进程的 trace 用于汇总。
+    on_result 在主进程中对每个完成的结果调用（如写入运行日志）。
+    """
+    trace_path = saver_kwargs.get('trace_path')
+    scratch = None
+    if collect_traces and not trace_path:
+        scratch = tempfile.TemporaryDirectory(prefix="article-saver-trace-")
+        saver_kwargs = {**saver_kwargs, 'trace_path': str(Path(scratch.name) / "trace.jsonl")}
+
+    # 使用 spawn：子进程不继承父进程的事件循环和 Playwright 状态
+    ctx = multiprocessing.get_context('spawn')
+    work = SharedWork(ctx, urls, identify_platform, platform_limits, default_limit=workers * concurrency,
+                      workers=workers, concurrency=concurrency)
+    results_queue = ctx.Queue()
+    processes = [
+        ctx.Process(target=worker_main, args=(i, work, results_queue, concurrency, platform_limits, saver_kwargs), daemon=True)
+        for i in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    results = {}
+    finished = set()
+    recorder = TraceRecorder()
+
+    def record(position, result):
+        results[position] = result
+        if on_result:
+            on_result(result)
+
+    def worker_exited(worker_id):
+        """回收退出进程的槽位，它正在处理的 URL 记为失败；无法回收时返回 False"""
+        finished.add(worker_id)
+        lost = work.reclaim(worker_id)
+        if lost is None:
+            return False
+        for position, url in lost:
+            if position not in results:
+                record(position, {"url": url, "success": False, "error": f"工作进程 w{worker_id} 退出，处理中断", "elapsed": 0.0})
+        return True
+
+    while len(finished) < workers:
+        try:
+            kind, worker_id, *payload = results_queue.get(timeout=RESULT_TIMEOUT)
+        except queue.Empty:
+            # 进程异常退出（如被 OOM 杀掉）时不会再发来消息
+            for i, process in enumerate(processes):
+                if i not in finished and not process.is_alive():
+                    log(f"⚠️ 工作进程 w{i} 意外退出 (exit code {process.exitcode})")
+                    if not worker_exited(i):
+                        # 共享锁随进程一起丢失，其他进程再也领取不到 URL，只能中止
+                        log(f"❌ 工作进程 w{i} 退出时持有共享锁，中止本次运行")
+                        for other in processes:
+                            other.terminate()
+                        finished.update(range(workers))
+            continue
+        if kind == 'result':
+            record(*payload)
+        elif kind == 'done':
+            recorder.add_run_spans(payload[0])
+            finished.add(worker_id)
+        elif kind == 'error':
+            log(f"❌ 工作进程 w{worker_id} 出错: {payload[0]}")
+            worker_exited(worker_id)
+
+    for process in processes:
+        process.join(timeout=5)
+
+    ordered = [
+        results.get(i, {"url": url, "success": False, "error": "工作进程退出，未处理", "elapsed": 0.0})
+        for i, url in enumerate(urls)
+    ]
+    if saver_kwargs.get('trace_path'):
+        recorder.trace_path = trace_path
+        merge_traces(saver_kwargs['trace_path'], workers, recorder, trace_path)
+    if scratch:
+        scratch.cleanup()
+    return ordered, recorder
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Staging - 文章的暂存目录与原子提交
+功能：
+1. 每篇文章在 {ROOT}/.staging/{pid}-{随机串}/ 中下载图片、写入 content.md，互不干扰
+2. 全部写完后一次 rename 提交为 {Platform}/{Date}_{Title}/；同名目录已存在时依次尝试 _2、_3……
+   最终目录要么不存在，要么完整，不会出现只写了一半的文章目录
+3. 重新抓取已保存的文章时，旧目录与暂存目录交换后再删除旧目录
+4. 启动时清理已退出进程遗留的暂存目录；交换过程中被中断的文章按暂存内容完成提交或恢复旧版本
+"""
+
+import os
+import uuid
+import shutil
+import itertools
+from pathlib import Path
+
+STAGING_DIRNAME = ".staging"
+ORIGIN_FILENAME = ".origin"      # 重新抓取时记录要替换的原目录
+TRASH_SUFFIX = ".old"
+
+
+def pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class StagingArea:
+    def __init__(self, output_root, log=print):
+        self.root = Path(output_root) / STAGING_DIRNAME
+        self.log = log
+
+    def create(self, target=None):
+        """创建一个暂存目录；target 为重新抓取时要替换的原目录"""
+        self.root.mkdir(parents=True, exist_ok=True)
+        staging_dir = self.root / f"{os.getpid()}-{uuid.uuid4().hex[:12]}"
+        staging_dir.mkdir()
+        if target:
+            (staging_dir / ORIGIN_FILENAME).write_text(str(target), encoding='utf-8')
+        return staging_dir
+
+    def discard(self, staging_dir):
+        shutil.rmtree(staging_dir, ignore_errors=True)
+
+    def commit(self, staging_dir, base):
+        """把暂存目录 rename 为 base（被占用时依次尝试 _2、_3……），返回最终目录"""
+        (staging_dir / ORIGIN_FILENAME).unlink(missing_ok=True)
+        base.parent.mkdir(parents=True, exist_ok=True)
+        candidate = base
+        for n in itertools.count(2):
+            # 已提交的目录都不为空，rename 到已存在的目录会失败，其他进程同时提交同名文章也不会互相覆盖
+            if not candidate.exists():
+                try:
+                    os.rename(staging_dir, candidate)
+                    return candidate
+                except OSError:
+                    if not candidate.exists():
+                        raise
+            candidate = base.with_name(f"{base.name}_{n}")
+
+    def replace(self, staging_dir, target):
+        """用暂存目录替换已存在的 target：旧目录先移入暂存区，新目录 rename 到位后再删除旧目录"""
+        trash = staging_dir.with_name(staging_dir.name + TRASH_SUFFIX)
+        os.rename(target, trash)
+        os.rename(staging_dir, target)
+        # .origin 留到 rename 之后再删，中断时 cleanup 仍能找到旧目录对应的位置
+        (target / ORIGIN_FILENAME).unlink(missing_ok=True)
+        shutil.rmtree(trash, ignore_errors=True)
+        return target
+
+    def cleanup(self):
+        """清理已退出进程遗留的暂存目录，返回清理的数量"""
+        if not self.root.is_dir():
+            return 0
+        removed = 0
+        for entry in sorted(self.root.iterdir(), key=lambda p: p.name.endswith(TRASH_SUFFIX)):
+            if not entry.exists():
+                continue
+            pid = entry.name.split('-', 1)[0]
+            if not pid.isdigit() or pid_alive(int(pid)):
+                continue
+            if not entry.name.endswith(TRASH_SUFFIX):
+                self.recover(entry)
+            if entry.is_dir():
+                shutil.rmtree(entry, ignore_errors=True)
+                removed += 1
+            elif entry.exists():
+                # 打包输出时在暂存区写到一半的 zip
+                entry.unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+    def recover(self, staging_dir):
+        """替换旧目录的过程中被中断：暂存内容已完整则完成提交，否则把旧目录放回原处"""
+        origin_file = staging_dir / ORIGIN_FILENAME
+        trash = staging_dir.with_name(staging_dir.name + TRASH_SUFFIX)
+        if not origin_file.exists() or not trash.exists():
+            return
+        target = Path(origin_file.read_text(encoding='utf-8'))
+        if target.exists():
+            return
+        if (staging_dir / "content.md").exists():
+            origin_file.unlink()
+            os.rename(staging_dir, target)
+            self.log(f"🧹 完成中断的提交: {target}")
+        else:
+            os.rename(trash, target)
+            self.log(f"🧹 恢复中断前的版本: {target}")
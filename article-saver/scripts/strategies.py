@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Fetch Strategies - 多抓取策略的对冲执行
+功能：
+1. 同一平台的多个抓取策略（如知乎的 Jina Reader 与登录态浏览器）按顺序对冲启动：
+   前一个策略超过 hedge_delay 仍未出结果、或已失败时，立即启动下一个
+2. 第一个拿到正文的策略胜出，其余策略立即取消
+3. 记录每个平台、每个策略的成功率与耗时（data/strategy_stats.json），
+   样本足够后按“期望成功耗时”自动调整启动顺序
+"""
+
+import os
+import json
+import time
+import asyncio
+import threading
+
+import tracing
+
+DEFAULT_HEDGE_DELAY = 3.0
+MIN_SAMPLES = 5           # 样本少于该数量时保持默认顺序
+LATENCY_SMOOTHING = 0.3   # 耗时的指数滑动平均系数
+
+
+def empty_entry():
+    return {"attempts": 0, "successes": 0, "latency": None, "attempt_latency": None}
+
+
+def smooth(previous, value):
+    if previous is None:
+        return round(value, 3)
+    return round(previous + LATENCY_SMOOTHING * (value - previous), 3)
+
+
+class StrategyStats:
+    """按平台记录策略的尝试次数、成功次数和平均成功耗时，持久化为 JSON"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            with open(path, encoding='utf-8') as f:
+                self.data = json.load(f)
+        except (OSError, ValueError):
+            self.data = {}
+
+    def get(self, platform_id, name):
+        return self.data.get(platform_id, {}).get(name, empty_entry())
+
+    def record(self, platform_id, name, success, elapsed):
+        with self._lock:
+            entry = self.data.setdefault(platform_id, {}).setdefault(name, empty_entry())
+            entry["attempts"] += 1
+            entry["attempt_latency"] = smooth(entry.get("attempt_latency"), elapsed)
+            if success:
+                entry["successes"] += 1
+                entry["latency"] = smooth(entry["latency"], elapsed)
+            self.save()
+
+    def save(self):
+        # 多进程运行时各自写临时文件，再原子替换
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.path)
+
+    def expected_cost(self, platform_id, name):
+        """期望成功耗时 ≈ 单次尝试平均耗时（含失败）/ 成功率（拉普拉斯平滑）"""
+        entry = self.get(platform_id, name)
+        rate = (entry["successes"] + 1) / (entry["attempts"] + 2)
+        return (entry.get("attempt_latency") or 0.0) / rate
+
+    def order(self, platform_id, names):
+        if any(self.get(platform_id, name)["attempts"] < MIN_SAMPLES for name in names):
+            return list(names)
+        return sorted(names, key=lambda name: self.expected_cost(platform_id, name))
+
+
+class HedgedRace:
+    """
+    对冲执行一组抓取策略。
+
+    每个策略是 async fn(claim)：拿到正文后先调用 claim()，返回 True 才继续下载图片等
+    有副作用的步骤，返回 False 说明已有其他策略胜出，应直接放弃。
+    策略返回 None 或 {"success": False} 视为失败。
+    """
+
+    def __init__(self, platform_id, stats=None, hedge_delay=DEFAULT_HEDGE_DELAY, log=print):
+        self.platform_id = platform_id
+        self.stats = stats
+        self.hedge_delay = hedge_delay
+        self.log = log
+        self.winner = None
+        self._claimed = asyncio.Event()
+        self._started = {}
+        self._claim_latency = None
+
+    def claimer(self, name):
+        def claim():
+            if self.winner is not None:
+                return False
+            self.winner = name
+            self._claimed.set()
+            # 胜者随后还要下载图片并保存，结果确定后才记入统计；耗时仍按拿到正文的时刻计算
+            self._claim_latency = time.monotonic() - self._started[name]
+            tracing.annotate(strategy=name)
+            return True
+        return claim
+
+    def record(self, name, success, elapsed=None):
+        if self.stats is not None:
+            if elapsed is None:
+                elapsed = time.monotonic() - self._started[name]
+            self.stats.record(self.platform_id, name, success, elapsed)
+
+    async def run(self, strategies):
+        names = [name for name, _ in strategies]
+        if self.stats is not None:
+            names = self.stats.order(self.platform_id, names)
+        if not names:
+            # 平台未声明策略，或声明的策略都被参数关闭（如 --no-fast-path）
+            self.log(f"❌ {self.platform_id} 没有可用的抓取策略")
+            return {"success": False, "error": "没有可用的抓取策略"}
+        funcs = dict(strategies)
+        waiting = list(names)
+        tasks = {}
+        last_result = None
+        claimed = asyncio.create_task(self._claimed.wait())
+
+        def launch():
+            name = waiting.pop(0)
+            self._started[name] = time.monotonic()
+            tasks[asyncio.create_task(funcs[name](self.claimer(name)))] = name
+
+        try:
+            launch()
+            while tasks:
+                timeout = self.hedge_delay if waiting and not self._claimed.is_set() else None
+                done, _ = await asyncio.wait([*tasks, claimed], timeout=timeout,
+                                             return_when=asyncio.FIRST_COMPLETED)
+
+                if self._claimed.is_set():
+                    # 胜者已确定：取消其余策略，等待胜者完成后续步骤
+                    winner_task = next(task for task, name in tasks.items() if name == self.winner)
+                    for task in tasks:
+                        if task is not winner_task:
+                            task.cancel()
+                    await asyncio.gather(*(t for t in tasks if t is not winner_task), return_exceptions=True)
+                    if len(names) > 1:
+                        self.log(f"🏁 策略 {self.winner} 胜出")
+                    try:
+                        result = await winner_task
+                    except Exception as e:
+                        result = {"success": False, "error": str(e)}
+                    self.record(self.winner, bool(result and result.get("success")), self._claim_latency)
+                    return result
+
+                if not done:
+                    # 超过对冲延迟仍未出结果，启动下一个策略
+                    self.log(f"⏳ {self.hedge_delay:g}s 内未拿到正文，并行启动策略: {waiting[0]}")
+                    launch()
+                    continue
+
+                for task in done:
+                    name = tasks.pop(task)
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        result = {"success": False, "error": str(e)}
+                    if not result or not result.get("success"):
+                        self.record(name, False)
+                        last_result = result or {"success": False, "error": f"策略 {name} 未能提取正文"}
+                        self.log(f"⚠️ 策略 {name} 失败: {last_result.get('error', '未知错误')}")
+                    else:
+                        # 未调用 claim 的成功结果（如跳过）同样直接采用
+                        self.winner = name
+                        self.record(name, True)
+                        tracing.annotate(strategy=name)
+                        for other in tasks:
+                            other.cancel()
+                        await asyncio.gather(*tasks, return_exceptions=True)
+                        return result
+                # 有策略失败时立即补上下一个，不再等待对冲延迟
+                if waiting:
+                    self.log(f"↪️ 回退到策略: {waiting[0]}")
+                    launch()
+            return last_result
+        finally:
+            claimed.cancel()
+            for task in tasks:
+                task.cancel()
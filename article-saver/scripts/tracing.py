@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Tracing - 分阶段耗时记录与运行报告
+功能：
+1. 每篇文章一条 trace：各阶段 span（启动浏览器、goto、就绪等待、提取、图片下载、写盘……）、
+   每张图片的字节数/耗时/状态/重试次数/缓存命中
+2. 当前文章的 trace 通过 contextvars 传递，各模块直接调用 span() / record_image()，无需层层传参；
+   未处于任何 trace 中时这些调用不做任何事
+3. 以 JSON Lines 输出（每篇文章一行），运行结束时汇总各阶段 p50/p95 与图片吞吐，
+   并可导出 Prometheus 文本 / OpenMetrics 格式
+"""
+
+import json
+import time
+import asyncio
+import threading
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+MAX_SAMPLES = 5000        # 每个阶段保留用于计算分位数的最近样本数
+METRIC_PREFIX = "article_saver"
+
+_current = ContextVar('article_trace', default=None)
+
+
+class Trace:
+    def __init__(self, url=None):
+        self.url = url
+        self.started_at = time.time()
+        self.total = None
+        self.status = None
+        self.error = None
+        self.attrs = {}
+        self.spans = []
+        self.images = []
+        self.counters = {}
+        self._t0 = time.monotonic()
+
+    def add_span(self, name, duration, start=None, **attrs):
+        self.spans.append({
+            "name": name,
+            "start": round(start if start is not None else time.monotonic() - self._t0 - duration, 4),
+            "duration": round(duration, 4),
+            **attrs,
+        })
+
+    def to_dict(self):
+        return {
+            "url": self.url,
+            "started_at": self.started_at,
+            "total": self.total,
+            "status": self.status,
+            "error": self.error,
+            **self.attrs,
+            "spans": self.spans,
+            "images": self.images,
+            "counters": self.counters,
+        }
+
+
+@contextmanager
+def span(name, **attrs):
+    """记录一个阶段的耗时；在 async 代码中包住 await 同样有效"""
+    trace = _current.get()
+    if trace is None:
+        yield
+        return
+    started = time.monotonic()
+    status = 'ok'
+    try:
+        yield
+    except asyncio.CancelledError:
+        status = 'cancelled'
+        raise
+    except BaseException:
+        status = 'error'
+        raise
+    finally:
+        trace.add_span(name, time.monotonic() - started, started - trace._t0, status=status, **attrs)
+
+
+def add_span(name, duration, **attrs):
+    """补记已经单独测量过的阶段（如就绪等待的各子阶段）"""
+    trace = _current.get()
+    if trace is not None:
+        trace.add_span(name, duration, **attrs)
+
+
+def record_image(url, status, elapsed=0.0, size=0, retries=0, error=None):
+    trace = _current.get()
+    if trace is None:
+        return
+    entry = {"url": url, "status": status, "bytes": size, "elapsed": round(elapsed, 4), "retries": retries}
+    if error:
+        entry["error"] = error
+    trace.images.append(entry)
+
+
+def incr(name, value=1):
+    trace = _current.get()
+    if trace is not None:
+        trace.counters[name] = trace.counters.get(name, 0) + value
+
+
+def annotate(**attrs):
+    trace = _current.get()
+    if trace is not None:
+        trace.attrs.update(attrs)
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q
+    low = int(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+class StageStats:
+    def __init__(self):
+        self.count = 0
+        self.sum = 0.0
+        self.samples = deque(maxlen=MAX_SAMPLES)
+
+    def add(self, duration):
+        self.count += 1
+        self.sum += duration
+        self.samples.append(duration)
+
+
+class TraceRecorder:
+    """汇总所有文章的 trace；trace_path 不为空时每篇文章追加一行 JSON"""
+
+    def __init__(self, trace_path=None):
+        self.trace_path = trace_path
+        self.run_trace = Trace()
+        self.stages = {}
+        self.articles = {}
+        self.images = {}
+        self.image_bytes = 0
+        self.image_seconds = 0.0
+        self.image_retries = 0
+        self.counters = {}
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+
+    def activate(self):
+        """把运行级 trace 设为当前上下文，记录不属于任何文章的阶段（如批量模式启动浏览器）"""
+        _current.set(self.run_trace)
+
+    @contextmanager
+    def article(self, url):
+        trace = Trace(url)
+        token = _current.set(trace)
+        try:
+            yield trace
+        except BaseException as e:
+            trace.status = trace.status or 'failed'
+            trace.error = trace.error or str(e)
+            raise
+        finally:
+            _current.reset(token)
+            trace.total = round(time.monotonic() - trace._t0, 4)
+            self.finish(trace)
+
+    def finish(self, trace):
+        record = trace.to_dict()
+        self.add(record)
+        if self.trace_path:
+            with self._lock, open(self.trace_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    def add(self, record):
+        """并入一条文章 trace（trace.to_dict() 或从 JSON Lines 读回的记录）"""
+        with self._lock:
+            status = record['status'] or 'unknown'
+            self.articles[status] = self.articles.get(status, 0) + 1
+            self.stage('total').add(record['total'])
+            for item in record['spans']:
+                if item.get('status', 'ok') == 'ok':
+                    self.stage(item['name']).add(item['duration'])
+            for image in record['images']:
+                self.images[image['status']] = self.images.get(image['status'], 0) + 1
+                self.image_retries += image['retries']
+                if image['status'] == 'ok':
+                    self.image_bytes += image['bytes']
+                    self.image_seconds += image['elapsed']
+            for name, value in record['counters'].items():
+                self.counters[name] = self.counters.get(name, 0) + value
+
+    def add_run_spans(self, spans):
+        """并入运行级阶段（如其他进程中的浏览器启动）"""
+        with self._lock:
+            for item in spans:
+                self.stage(item['name']).add(item['duration'])
+
+    def stage(self, name):
+        if name not in self.stages:
+            self.stages[name] = StageStats()
+        return self.stages[name]
+
+    def finish_run(self):
+        """把运行级 trace 中的阶段（启动浏览器等）并入汇总"""
+        self.add_run_spans(self.run_trace.spans)
+        self.run_trace.spans.clear()
+
+    def summary(self):
+        elapsed = time.monotonic() - self.started
+        downloaded = self.stages.get('download_images')
+        return {
+            "elapsed": round(elapsed, 3),
+            "articles": dict(self.articles),
+            "stages": {
+                name: {
+                    "count": stats.count,
+                    "p50": round(percentile(stats.samples, 0.5), 4),
+                    "p95": round(percentile(stats.samples, 0.95), 4),
+                    "total": round(stats.sum, 4),
+                }
+                for name, stats in self.stages.items()
+            },
+            "images": {
+                "by_status": dict(self.images),
+                "bytes": self.image_bytes,
+                "retries": self.image_retries,
+                # 按下载阶段的墙钟时间计算的整体吞吐，以及单张图片的平均传输速度
+                "bytes_per_sec": round(self.image_bytes / downloaded.sum, 1) if downloaded and downloaded.sum else 0.0,
+                "per_image_bytes_per_sec": round(self.image_bytes / self.image_seconds, 1) if self.image_seconds else 0.0,
+            },
+            "counters": dict(self.counters),
+        }
+
+    def print_summary(self):
+        summary = self.summary()
+        print("\n" + "-" * 60)
+        print(f"⏱️ 阶段耗时汇总（{sum(summary['articles'].values())} 篇，{summary['elapsed']:.1f}s）")
+        print(f"  {'stage':<24}{'count':>7}{'p50':>10}{'p95':>10}{'total':>10}")
+        for name, stats in sorted(summary['stages'].items(), key=lambda item: -item[1]['total']):
+            print(f"  {name:<24}{stats['count']:>7}{stats['p50']:>9.2f}s{stats['p95']:>9.2f}s{stats['total']:>9.1f}s")
+        images = summary['images']
+        if images['by_status']:
+            statuses = ', '.join(f"{k} {v}" for k, v in sorted(images['by_status'].items()))
+            print(f"🖼️ 图片: {statuses}；{images['bytes'] / 1024 / 1024:.1f} MB，"
+                  f"{images['bytes_per_sec'] / 1024:.0f} KB/s（单张平均 {images['per_image_bytes_per_sec'] / 1024:.0f} KB/s），"
+                  f"重试 {images['retries']} 次")
+        if self.trace_path:
+            print(f"📝 trace 已写入: {self.trace_path}")
+
+    def metrics_text(self, openmetrics=False):
+        """Prometheus 文本格式；openmetrics=True 时输出 OpenMetrics（带 # EOF）"""
+        p = METRIC_PREFIX
+        lines = [
+            f"# HELP {p}_stage_seconds Duration of each scrape stage.",
+            f"# TYPE {p}_stage_seconds summary",
+        ]
+        for name, stats in sorted(self.stages.items()):
+            for q in (0.5, 0.95):
+                lines.append(f'{p}_stage_seconds{{stage="{name}",quantile="{q}"}} {percentile(stats.samples, q):.6f}')
+            lines.append(f'{p}_stage_seconds_sum{{stage="{name}"}} {stats.sum:.6f}')
+            lines.append(f'{p}_stage_seconds_count{{stage="{name}"}} {stats.count}')
+
+        def counter(name, help_text, samples):
+            # OpenMetrics 的元数据使用不带 _total 的族名，Prometheus 文本格式则使用完整样本名
+            family = f"{p}_{name}" if openmetrics else f"{p}_{name}_total"
+            lines.append(f"# HELP {family} {help_text}")
+            lines.append(f"# TYPE {family} counter")
+            for labels, value in samples:
+                lines.append(f"{p}_{name}_total{labels} {value}")
+
+        counter("articles", "Articles processed by status.",
+                [(f'{{status="{k}"}}', v) for k, v in sorted(self.articles.items())])
+        counter("images", "Images processed by status.",
+                [(f'{{status="{k}"}}', v) for k, v in sorted(self.images.items())])
+        counter("image_bytes", "Image bytes downloaded.", [("", self.image_bytes)])
+        counter("image_retries", "Image download retries.", [("", self.image_retries)])
+        if openmetrics:
+            lines.append("# EOF")
+        return '\n'.join(lines) + '\n'
+
+    def write_metrics(self, path, openmetrics=False):
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.metrics_text(openmetrics))
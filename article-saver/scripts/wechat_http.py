@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+WeChat HTTP - 微信公众号文章的免浏览器快速通道
+功能：
+1. 使用移动端 UA 和 wechat_auth.json 中的 Cookie 直接请求文章 HTML
+2. 在 Python 侧解析 #activity-name / #js_name / #js_content（正文由 html2md 转换）
+3. 输出与浏览器提取（平台插件 extract）相同结构的 {title, author, content, image_urls}
+解析失败（验证页、结构变化等）时返回 None，由调用方回退到 Playwright。
+"""
+
+import re
+import json
+from html.parser import HTMLParser
+from html2md import MarkdownWriter, VOID_TAGS, default_image_src
+
+# 触发这些提示说明拿到的是验证页而不是正文
+BLOCKED_MARKERS = ('环境异常', '完成验证', '请在微信客户端打开链接')
+
+META_CHARSET = re.compile(rb'<meta[^>]+charset=["\']?([\w-]+)', re.I)
+
+CAPTURE_IDS = {'activity-name': 'title', 'js_name': 'author', 'js_content': 'content'}
+
+
+def load_cookie_header(auth_file, host='mp.weixin.qq.com'):
+    """从 Playwright storage_state 文件中取出适用于 host 的 Cookie"""
+    try:
+        with open(auth_file, encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return ''
+    pairs = []
+    for cookie in state.get('cookies', []):
+        domain = cookie.get('domain', '').lstrip('.')
+        if domain and (host == domain or host.endswith('.' + domain)):
+            pairs.append(f"{cookie['name']}={cookie['value']}")
+    return '; '.join(pairs)
+
+
+class WechatArticleParser(HTMLParser):
+    """单遍扫描文章 HTML，收集标题、作者，并把 #js_content 交给 MarkdownWriter 转换"""
+
+    def __init__(self, image_resolver=default_image_src):
+        super().__init__(convert_charrefs=True)
+        self.title = []
+        self.author = []
+        self.writer = MarkdownWriter(image_resolver)
+        self.found_content = False
+        self._capture = None      # 当前收集文本的目标：title / author / content
+        self._depth = 0           # 目标元素内的嵌套深度
+
+    def handle_starttag(self, tag, attrs):
+        if self._capture is None:
+            element_id = dict(attrs).get('id')
+            if element_id in CAPTURE_IDS and tag not in VOID_TAGS:
+                self._capture = CAPTURE_IDS[element_id]
+                self._depth = 1
+                if self._capture == 'content':
+                    self.found_content = True
+            return
+
+        if tag not in VOID_TAGS:
+            self._depth += 1
+        if self._capture == 'content':
+            self.writer.start(tag, attrs)
+
+    def handle_endtag(self, tag):
+        if self._capture is None or tag in VOID_TAGS:
+            return
+        self._depth -= 1
+        if self._depth == 0:
+            self._capture = None
+        elif self._capture == 'content':
+            self.writer.end(tag)
+
+    def handle_data(self, data):
+        if self._capture == 'title':
+            self.title.append(data)
+        elif self._capture == 'author':
+            self.author.append(data)
+        elif self._capture == 'content':
+            self.writer.data(data)
+
+    def result(self):
+        content, image_urls = self.writer.result()
+        return {
+            'title': ''.join(self.title).strip(),
+            'author': ''.join(self.author).strip(),
+            'content': content,
+            'image_urls': image_urls,
+        }
+
+
+def decode_html(response):
+    """
+    按 Content-Type 中的 charset 解码；没有声明时 requests 会按 HTTP 规范回退到 ISO-8859-1，
+    中文正文会变成乱码，因此改看页面的 <meta charset>，都没有时按 UTF-8 解码
+    """
+    content_type = response.headers.get('content-type', '')
+    if 'charset=' in content_type.lower():
+        return response.text
+    match = META_CHARSET.search(response.content[:4096])
+    encoding = match.group(1).decode('ascii') if match else 'utf-8'
+    try:
+        return response.content.decode(encoding, errors='replace')
+    except LookupError:
+        return response.content.decode('utf-8', errors='replace')
+
+
+def is_blocked_html(html):
+    return any(marker in html for marker in BLOCKED_MARKERS) and 'js_content' not in html
+
+
+def parse_wechat_html(html, image_resolver=default_image_src):
+    if is_blocked_html(html):
+        return None
+    parser = WechatArticleParser(image_resolver)
+    parser.feed(html)
+    parser.close()
+    if not parser.found_content:
+        return None
+    data = parser.result()
+    if not data['content'] and not data['image_urls']:
+        return None
+    return data
+
+
+def fetch_wechat_article(session, url, user_agent, auth_file, timeout=15, image_resolver=default_image_src):
+    """请求并解析文章，返回 (data, response)；无法从 HTML 中提取正文时 data 为 None"""
+    headers = {'User-Agent': user_agent, 'Referer': 'https://mp.weixin.qq.com/'}
+    cookie = load_cookie_header(auth_file)
+    if cookie:
+        headers['Cookie'] = cookie
+    response = session.get(url, headers=headers, timeout=timeout)
+    if response.status_code != 200:
+        return None, response
+    return parse_wechat_html(decode_html(response), image_resolver), response
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# 脚本以 scripts/ 为根目录互相导入
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
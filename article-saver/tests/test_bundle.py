@@ -0,0 +1,53 @@
+import zipfile
+import threading
+
+from bundle import BundleWriter, BundleReader
+
+
+def test_reader_waits_for_concurrent_append(tmp_path):
+    """追加正在改写中央目录时，读取方等到写入完成后再打开，看到的是完整的新目录"""
+    bundle = tmp_path / "2026-10-17.zip"
+    writer = BundleWriter('day', log=lambda msg: None)
+    with writer.appending(bundle) as zf:
+        zf.writestr("2026-10-17_旧/content.md", "旧")
+
+    seen = []
+
+    def read():
+        try:
+            with BundleReader(bundle) as reader:
+                seen.append(reader.articles())
+        except zipfile.BadZipFile as e:
+            seen.append(e)
+
+    with writer.appending(bundle) as zf:
+        zf.writestr("2026-10-17_新/content.md", "新" * 4096)
+        zf.fp.flush()   # 旧的中央目录已被新条目覆盖，新的还没写
+        reader = threading.Thread(target=read)
+        reader.start()
+        reader.join(0.3)
+        assert reader.is_alive() and not seen
+    reader.join(5)
+    assert seen == [["2026-10-17_旧", "2026-10-17_新"]]
+
+
+def test_append_waits_for_open_reader(tmp_path):
+    """读取方持有 mmap 期间追加不会改写中央目录"""
+    bundle = tmp_path / "2026-10-17.zip"
+    writer = BundleWriter('day', log=lambda msg: None)
+    with writer.appending(bundle) as zf:
+        zf.writestr("2026-10-17_旧/content.md", "旧")
+
+    def append():
+        with writer.appending(bundle) as zf:
+            zf.writestr("2026-10-17_新/content.md", "新")
+
+    with BundleReader(bundle) as reader:
+        appender = threading.Thread(target=append)
+        appender.start()
+        appender.join(0.3)
+        assert appender.is_alive()
+        assert reader.read_text("2026-10-17_旧/content.md") == "旧"
+    appender.join(5)
+    with BundleReader(bundle) as reader:
+        assert reader.articles() == ["2026-10-17_旧", "2026-10-17_新"]
@@ -0,0 +1,38 @@
+import sys
+import subprocess
+from pathlib import Path
+
+import client
+import daemon
+
+
+def test_client_imports_only_stdlib():
+    """客户端不加载守护进程、抓取索引和平台插件，默认值与守护进程一致"""
+    scripts = Path(client.__file__).parent
+    loaded = subprocess.check_output([
+        sys.executable, "-c",
+        "import sys, client; print(' '.join(m for m in sys.modules if m in "
+        "('daemon', 'fetch_index', 'bundle', 'image_post', 'platforms')))",
+    ], cwd=scripts, text=True)
+    assert loaded.strip() == ""
+    assert (client.DEFAULT_HOST, client.DEFAULT_PORT, client.DEFAULT_PRIORITY) == \
+        (daemon.DEFAULT_HOST, daemon.DEFAULT_PORT, daemon.DEFAULT_PRIORITY)
+
+
+def test_wait_falls_back_when_daemon_dies(monkeypatch):
+    """等待结果时守护进程退出：回退为直接运行 saver.py，--no-fallback 时报告失败"""
+    def lost(self, job_id, timeout=None):
+        raise ConnectionRefusedError("连接被拒绝")
+
+    fallback = []
+    monkeypatch.setattr(client.SaverClient, 'submit', lambda self, url, priority: {'id': 'j1'})
+    monkeypatch.setattr(client.SaverClient, 'wait', lost)
+    monkeypatch.setattr(client, 'run_directly', lambda url, reason: fallback.append(url) or 0)
+
+    monkeypatch.setattr(sys, 'argv', ["client.py", "https://x.com/a/status/1"])
+    assert client.main() == 0
+    assert fallback == ["https://x.com/a/status/1"]
+
+    monkeypatch.setattr(sys, 'argv', ["client.py", "https://x.com/a/status/1", "--no-fallback"])
+    assert client.main() == 1
+    assert len(fallback) == 1
@@ -0,0 +1,82 @@
+import time
+import asyncio
+
+from image_downloader import ImageDownloader
+from rate_limit import RateLimiter
+
+
+def test_throttled_host_does_not_block_other_hosts(tmp_path):
+    """一个图床处于限流暂停时，排队中的图片不占用全局下载名额，其他图床照常下载"""
+    rate_limiter = RateLimiter(log=lambda msg: None)
+    rate_limiter.limiter("https://pic1.zhimg.com/a.jpg").cooldown_until = time.monotonic() + 30
+    downloader = ImageDownloader("UA", max_in_flight=2, rate_limiter=rate_limiter, log=lambda msg: None)
+
+    async def fetch(index, url):
+        path = tmp_path / f"img_{index:02d}.jpg"
+        path.write_bytes(b"x")
+        return {"filename": path.name, "temp_path": str(path)}
+
+    async def run():
+        throttled = [
+            asyncio.create_task(downloader.download_one(i, f"https://pic1.zhimg.com/{i}.jpg", 5, tmp_path, fetch))
+            for i in range(4)
+        ]
+        await asyncio.sleep(0.05)
+        started = time.monotonic()
+        info = await asyncio.wait_for(
+            downloader.download_one(4, "https://mmbiz.qpic.cn/ok.jpg", 5, tmp_path, fetch), timeout=2
+        )
+        elapsed = time.monotonic() - started
+        for task in throttled:
+            task.cancel()
+        await asyncio.gather(*throttled, return_exceptions=True)
+        return info, elapsed
+
+    info, elapsed = asyncio.run(run())
+    assert info["filename"] == "img_04.jpg"
+    assert elapsed < 1
+
+
+class StubResponse:
+    def __init__(self, chunks, delay=0.0):
+        self.status_code = 200
+        self.headers = {'content-type': 'image/jpeg'}
+        self.chunks = chunks
+        self.delay = delay
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def iter_content(self, size):
+        for chunk in self.chunks:
+            time.sleep(self.delay)
+            yield chunk
+
+
+class StubSession:
+    def __init__(self, responses):
+        self.responses = list(responses)
+
+    def get(self, url, **kwargs):
+        return self.responses.pop(0)
+
+
+def test_timed_out_attempt_does_not_clobber_retry(tmp_path):
+    """超时后仍在运行的下载线程与重试各写各的临时文件，超时的线程在截止时间后停止写入"""
+    downloader = ImageDownloader("UA", timeout=0.3, log=lambda msg: None)
+    downloader._session = StubSession([StubResponse([b"A"] * 50, delay=0.02), StubResponse([b"B"] * 5)])
+
+    async def run():
+        slow = asyncio.create_task(asyncio.to_thread(
+            downloader.fetch_to_file, "https://pic1.zhimg.com/a.jpg", tmp_path, 0))
+        await asyncio.sleep(0.1)
+        filename = await asyncio.to_thread(downloader.fetch_to_file, "https://pic1.zhimg.com/a.jpg", tmp_path, 0)
+        return filename, await asyncio.gather(slow, return_exceptions=True)
+
+    filename, (slow_result,) = asyncio.run(run())
+    assert "超时" in str(slow_result)
+    assert (tmp_path / filename).read_bytes() == b"B" * 5
+    assert [p.name for p in tmp_path.iterdir()] == [filename]
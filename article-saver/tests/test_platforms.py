@@ -0,0 +1,37 @@
+import platforms
+from platforms import Platform
+from fetch_index import canonicalize_url
+from rate_limit import RateLimiter, host_group, FALLBACK_LIMIT
+
+
+class Example(Platform):
+    id = 'example'
+    name = '示例'
+    hosts = ('example.com',)
+    rate_limit_groups = {
+        'example.com': (('example.com', 'example.org'), (0.5, 2, 1)),
+        'exampleimg.com': (('exampleimg.com',), (10.0, 10, 4)),
+    }
+    canonical_hosts = {'www.example.org': 'example.com'}
+
+    @staticmethod
+    def image_src(attrs):
+        return attrs.get('data-full')
+
+
+def test_plugin_declarations_are_used(monkeypatch):
+    """新增平台只需一个插件：图片地址取法、限速域名组和 URL 规范化都从插件读取"""
+    monkeypatch.setitem(platforms.registry(), Example.id, Example())
+
+    data = Example().finish({'html': '<p>正文</p><img src="https://x/thumb.jpg" data-full="https://x/full.jpg">'})
+    assert data['image_urls'] == ["https://x/full.jpg"]
+    assert data['content'].endswith("{{IMG_0}}")
+
+    assert host_group("m.example.org") == 'example.com'
+    assert host_group("cdn1.exampleimg.com") == 'exampleimg.com'
+    limiter = RateLimiter(log=lambda msg: None).limiter("https://m.example.org/p/1")
+    assert (limiter.initial_rate, limiter.burst, limiter.max_in_flight) == (0.5, 2, 1)
+    assert RateLimiter(log=lambda msg: None).limiter("https://unknown.test/").burst == FALLBACK_LIMIT[1]
+
+    assert canonicalize_url("https://www.example.org/p/1/?utm_source=x") == "https://example.com/p/1"
+    assert canonicalize_url("https://mobile.twitter.com/a/status/1") == "https://x.com/a/status/1"
@@ -0,0 +1,46 @@
+import asyncio
+
+from readiness import wait_until_ready
+
+CONFIG = {'selector': None, 'images': False, 'network_idle': 0.05, 'max_wait': 1.0}
+
+
+class StubPage:
+    def __init__(self, idle_error=None, images_error=None):
+        self.idle_error = idle_error
+        self.images_error = images_error
+
+    async def wait_for_load_state(self, state, timeout=None):
+        if self.idle_error:
+            raise self.idle_error
+
+    async def wait_for_selector(self, selector, state=None, timeout=None):
+        return True
+
+    async def evaluate(self, script, arg=None):
+        # 候选选择器查询返回第一个，正文长度固定（立即稳定）
+        return arg[0] if isinstance(arg, list) else 100
+
+    async def wait_for_function(self, script, arg=None, polling=None, timeout=None):
+        if self.images_error:
+            raise self.images_error
+
+
+def test_network_idle_timeout_is_not_ready():
+    """没有选择器时，网络空闲超时的页面不应报告为就绪"""
+    timings = asyncio.run(wait_until_ready(StubPage(TimeoutError("Timeout 50ms exceeded")), CONFIG))
+    assert timings['ready'] is False
+    assert 'network_idle' in timings
+
+
+def test_network_idle_reached_is_ready():
+    assert asyncio.run(wait_until_ready(StubPage(), CONFIG))['ready'] is True
+
+
+def test_images_timeout_is_not_ready(monkeypatch):
+    """正文已稳定但懒加载图片没有拿到地址时，不应报告为就绪"""
+    monkeypatch.setattr('readiness.STABLE_POLL_INTERVAL', 0.01)
+    config = {'selector': '#js_content', 'images': True, 'network_idle': 0, 'max_wait': 1.0}
+    timings = asyncio.run(wait_until_ready(StubPage(images_error=TimeoutError("Timeout exceeded")), config))
+    assert timings['ready'] is False and 'images' in timings
+    assert asyncio.run(wait_until_ready(StubPage(), config))['ready'] is True
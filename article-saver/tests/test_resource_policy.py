@@ -0,0 +1,20 @@
+from resource_policy import match_host, TRACKING_HOSTS
+
+ZHIHU_BLOCK = ('zhihu.com/api/v4/ad', 'zhihu.com/commercial_api')
+
+
+def test_tracking_hosts_match_by_suffix():
+    assert match_host("https://www.google-analytics.com/collect?v=1", TRACKING_HOSTS)
+    assert match_host("https://hm.baidu.com/hm.js?abc", TRACKING_HOSTS)
+    # 只是包含该字符串的其他域名和路径不拦截
+    assert not match_host("https://notsentry.io/app.js", TRACKING_HOSTS)
+    assert not match_host("https://example.com/hm.baidu.com/page", TRACKING_HOSTS)
+    assert not match_host("https://mp.weixin.qq.com/s?ref=cnzz.com", TRACKING_HOSTS)
+
+
+def test_platform_path_prefixes():
+    assert match_host("https://www.zhihu.com/api/v4/ad/123", ZHIHU_BLOCK)
+    assert not match_host("https://www.zhihu.com/api/v4/articles/1", ZHIHU_BLOCK)
+    assert not match_host("https://example.com/zhihu.com/api/v4/ad", ZHIHU_BLOCK)
+    assert match_host("https://video.twimg.com/ext_tw_video/1.mp4", ('video.twimg.com',))
+    assert not match_host("https://pbs.twimg.com/media/a.jpg", ('video.twimg.com',))
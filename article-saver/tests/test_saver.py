@@ -0,0 +1,61 @@
+from pathlib import Path
+
+import platforms
+from saver import ArticleSaver
+
+
+def test_auth_file_follows_data_dir(tmp_path):
+    """登录态文件跟随实例的 data_dir，而不是模块默认的 data/"""
+    data_dir = tmp_path / "profile"
+    saver = ArticleSaver(verbose=False, output_root=tmp_path / "out", data_dir=data_dir)
+    wechat = platforms.get('wechat')
+    assert saver.auth_file(wechat) == data_dir / wechat.auth_file
+    assert saver.auth_file(platforms.get('x')) is None
+
+    (data_dir / wechat.auth_file).write_text('{"cookies": [], "origins": []}')
+    assert saver.build_context_args('wechat')["storage_state"] == str(data_dir / wechat.auth_file)
+
+
+def test_unchanged_content_skips_resave(tmp_path):
+    """过期重抓拿到的正文哈希与记录一致时直接跳过；正文变化或 --force 时照常保存"""
+    from fetch_index import content_hash
+
+    saver = ArticleSaver(verbose=False, output_root=tmp_path / "out", data_dir=tmp_path / "data")
+    save_dir = tmp_path / "out" / "知乎" / "2026-10-17_标题"
+    save_dir.mkdir(parents=True)
+    (save_dir / "content.md").write_text("# 标题", encoding='utf-8')
+    url = "https://zhuanlan.zhihu.com/p/1"
+    saver.fetch_index.record(url, save_dir, content_hash("正文 {{IMG_0}}"), etag='"v1"')
+    previous = saver.fetch_index.get(url)
+
+    data = {'content': "正文 {{IMG_0}}", 'etag': '"v2"'}
+    skipped = saver.unchanged(url, data, previous, '知乎', 'zhihu')
+    assert skipped['skipped'] and skipped['save_dir'] == str(save_dir)
+    assert saver.fetch_index.get(url)['etag'] == '"v2"'
+
+    assert saver.unchanged(url, {'content': "新的正文"}, previous, '知乎', 'zhihu') is None
+    saver.force = True
+    assert saver.unchanged(url, {'content': "正文 {{IMG_0}}"}, previous, '知乎', 'zhihu') is None
+
+
+
+def test_jina_content_keeps_literal_placeholders(tmp_path):
+    """Jina 的正文已按 URL 改写图片链接，正文里原样出现的 {{IMG_n}} 保留为文字"""
+    import asyncio
+
+    saver = ArticleSaver(verbose=False, output_root=tmp_path / "out", data_dir=tmp_path / "data")
+    image_url = "https://pic1.zhimg.com/a.jpg"
+    saver.read_with_jina = lambda url: {
+        'success': True, 'content': f"# 标题\n\n模板写法 {{{{IMG_0}}}} 和 {{{{IMG_7}}}}\n\n![]({image_url})",
+    }
+
+    async def download_to_dir(urls, save_dir, reused=None, extra_headers=None):
+        (save_dir / "img_00.jpg").write_bytes(b'\xff\xd8\xff\xd9')
+        return [{'index': 0, 'filename': "img_00.jpg", 'temp_path': str(save_dir / "img_00.jpg"), 'original_url': urls[0]}]
+
+    saver.image_downloader.download_to_dir = download_to_dir
+    url = "https://zhuanlan.zhihu.com/p/1"
+    result = asyncio.run(saver.scrape_with_jina(url, "知乎", "zhihu"))
+    save_dir = saver.save(result, url)
+    content = (Path(save_dir) / "content.md").read_text(encoding='utf-8')
+    assert "模板写法 {{IMG_0}} 和 {{IMG_7}}\n\n![](img_00.jpg)" in content
@@ -0,0 +1,40 @@
+from search_index import SearchIndex
+
+ARTICLE = """---
+title: {title}
+author: 技术札记
+platform: 知乎
+url: https://zhuanlan.zhihu.com/p/{name}
+saved_at: 2026-10-17 10:00:00
+---
+
+{body}
+"""
+
+
+def make_index(tmp_path):
+    index = SearchIndex(tmp_path / "search.sqlite")
+    for name, body in (("phrase", "An event loop drives every coroutine."),
+                       ("terms", "Each loop iteration dispatches one event handler.")):
+        article_dir = tmp_path / name
+        article_dir.mkdir()
+        (article_dir / "content.md").write_text(ARTICLE.format(title=name, name=name, body=body), encoding='utf-8')
+        index.add(article_dir)
+    return index
+
+
+def titles(results):
+    return sorted(r['title'] for r in results)
+
+
+def test_argument_with_spaces_matches_as_phrase(tmp_path):
+    """命令行的一个参数（search.py "event loop"）按短语匹配，多个参数按词匹配"""
+    index = make_index(tmp_path)
+    assert titles(index.search(["event loop"])) == ["phrase"]
+    assert titles(index.search(["event", "loop"])) == ["phrase", "terms"]
+    assert titles(index.search('"event loop"')) == ["phrase"]
+
+
+def test_quotes_inside_argument_are_escaped(tmp_path):
+    index = make_index(tmp_path)
+    assert index.search(['event "loop']) == []
@@ -0,0 +1,27 @@
+import multiprocessing
+
+from shard import SharedWork
+
+
+def make_work(limit=1):
+    ctx = multiprocessing.get_context('spawn')
+    urls = ["https://zhihu.com/a", "https://zhihu.com/b", "https://zhihu.com/c"]
+    return SharedWork(ctx, urls, lambda url: ('知乎', 'zhihu'), {'zhihu': limit}, default_limit=4, workers=2, concurrency=2)
+
+
+def test_platform_limit_is_shared_across_workers():
+    work = make_work()
+    assert work.claim(0) == ('zhihu', 0, "https://zhihu.com/a")
+    assert work.claim(2) is False
+    work.release(0)
+    assert work.claim(2) == ('zhihu', 1, "https://zhihu.com/b")
+
+
+def test_reclaim_releases_slots_of_exited_worker():
+    """工作进程退出后，主进程释放它占用的槽位并取回正在处理的 URL，其他进程可以继续领取"""
+    work = make_work()
+    work.claim(1)                       # w0 的第二个协程领取了 a
+    assert work.claim(2) is False       # w1 被平台上限挡住
+    assert work.reclaim(0) == [(0, "https://zhihu.com/a")]
+    assert work.reclaim(0) == []
+    assert work.claim(2) == ('zhihu', 1, "https://zhihu.com/b")
@@ -0,0 +1,36 @@
+import asyncio
+
+from strategies import HedgedRace, StrategyStats
+
+
+def test_no_strategies_returns_failure():
+    """没有可用策略时返回普通的失败结果，而不是抛出 IndexError"""
+    result = asyncio.run(HedgedRace('x', log=lambda msg: None).run([]))
+    assert result == {"success": False, "error": "没有可用的抓取策略"}
+
+
+def test_failed_strategy_falls_back_to_next():
+    async def broken(claim):
+        return {"success": False, "error": "blocked"}
+
+    async def working(claim):
+        assert claim()
+        return {"success": True, "data": {}}
+
+    race = HedgedRace('zhihu', hedge_delay=10, log=lambda msg: None)
+    result = asyncio.run(race.run([('jina', broken), ('browser', working)]))
+    assert result["success"] and race.winner == 'browser'
+
+
+def test_winner_recorded_after_final_result(tmp_path):
+    """胜者 claim 之后下载图片失败，统计中记为失败"""
+    async def claims_then_fails(claim):
+        assert claim()
+        raise OSError("磁盘已满")
+
+    stats = StrategyStats(tmp_path / "stats.json")
+    race = HedgedRace('zhihu', stats, log=lambda msg: None)
+    result = asyncio.run(race.run([('jina', claims_then_fails)]))
+    assert result == {"success": False, "error": "磁盘已满"}
+    assert stats.get('zhihu', 'jina')["attempts"] == 1
+    assert stats.get('zhihu', 'jina')["successes"] == 0
@@ -0,0 +1,43 @@
+import requests
+
+from wechat_http import decode_html, fetch_wechat_article
+
+ARTICLE = """<html><head><meta charset="utf-8"></head><body>
+<h1 id="activity-name">从零实现一个异步爬虫</h1>
+<a id="js_name">技术公众号</a>
+<div id="js_content"><p>事件循环是异步 IO 的核心。</p></div>
+</body></html>"""
+
+
+def make_response(body, content_type):
+    response = requests.Response()
+    response.status_code = 200
+    response.headers['Content-Type'] = content_type
+    response._content = body
+    # 与 HTTPAdapter.build_response 一致：text/html 没有 charset 时为 ISO-8859-1
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+    return response
+
+
+class StubSession:
+    def __init__(self, response):
+        self.response = response
+
+    def get(self, url, **kwargs):
+        return self.response
+
+
+def test_html_without_charset_header_is_decoded_as_utf8(tmp_path):
+    """Content-Type 没有 charset 时不按 ISO-8859-1 解码，中文正文不乱码"""
+    response = make_response(ARTICLE.encode('utf-8'), 'text/html')
+    assert response.encoding == 'ISO-8859-1'
+    data, _ = fetch_wechat_article(StubSession(response), "https://mp.weixin.qq.com/s/x", "UA", tmp_path / "none.json")
+    assert data['title'] == "从零实现一个异步爬虫"
+    assert data['author'] == "技术公众号"
+    assert "事件循环是异步 IO 的核心。" in data['content']
+
+
+def test_meta_and_header_charset_are_respected():
+    gbk = ARTICLE.replace('charset="utf-8"', 'charset="gbk"').encode('gbk')
+    assert "异步爬虫" in decode_html(make_response(gbk, 'text/html'))
+    assert "异步爬虫" in decode_html(make_response(ARTICLE.encode('gbk'), 'text/html; charset=GBK'))
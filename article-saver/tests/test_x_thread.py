@@ -0,0 +1,41 @@
+from html2md import fill_image_placeholders
+from platforms.x import ThreadCollector, parse_status_url
+
+PHOTO = "https://pbs.twimg.com/media/abc?format=jpg&name=small"
+
+
+def tweet(tweet_id, html, photos=()):
+    return {'id': tweet_id, 'handle': 'alice', 'author': 'Alice', 'text': html, 'html': html, 'photos': list(photos)}
+
+
+def test_literal_placeholder_in_tweet_text_is_kept():
+    """推文正文中字面的 {{IMG_n}} 不会被当作图片占位符"""
+    collector = ThreadCollector('alice', '1')
+    collector.add({'tweets': [
+        tweet('1', "模板语法写作 {{IMG_5}}，图片见下", [PHOTO]),
+        tweet('2', "<code>{{IMG_0}}</code> 也一样"),
+    ]})
+    result = collector.result()
+    assert collector.tweets == 2
+    assert len(result['image_urls']) == 1
+
+    content = fill_image_placeholders(result['content'], [{'index': 0, 'filename': 'img_00.jpg'}])
+    assert content.count("![图片](img_00.jpg)") == 1
+    assert "{\\{IMG_5}}" in content
+    assert "{\\{IMG_0}}" in content
+
+
+def test_status_url_without_handle_keeps_focal_author_only():
+    """/i/web/status/{ID} 链接中没有用户名时，按主推文的作者过滤回复"""
+    handle, status_id = parse_status_url("https://x.com/i/web/status/12")
+    assert (handle, status_id) == (None, "12")
+    collector = ThreadCollector(handle, status_id)
+    collector.add({'tweets': [
+        dict(tweet('11', "被回复的推文"), handle='carol', author='Carol'),
+        tweet('12', "主推文"),
+        tweet('13', "推文串第二条"),
+        dict(tweet('14', "别人的回复"), handle='bob', author='Bob'),
+        tweet('15', "回复区里的作者回复"),
+    ]})
+    assert collector.tweets == 2
+    assert collector.result()['content'] == "主推文\n\n---\n\n推文串第二条"